@@ -15,11 +15,89 @@ comprehensive production planning nodes. It generates production-ready artifacts
 The pipeline uses LangGraph for orchestration and includes HITL gates for human approval.
 """
 
+import asyncio
+import atexit
+import functools
+import logging
+import logging.handlers
 import operator
+import queue
+import random
+import string
+import sys
 import json
-from typing import Annotated, List, Dict, Optional
+import threading
+import time
+import requests
+from datetime import datetime
+from typing import Annotated, Any, List, Dict, NamedTuple, Optional, Tuple
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.memory import MemorySaver
+
+# interrupt()/Command need langgraph>=0.2.57; older installs (e.g. the backend's
+# pinned version) fall back to blocking input() at the HITL gates
+try:
+    from langgraph.types import interrupt, Command
+except ImportError:
+    interrupt = None
+    Command = None
+
+# orjson parses LLM output several times faster; stdlib json is the fallback.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _write_json_pretty(obj: Any, f) -> None:
+    """Write obj to an open text file as 2-space indented JSON."""
+    if orjson is not None:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode())
+    else:
+        json.dump(obj, f, indent=2)
+
+# Structured node logs go through a queue so planner threads never contend on
+# the stderr lock; a single listener thread does the writes
+logger = logging.getLogger("ad_production_pipeline")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, logging.StreamHandler(sys.stderr), respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
+def log_node_event(node: str, event: str, **fields: Any) -> None:
+    """
+    Emit one structured JSON log line for a node.
+    
+    Args:
+        node: Node name (e.g. "budgeting")
+        event: What happened ("complete", "fallback", ...)
+        **fields: Extra JSON-serializable details
+    """
+    record = {"node": node, "event": event, **fields}
+    if orjson is not None:
+        logger.info(orjson.dumps(record, default=str).decode())
+    else:
+        logger.info(json.dumps(record, default=str))
+
+
+# Imported once here so the first storyboard run doesn't pay the cold import;
+# without google-genai the storyboard stays text-only
+try:
+    import google.genai as genai
+    _HAS_GENAI = True
+except ImportError:
+    genai = None
+    _HAS_GENAI = False
 
 # Import model classes
 from models.scene_plan import Shot, SceneDetail, ScenePlan
@@ -31,15 +109,108 @@ from models.legal_clearance import LegalItem, LegalClearanceReport
 from models.risk_register import Risk, RiskRegister
 
 # Import TAMUS wrapper for LLM calls
-from tamus_wrapper import get_tamus_client
+from tamus_wrapper import get_tamus_client, extract_text, TokenBudgetExceeded
+from llm_cache import cache_enabled, get_llm_cache, make_cache_key
+from semantic_cache import (
+    semantic_cache_enabled, get_semantic_cache, plan_cache_enabled, get_plan_cache
+)
+from rate_limiter import get_rate_limiter
 import os
-import re
+
+# Resolved once at import; entry points load .env before importing this module
+TAMUS_MODEL = os.getenv("TAMUS_MODEL", "protected.gpt-5.2")
+# Stream completions (TAMUS_STREAM=0 falls back to a single blocking response)
+TAMUS_STREAM = os.getenv("TAMUS_STREAM", "1").lower() in ("1", "true", "yes")
+# Ask for strict JSON output on structured calls (TAMUS_JSON_MODE=0 if the
+# endpoint rejects response_format)
+TAMUS_JSON_MODE = os.getenv("TAMUS_JSON_MODE", "1").lower() in ("1", "true", "yes")
+
+# Per-node max_tokens, sized from observed completion lengths plus headroom for
+# reasoning tokens. Oversized budgets reserve provider capacity (and queue time)
+# without producing longer output; a JSON reply cut off by its budget is
+# retried once with double the budget.
+OUTPUT_BUDGETS = {
+    "storyboard": 3000,
+    "scene_breakdown": 3500,
+    "location_planning": 4000,
+    "budgeting": 3000,
+    "schedule": 4000,
+    "production_resources": 6000,
+    "legal": 3500,
+    "risk": 3500,
+}
 
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+_JSON_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _strip_markdown_fences(text: str) -> str:
+    """Return the body between the first and last ``` fence, if present."""
+    first = text.find("```")
+    if first == -1:
+        return text
+    last = text.rfind("```")
+    if last == first:
+        # Unterminated fence - drop the opening marker only
+        last = len(text)
+    body = text[first + 3:last]
+    # Drop the language tag on the opening fence line (e.g. ```json)
+    newline = body.find("\n")
+    if newline != -1 and body[:newline].strip().isalnum():
+        body = body[newline + 1:]
+    return body
+
+
+def _find_balanced_json(text: str) -> Optional[str]:
+    """
+    Locate the first balanced JSON object or array in text.
+    
+    Single left-to-right pass tracking bracket depth; braces inside string
+    literals (including escaped quotes) are ignored.
+    
+    Args:
+        text: Text that may contain a JSON value
+        
+    Returns:
+        Optional[str]: The JSON substring, or None if no balanced value exists
+    """
+    start = -1
+    for idx, char in enumerate(text):
+        if char in _JSON_CLOSERS:
+            start = idx
+            break
+    if start == -1:
+        return None
+    
+    stack = []
+    in_string = False
+    escape = False
+    for idx in range(start, len(text)):
+        char = text[idx]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _JSON_CLOSERS:
+            stack.append(_JSON_CLOSERS[char])
+        elif char == "}" or char == "]":
+            if not stack or stack.pop() != char:
+                return None
+            if not stack:
+                return text[start:idx + 1]
+    
+    return None
+
+
 def extract_json_from_llm_response(text: str) -> str:
     """
     Extract JSON from LLM response that may contain markdown code blocks or extra text.
@@ -50,21 +221,173 @@ def extract_json_from_llm_response(text: str) -> str:
     Returns:
         str: Extracted JSON string
     """
-    # Remove markdown code blocks
-    text = re.sub(r'```json\s*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'```\s*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'```', '', text)
+    # Bare, valid JSON (the common case) is returned as-is without scanning
+    stripped = text.strip()
+    if stripped and stripped[0] in _JSON_CLOSERS:
+        try:
+            _json_loads(stripped)
+            return stripped
+        except ValueError:
+            pass
+    else:
+        text = _strip_markdown_fences(text)
     
-    # Try to find JSON object or array
-    # Look for outermost { } or [ ]
-    json_match = re.search(r'(\{.*\}|\[.*\])', text, re.DOTALL)
-    if json_match:
-        return json_match.group(1).strip()
+    # Find the first balanced { } or [ ]
+    json_text = _find_balanced_json(text)
+    if json_text is not None:
+        return json_text
     
     return text.strip()
 
 
-def call_tamus_api(prompt: str, max_tokens: int = 4000, retries: int = 3) -> str:
+# LLM outputs above this size are extracted/parsed on a worker thread so a
+# large storyboard or plan doesn't stall the event loop
+LARGE_JSON_THRESHOLD = 65_536
+
+
+def parse_llm_json(text: str) -> Any:
+    """Extract and decode the JSON payload of an LLM response."""
+    # Decode bare JSON directly rather than validating it in extract and
+    # parsing it a second time
+    stripped = text.strip()
+    if stripped[:1] in _JSON_CLOSERS:
+        try:
+            return _json_loads(stripped)
+        except ValueError:
+            pass
+    return _json_loads(extract_json_from_llm_response(text))
+
+
+async def aparse_llm_json(text: str) -> Any:
+    """
+    Async variant of parse_llm_json for use inside async nodes.
+    
+    Small responses are parsed inline (a thread hop costs more than the parse);
+    responses larger than LARGE_JSON_THRESHOLD are parsed via asyncio.to_thread.
+    
+    Args:
+        text: Raw LLM response
+        
+    Returns:
+        Any: Decoded JSON value
+        
+    Raises:
+        json.JSONDecodeError: If the extracted text is not valid JSON
+    """
+    if len(text) > LARGE_JSON_THRESHOLD:
+        return await asyncio.to_thread(parse_llm_json, text)
+    return parse_llm_json(text)
+
+
+# Endings of a complete JSON reply (bare or fenced); anything else was cut off
+_JSON_ENDINGS = ("}", "]", "```")
+
+# Per-request read timeout is calibrated from observed latency instead of
+# always waiting the client's full 300s on a hung request. With streaming the
+# timeout bounds the wait for the first byte too, which a reasoning model
+# spends thinking, so the floor stays well above a typical reply time.
+TAMUS_MIN_TIMEOUT = float(os.getenv("TAMUS_MIN_TIMEOUT", "60"))
+TAMUS_MAX_TIMEOUT = 300.0
+_LATENCY_EWMA_ALPHA = 0.3
+# EWMA of successful call latency, keyed by max_tokens and prompt size
+# (longer budgets and longer prompts both run longer)
+_latency_ewma: Dict[Tuple[int, int], float] = {}
+_latency_lock = threading.Lock()
+
+
+def _latency_key(max_tokens: int, prompt_chars: int) -> Tuple[int, int]:
+    """EWMA bucket for a call: its token budget and power-of-two prompt size."""
+    return max_tokens, prompt_chars.bit_length()
+
+
+def _record_latency(max_tokens: int, prompt_chars: int, seconds: float) -> None:
+    """Fold a successful call's latency into the EWMA for its budget and prompt size."""
+    key = _latency_key(max_tokens, prompt_chars)
+    with _latency_lock:
+        previous = _latency_ewma.get(key)
+        if previous is None:
+            _latency_ewma[key] = seconds
+        else:
+            _latency_ewma[key] = _LATENCY_EWMA_ALPHA * seconds + (1 - _LATENCY_EWMA_ALPHA) * previous
+
+
+def _adaptive_timeout(max_tokens: int, prompt_chars: int, timeouts_so_far: int) -> float:
+    """
+    Compute the read timeout for the next TAMUS attempt.
+    
+    Uses 2x the latency EWMA for calls of this budget and prompt size
+    (floored at TAMUS_MIN_TIMEOUT), doubled for every timeout already hit on
+    this call so a genuinely slow completion still gets through. Falls back
+    to TAMUS_MAX_TIMEOUT until latency is observed.
+    """
+    ewma = _latency_ewma.get(_latency_key(max_tokens, prompt_chars))
+    if ewma is None:
+        return TAMUS_MAX_TIMEOUT
+    timeout = max(TAMUS_MIN_TIMEOUT, 2 * ewma) * (2 ** timeouts_so_far)
+    return min(TAMUS_MAX_TIMEOUT, timeout)
+
+
+TAMUS_BACKOFF_BASE = 3.0
+TAMUS_BACKOFF_MAX = 30.0
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter so concurrent callers don't retry in lockstep."""
+    return min(TAMUS_BACKOFF_MAX, TAMUS_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+# Circuit breaker: after TAMUS_BREAKER_THRESHOLD consecutive failed attempts
+# (across all callers) new attempts fail fast for TAMUS_BREAKER_COOLDOWN
+# seconds, so nodes drop to their fallbacks instead of waiting out retries
+# against a provider that is down. One success closes it again.
+TAMUS_BREAKER_THRESHOLD = int(os.getenv("TAMUS_BREAKER_THRESHOLD", "5"))
+TAMUS_BREAKER_COOLDOWN = float(os.getenv("TAMUS_BREAKER_COOLDOWN", "60"))
+_breaker_failures = 0
+_breaker_opened_at = 0.0
+_breaker_lock = threading.Lock()
+
+
+def _breaker_is_open() -> bool:
+    """Return True while the breaker is tripped and still cooling down."""
+    with _breaker_lock:
+        if TAMUS_BREAKER_THRESHOLD <= 0 or _breaker_failures < TAMUS_BREAKER_THRESHOLD:
+            return False
+        return time.monotonic() - _breaker_opened_at < TAMUS_BREAKER_COOLDOWN
+
+
+def _breaker_record(success: bool) -> None:
+    """Record an attempt outcome; (re)opens the breaker at the threshold."""
+    global _breaker_failures, _breaker_opened_at
+    with _breaker_lock:
+        if success:
+            _breaker_failures = 0
+            return
+        _breaker_failures += 1
+        if _breaker_failures >= TAMUS_BREAKER_THRESHOLD:
+            _breaker_opened_at = time.monotonic()
+
+
+def _classify_tamus_error(error: Exception) -> str:
+    """
+    Classify a failed TAMUS call.
+    
+    Returns:
+        str: "timeout" (retry immediately), "backoff" (rate limit, 5xx or
+        empty response - sleep then retry) or "fatal" (other 4xx - don't retry)
+    """
+    if isinstance(error, (requests.Timeout, requests.ConnectionError, TimeoutError)):
+        return "timeout"
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        if status == 429 or status >= 500:
+            return "backoff"
+        return "fatal"
+    return "backoff"
+
+
+def call_tamus_api(prompt: str, max_tokens: int = 4000, retries: int = 3,
+                   semantic_scope: Optional[str] = None, system: Optional[str] = None,
+                   json_mode: bool = False) -> str:
     """
     Helper function to call TAMUS API with a prompt and retry logic.
     
@@ -72,18 +395,25 @@ def call_tamus_api(prompt: str, max_tokens: int = 4000, retries: int = 3) -> str
         prompt: The prompt to send to the LLM
         max_tokens: Maximum tokens in response
         retries: Number of retry attempts
+        semantic_scope: Opt into the semantic cache; hits must share this
+            scope exactly (e.g. the brand name)
+        system: Optional system prompt sent as its own leading message;
+            shared instructions go here so every call starts with the
+            same prefix
+        json_mode: Request a strict JSON object response (response_format)
+            so the reply parses without fence stripping. A reply truncated by
+            max_tokens is retried once with double the budget
         
     Returns:
         str: The LLM response text
         
     Raises:
-        TimeoutError: If API times out after all retries
+        TimeoutError: If API times out after all retries, or the circuit
+            breaker is open
         ValueError: If response is empty after all retries
     """
     import time
     
-    llm = get_tamus_client()
-    
     # Log prompt length for debugging
     prompt_length = len(prompt)
     print(f"[TAMUS] Prompt length: {prompt_length} characters")
@@ -98,45 +428,103 @@ def call_tamus_api(prompt: str, max_tokens: int = 4000, retries: int = 3) -> str
         print(f"  ⚠ Prompt too long ({prompt_length} chars), truncating to 15000 chars")
         prompt = prompt[:15000] + "\n\n[Prompt truncated due to length]"
     
+    model = TAMUS_MODEL
+    
+    # Serve repeated prompts from the response cache (TAMUS_CACHE=1)
+    cache_key = None
+    if cache_enabled():
+        cache_key = make_cache_key(model, prompt, max_tokens, system, json_mode and TAMUS_JSON_MODE)
+        cached = get_llm_cache().get(cache_key)
+        if cached is not None:
+            print(f"[TAMUS] ✓ Cache hit ({len(cached)} chars)")
+            return cached
+    
+    # Near-duplicate creative prompts can reuse a stored response (SEMANTIC_CACHE=1)
+    use_semantic = semantic_scope is not None and semantic_cache_enabled()
+    if use_semantic:
+        cached = get_semantic_cache().lookup(prompt, semantic_scope, model, max_tokens)
+        if cached is not None:
+            return cached
+    
+    messages = [{"role": "user", "content": prompt}]
+    if system is not None:
+        messages.insert(0, {"role": "system", "content": system})
+    
+    llm = get_tamus_client()
+    prompt_chars = len(prompt) + len(system or "")
+    timeouts = 0
+    budget = max_tokens
+    budget_raised = False
+    response_format = {"type": "json_object"} if json_mode and TAMUS_JSON_MODE else None
+    
     for attempt in range(retries):
+        if _breaker_is_open():
+            print(f"  ✗ TAMUS circuit breaker open, skipping request")
+            raise TimeoutError("TAMUS API unavailable (circuit breaker open)")
+        
         try:
+            get_rate_limiter("tamus").acquire()
+            request_timeout = _adaptive_timeout(budget, prompt_chars, timeouts)
+            started = time.monotonic()
             response = llm.messages().create(
-                model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens
+                model=model,
+                messages=messages,
+                max_tokens=budget,
+                timeout=request_timeout,
+                stream=TAMUS_STREAM,
+                response_format=response_format
             )
             
-            # Extract text from response
-            if hasattr(response, 'content') and isinstance(response.content, list):
-                if len(response.content) > 0:
-                    if isinstance(response.content[0], dict) and 'text' in response.content[0]:
-                        text = response.content[0]['text']
-                        if text and text.strip():
-                            return text
-                    else:
-                        text = str(response.content[0])
-                        if text and text.strip():
-                            return text
-            
-            text = str(response)
+            text = extract_text(response)
             if text and text.strip():
+                _record_latency(budget, prompt_chars, time.monotonic() - started)
+                _breaker_record(success=True)
+                if (json_mode and not budget_raised and attempt < retries - 1
+                        and not text.rstrip().endswith(_JSON_ENDINGS)):
+                    budget_raised = True
+                    budget *= 2
+                    print(f"  ⚠ JSON reply truncated at the token budget, retrying with max_tokens={budget}")
+                    continue
+                if cache_key is not None:
+                    get_llm_cache().set(cache_key, text)
+                if use_semantic:
+                    get_semantic_cache().add(prompt, semantic_scope, model, max_tokens, text)
                 return text
                 
             # If we got here, response was empty
             if attempt < retries - 1:
-                wait_time = (attempt + 1) * 3  # Increased backoff: 3s, 6s, 9s
-                print(f"  ⚠ Empty response from TAMUS API, retrying in {wait_time}s... (attempt {attempt + 1}/{retries})")
+                wait_time = _backoff_delay(attempt)
+                print(f"  ⚠ Empty response from TAMUS API, retrying in {wait_time:.1f}s... (attempt {attempt + 1}/{retries})")
                 time.sleep(wait_time)
             else:
                 raise ValueError("No content in response after all retries")
                 
         except Exception as e:
+            # Reasoning spent the whole budget before any content was emitted
+            if (not budget_raised and attempt < retries - 1
+                    and isinstance(e, TokenBudgetExceeded)):
+                budget_raised = True
+                budget *= 2
+                print(f"  ⚠ Token budget exhausted, retrying with max_tokens={budget}")
+                continue
+            
+            kind = _classify_tamus_error(e)
             error_str = str(e).lower()
-            is_timeout = 'timeout' in error_str or 'timed out' in error_str
+            is_timeout = kind == "timeout" or 'timeout' in error_str or 'timed out' in error_str
+            
+            if kind == "fatal":
+                print(f"  ✗ TAMUS API rejected the request: {e}")
+                raise
+            _breaker_record(success=False)
             
             if attempt < retries - 1:
-                wait_time = (attempt + 1) * 3  # Increased backoff
-                print(f"  ⚠ TAMUS API error: {e}, retrying in {wait_time}s... (attempt {attempt + 1}/{retries})")
+                if kind == "timeout":
+                    # A hung or dropped request says nothing about load - retry now
+                    timeouts += 1
+                    print(f"  ⚠ TAMUS API timeout after {request_timeout:.0f}s, retrying immediately... (attempt {attempt + 1}/{retries})")
+                    continue
+                wait_time = _backoff_delay(attempt)
+                print(f"  ⚠ TAMUS API error: {e}, retrying in {wait_time:.1f}s... (attempt {attempt + 1}/{retries})")
                 time.sleep(wait_time)
             else:
                 print(f"  ✗ TAMUS API failed after {retries} attempts: {e}")
@@ -148,21 +536,135 @@ def call_tamus_api(prompt: str, max_tokens: int = 4000, retries: int = 3) -> str
     raise ValueError("Failed to get response from TAMUS API")
 
 
+async def acall_tamus_api(prompt: str, max_tokens: int = 4000, retries: int = 3,
+                          semantic_scope: Optional[str] = None, system: Optional[str] = None,
+                          json_mode: bool = False) -> str:
+    """
+    Async variant of call_tamus_api for use inside async nodes.
+    
+    The blocking request runs on a worker thread, so caching, rate limiting
+    and retry behaviour are identical to the sync helper while the event loop
+    stays free to overlap other calls.
+    """
+    return await asyncio.to_thread(
+        call_tamus_api, prompt, max_tokens, retries, semantic_scope, system, json_mode
+    )
+
+
+# Shared system prompt for every production planner. It is identical across
+# all planner calls, so the provider can reuse the cached prefix; each node
+# sends only its task and the relevant slice of the scene plan.
+PRODUCTION_SYSTEM_PROMPT = """You are the production planning department for a commercial advertisement shoot.
+You turn creative material (storyboards, scene plans) into practical, realistic production artifacts.
+
+Output rules:
+- Respond with ONLY valid JSON. No markdown fences, no commentary before or after.
+- Use the schema named in the request exactly; do not rename or omit keys.
+- Numbers are plain JSON numbers (no currency symbols or units inside numbers).
+
+Schemas:
+
+ScenePlan:
+{"scenes": [{"scene_id": str, "duration_sec": float, "location_type": "INT"|"EXT", "time_of_day": "DAY"|"NIGHT",
+  "location_description": str, "cast_count": int, "props": [str], "wardrobe": [str], "sfx_vfx": [str],
+  "dialogue_vo": str, "on_screen_text": str}],
+ "shots": [{"shot_id": str, "scene_id": str, "shot_type": "WIDE"|"MEDIUM"|"CLOSE-UP"|"INSERT"|"POV",
+  "camera_movement": "STATIC"|"PAN"|"TILT"|"DOLLY"|"STEADICAM", "duration_sec": float, "description": str}]}
+
+LocationsPlan:
+{"locations": [{"location_id": str, "location_type": "INT"|"EXT", "description": str, "key_features": [str],
+  "accessibility_requirements": str, "power_requirements": str, "space_requirements": str, "alternates": [str]}],
+ "permits_required": [str], "noise_restrictions": bool, "time_restrictions": str,
+ "parking_availability": str, "insurance_requirements": str}
+
+BudgetEstimate:
+{"total_min": float, "total_max": float,
+ "line_items": [{"category": str, "item": str, "quantity": int, "unit_cost": float, "total_cost": float, "assumptions": str}],
+ "cost_drivers": [str], "contingency_percent": float}
+
+SchedulePlan:
+{"total_shoot_days": int,
+ "schedule_days": [{"day_number": int, "date": str|null, "location": str, "scenes": [scene_id],
+  "setup_time_hours": float, "shoot_time_hours": float, "company_move_time_hours": float, "notes": str}],
+ "assumptions": [str]}
+
+CrewGearPackage:
+{"crew": [{"role": str, "responsibilities": str, "required": bool}],
+ "equipment": [{"item": str, "quantity": int, "required": bool}]}
+
+LegalClearanceReport:
+{"items": [{"category": str, "description": str, "required": bool, "high_risk": bool}],
+ "minors_involved": bool, "drone_permits_required": bool}
+
+RiskRegister:
+{"risks": [{"risk_id": str, "category": str, "description": str, "likelihood": "LOW"|"MEDIUM"|"HIGH",
+  "impact": "LOW"|"MEDIUM"|"HIGH", "mitigation_strategy": str}]}
+"""
+
+
+# Used when a near-duplicate planner input hits the plan-template cache
+PLAN_ADAPT_PROMPT = string.Template("""You previously produced the $kind JSON below for a similar input.
+Adapt it to the new input: keep the same JSON structure and keys, update every
+value the new input changes, and add or remove entries as needed.
+
+Return ONLY valid JSON, no additional text.
+---
+Previous $kind:
+$template
+
+New input:
+$new_input
+""")
+
+
+def call_tamus_api_with_plan_cache(kind: str, plan_input: str, prompt: str, max_tokens: int) -> str:
+    """
+    Generate a template-shaped plan, adapting a cached near-duplicate if any.
+    
+    With PLAN_CACHE=1, plan_input is embedded and matched against previously
+    stored plans of the same kind. On a hit the LLM gets a short "adapt this
+    plan" prompt instead of the full planning prompt.
+    
+    Args:
+        kind: Plan type, also the cache scope (e.g. "scene plan")
+        plan_input: The planner's variable input (what similarity is judged on)
+        prompt: Full planning prompt used on a miss
+        max_tokens: Response token budget
+        
+    Returns:
+        str: Raw LLM response
+    """
+    if plan_cache_enabled():
+        template = get_plan_cache().lookup(plan_input, kind, TAMUS_MODEL, max_tokens)
+        if template is not None:
+            print(f"  ✓ Adapting cached {kind} template")
+            prompt = PLAN_ADAPT_PROMPT.substitute(
+                kind=kind, template=template, new_input=plan_input
+            )
+    return call_tamus_api(prompt, max_tokens=max_tokens, system=PRODUCTION_SYSTEM_PROMPT,
+                          json_mode=True)
+
+
+def remember_plan(kind: str, plan_input: str, max_tokens: int, plan: Dict) -> None:
+    """Store a successfully parsed plan as a template for similar future inputs."""
+    if plan_cache_enabled():
+        get_plan_cache().add(plan_input, kind, TAMUS_MODEL, max_tokens, json.dumps(plan))
+
+
 def generate_synthetic_locations(scenes: List[Dict]) -> Dict:
     """Generate synthetic location data when API fails."""
     print("  → Generating synthetic location data...")
     
-    # Extract unique locations from scenes
+    # Extract unique locations from scenes (first occurrence keeps its type)
     unique_locations = {}
     for scene in scenes:
-        loc_desc = scene.get('location_description', 'Studio')
-        loc_type = scene.get('location_type', 'INT')
-        if loc_desc not in unique_locations:
-            unique_locations[loc_desc] = loc_type
-    
-    locations = []
-    for idx, (loc_desc, loc_type) in enumerate(unique_locations.items(), 1):
-        locations.append({
+        unique_locations.setdefault(
+            scene.get('location_description', 'Studio'),
+            scene.get('location_type', 'INT')
+        )
+    
+    locations = [
+        {
             "name": loc_desc,
             "type": loc_type,
             "description": f"Production location for {loc_desc}",
@@ -177,16 +679,30 @@ def generate_synthetic_locations(scenes: List[Dict]) -> Dict:
             ],
             "permits_required": loc_type == "EXT",
             "constraints": ["Weather dependent"] if loc_type == "EXT" else ["Noise control"]
-        })
+        }
+        for loc_desc, loc_type in unique_locations.items()
+    ]
     
     return {
         "locations": locations,
         "total_locations": len(locations),
-        "permits_needed": sum(1 for loc in locations if loc.get("permits_required", False)),
+        "permits_needed": sum(loc_type == "EXT" for loc_type in unique_locations.values()),
         "notes": "Synthetic data generated due to API timeout"
     }
 
 
+# Synthetic budget split: (category, description, min share, max share) of base cost
+_SYNTHETIC_BUDGET_LINES = (
+    ("Crew", "Director, DP, AD, Sound", 0.3, 0.4),
+    ("Equipment", "Camera, lighting, grip, sound rental", 0.2, 0.3),
+    ("Location", "Location fees and permits", 0.1, 0.15),
+    ("Talent", "Cast and extras", 0.15, 0.2),
+    ("Post-Production", "Editing, color, sound mix", 0.15, 0.2),
+    ("Insurance", "Production insurance", 0.05, 0.05),
+    ("Contingency", "Buffer for unexpected costs", 0.1, 0.125),
+)
+
+
 def generate_synthetic_budget(scenes: List[Dict]) -> Dict:
     """Generate synthetic budget data when API fails."""
     print("  → Generating synthetic budget data...")
@@ -194,18 +710,14 @@ def generate_synthetic_budget(scenes: List[Dict]) -> Dict:
     num_scenes = len(scenes)
     base_cost = num_scenes * 5000  # $5k per scene baseline
     
-    line_items = [
-        {"category": "Crew", "description": "Director, DP, AD, Sound", "min": base_cost * 0.3, "max": base_cost * 0.4},
-        {"category": "Equipment", "description": "Camera, lighting, grip, sound rental", "min": base_cost * 0.2, "max": base_cost * 0.3},
-        {"category": "Location", "description": "Location fees and permits", "min": base_cost * 0.1, "max": base_cost * 0.15},
-        {"category": "Talent", "description": "Cast and extras", "min": base_cost * 0.15, "max": base_cost * 0.2},
-        {"category": "Post-Production", "description": "Editing, color, sound mix", "min": base_cost * 0.15, "max": base_cost * 0.2},
-        {"category": "Insurance", "description": "Production insurance", "min": base_cost * 0.05, "max": base_cost * 0.05},
-        {"category": "Contingency", "description": "Buffer for unexpected costs", "min": base_cost * 0.1, "max": base_cost * 0.125}
-    ]
-    
-    total_min = sum(item["min"] for item in line_items)
-    total_max = sum(item["max"] for item in line_items)
+    line_items = []
+    total_min = total_max = 0
+    for category, description, min_pct, max_pct in _SYNTHETIC_BUDGET_LINES:
+        item_min = base_cost * min_pct
+        item_max = base_cost * max_pct
+        total_min += item_min
+        total_max += item_max
+        line_items.append({"category": category, "description": description, "min": item_min, "max": item_max})
     
     return {
         "line_items": line_items,
@@ -258,32 +770,91 @@ def generate_synthetic_schedule(scenes: List[Dict]) -> Dict:
     }
 
 
+class _SyntheticCrewRow(NamedTuple):
+    role: str
+    name: str
+    rate: int
+    days: int
+    required: bool
+
+
+class _SyntheticEquipmentRow(NamedTuple):
+    item: str
+    description: str
+    quantity: int
+    rate: int
+    days: int
+    required: bool
+
+
+class _SyntheticLegalRow(NamedTuple):
+    item: str
+    status: str
+    priority: str
+    notes: str
+
+
+class _SyntheticRiskRow(NamedTuple):
+    risk: str
+    category: str
+    likelihood: str
+    impact: str
+    mitigation: str
+
+
+# Static fallback catalogs: built once at import as tuples (no per-row dict),
+# with their aggregates precomputed. Generators copy them out as dicts because
+# pipeline state must stay JSON-serializable.
+_SYNTHETIC_CREW = (
+    _SyntheticCrewRow("Director", "TBD", 1500, 5, True),
+    _SyntheticCrewRow("Director of Photography", "TBD", 1200, 3, True),
+    _SyntheticCrewRow("1st AD", "TBD", 800, 3, True),
+    _SyntheticCrewRow("Sound Mixer", "TBD", 600, 3, True),
+    _SyntheticCrewRow("Gaffer", "TBD", 700, 3, True),
+    _SyntheticCrewRow("Key Grip", "TBD", 650, 3, False),
+)
+_SYNTHETIC_CREW_COST = sum(c.rate * c.days for c in _SYNTHETIC_CREW)
+
+_SYNTHETIC_EQUIPMENT = (
+    _SyntheticEquipmentRow("Camera Package", "Cinema camera with lenses", 1, 800, 3, True),
+    _SyntheticEquipmentRow("Lighting Package", "LED and tungsten lights", 1, 600, 3, True),
+    _SyntheticEquipmentRow("Grip Package", "Stands, flags, diffusion", 1, 400, 3, True),
+    _SyntheticEquipmentRow("Sound Package", "Boom, lavs, recorder", 1, 300, 3, True),
+    _SyntheticEquipmentRow("Monitors", "On-set monitoring", 2, 100, 3, False),
+)
+_SYNTHETIC_EQUIPMENT_COST = sum(e.rate * e.days for e in _SYNTHETIC_EQUIPMENT)
+
+_SYNTHETIC_LEGAL = (
+    _SyntheticLegalRow("Location Releases", "pending", "high", "Required for all locations"),
+    _SyntheticLegalRow("Talent Releases", "pending", "high", "Required for all cast"),
+    _SyntheticLegalRow("Music Licensing", "pending", "medium", "If using licensed music"),
+    _SyntheticLegalRow("Product Clearances", "pending", "medium", "For visible brands/products"),
+    _SyntheticLegalRow("Insurance Certificate", "pending", "high", "General liability required"),
+)
+_SYNTHETIC_LEGAL_HIGH = sum(1 for item in _SYNTHETIC_LEGAL if item.priority == "high")
+
+_SYNTHETIC_RISKS = (
+    _SyntheticRiskRow("Weather delays", "schedule", "medium", "medium",
+                      "Have backup indoor locations, monitor weather forecasts"),
+    _SyntheticRiskRow("Equipment failure", "technical", "low", "high",
+                      "Have backup equipment, test all gear before shoot"),
+    _SyntheticRiskRow("Talent unavailability", "personnel", "low", "high",
+                      "Have backup talent, confirm schedules in advance"),
+    _SyntheticRiskRow("Budget overrun", "financial", "medium", "medium",
+                      "Track expenses daily, maintain contingency fund"),
+)
+_SYNTHETIC_RISKS_HIGH = sum(1 for r in _SYNTHETIC_RISKS if r.impact == "high")
+
+
 def generate_synthetic_crew_gear(scenes: List[Dict]) -> Dict:
     """Generate synthetic crew and equipment data when API fails."""
     print("  → Generating synthetic crew/gear data...")
     
-    crew = [
-        {"role": "Director", "name": "TBD", "rate": 1500, "days": 5, "required": True},
-        {"role": "Director of Photography", "name": "TBD", "rate": 1200, "days": 3, "required": True},
-        {"role": "1st AD", "name": "TBD", "rate": 800, "days": 3, "required": True},
-        {"role": "Sound Mixer", "name": "TBD", "rate": 600, "days": 3, "required": True},
-        {"role": "Gaffer", "name": "TBD", "rate": 700, "days": 3, "required": True},
-        {"role": "Key Grip", "name": "TBD", "rate": 650, "days": 3, "required": False}
-    ]
-    
-    equipment = [
-        {"item": "Camera Package", "description": "Cinema camera with lenses", "quantity": 1, "rate": 800, "days": 3, "required": True},
-        {"item": "Lighting Package", "description": "LED and tungsten lights", "quantity": 1, "rate": 600, "days": 3, "required": True},
-        {"item": "Grip Package", "description": "Stands, flags, diffusion", "quantity": 1, "rate": 400, "days": 3, "required": True},
-        {"item": "Sound Package", "description": "Boom, lavs, recorder", "quantity": 1, "rate": 300, "days": 3, "required": True},
-        {"item": "Monitors", "description": "On-set monitoring", "quantity": 2, "rate": 100, "days": 3, "required": False}
-    ]
-    
     return {
-        "crew": crew,
-        "equipment": equipment,
-        "total_crew_cost": sum(c["rate"] * c["days"] for c in crew),
-        "total_equipment_cost": sum(e["rate"] * e["days"] for e in equipment),
+        "crew": [c._asdict() for c in _SYNTHETIC_CREW],
+        "equipment": [e._asdict() for e in _SYNTHETIC_EQUIPMENT],
+        "total_crew_cost": _SYNTHETIC_CREW_COST,
+        "total_equipment_cost": _SYNTHETIC_EQUIPMENT_COST,
         "notes": "Synthetic data generated due to API timeout"
     }
 
@@ -292,18 +863,10 @@ def generate_synthetic_legal(scenes: List[Dict]) -> Dict:
     """Generate synthetic legal clearance data when API fails."""
     print("  → Generating synthetic legal data...")
     
-    items = [
-        {"item": "Location Releases", "status": "pending", "priority": "high", "notes": "Required for all locations"},
-        {"item": "Talent Releases", "status": "pending", "priority": "high", "notes": "Required for all cast"},
-        {"item": "Music Licensing", "status": "pending", "priority": "medium", "notes": "If using licensed music"},
-        {"item": "Product Clearances", "status": "pending", "priority": "medium", "notes": "For visible brands/products"},
-        {"item": "Insurance Certificate", "status": "pending", "priority": "high", "notes": "General liability required"}
-    ]
-    
     return {
-        "items": items,
-        "high_risk_count": sum(1 for item in items if item["priority"] == "high"),
-        "pending_count": len(items),
+        "items": [item._asdict() for item in _SYNTHETIC_LEGAL],
+        "high_risk_count": _SYNTHETIC_LEGAL_HIGH,
+        "pending_count": len(_SYNTHETIC_LEGAL),
         "notes": "Synthetic data generated due to API timeout"
     }
 
@@ -312,40 +875,9 @@ def generate_synthetic_risks(scenes: List[Dict]) -> Dict:
     """Generate synthetic risk register data when API fails."""
     print("  → Generating synthetic risk data...")
     
-    risks = [
-        {
-            "risk": "Weather delays",
-            "category": "schedule",
-            "likelihood": "medium",
-            "impact": "medium",
-            "mitigation": "Have backup indoor locations, monitor weather forecasts"
-        },
-        {
-            "risk": "Equipment failure",
-            "category": "technical",
-            "likelihood": "low",
-            "impact": "high",
-            "mitigation": "Have backup equipment, test all gear before shoot"
-        },
-        {
-            "risk": "Talent unavailability",
-            "category": "personnel",
-            "likelihood": "low",
-            "impact": "high",
-            "mitigation": "Have backup talent, confirm schedules in advance"
-        },
-        {
-            "risk": "Budget overrun",
-            "category": "financial",
-            "likelihood": "medium",
-            "impact": "medium",
-            "mitigation": "Track expenses daily, maintain contingency fund"
-        }
-    ]
-    
     return {
-        "risks": risks,
-        "high_priority_count": sum(1 for r in risks if r["impact"] == "high"),
+        "risks": [r._asdict() for r in _SYNTHETIC_RISKS],
+        "high_priority_count": _SYNTHETIC_RISKS_HIGH,
         "notes": "Synthetic data generated due to API timeout"
     }
 
@@ -358,6 +890,7 @@ class StoryboardFrame(TypedDict):
     """Storyboard frame with image and description."""
     frame_number: int
     description: str
+    image_prompt: str
     image_url: str
     duration_sec: float
 
@@ -385,6 +918,7 @@ class State(TypedDict):
     # Production planning fields
     creative_brief: CreativeBrief
     scene_plan: ScenePlan
+    scene_stats: Dict  # Aggregates over scene_plan["scenes"], see compute_scene_stats
     locations_plan: LocationsPlan
     budget_estimate: BudgetEstimate
     schedule_plan: SchedulePlan
@@ -397,20 +931,14 @@ class State(TypedDict):
 
 
 # ============================================================================
-# CREATIVE CHAIN NODES (PRESERVED FROM ORIGINAL PIPELINE)
+# PROMPT TEMPLATES
 # ============================================================================
+# Static instructions come first and per-request data last, so repeated runs
+# share an identical prompt prefix that provider-side prompt caches can reuse.
 
-def ad_concept_creation_node(state: State) -> Dict:
-    """Generate ad concept from theme using TAMUS API."""
-    print("------ENTERING: CONCEPT CREATION NODE------")
-    
-    theme = state.get("theme", "")
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
-    
-    prompt = f"""You are an intelligent advertisement concept creator.
-    
-Brand: {brand_name}
-Theme: {theme}
+PROMPT_SEPARATOR = "\n---\n"
+
+CONCEPT_INSTRUCTIONS = """You are an intelligent advertisement concept creator.
 
 Create a compelling advertisement concept that:
 1. Captures the brand essence
@@ -424,99 +952,195 @@ Provide a detailed concept description including:
 - Emotional tone
 - Key scenes or moments
 """
-    
-    concept = call_tamus_api(prompt)
-    print(f"Generated Concept: {concept[:200]}...")
-    
-    return {"concept": concept, "overall_status": "Concept created. "}
 
+# Both screenplay variants share everything up to and including the concept;
+# only the short style block at the end differs, so the second request can
+# reuse the provider's cached prefix from the first
+SCREENPLAY_INSTRUCTIONS = """You are a screenplay writer for advertisements.
 
-def screen_play_creation_node_1(state: State) -> Dict:
-    """Generate Rajamouli-style screenplay."""
-    print("------ENTERING: SCREENPLAY CREATION NODE 1 (RAJAMOULI STYLE)------")
-    
-    concept = state.get("concept", "")
-    duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
-    
-    prompt = f"""You are a screenplay writer for advertisements in the style of SS RAJAMOULI.
-
-Concept: {concept}
-Duration: {duration} seconds
-Brand: {brand_name}
-
-Write a screenplay with 5 scenes using SS RAJAMOULI's signature style:
-- EPIC, LARGER-THAN-LIFE visuals
-- GRAND SCALE with sweeping camera movements
-- DRAMATIC moments with powerful emotions
-- HEROIC framing and mythological undertones
-- SWEEPING cinematography
+Write a screenplay with 5 scenes for the concept below, in the director's
+signature style given at the end.
 
 Format each scene as:
 - Scene number
 - Duration (seconds)
-- Visual description (epic and grand)
+- Visual description
 - Action/movement
-- Dialogue/voiceover (powerful and impactful)
-- Camera angle (sweeping, dramatic)
+- Dialogue/voiceover
+- Camera angle
 
 Example format:
 Scene 1 (6 seconds)
-Visual: [epic description]
+Visual: [description]
 Action: [movement]
-Dialogue: [powerful voiceover]
-Camera: [dramatic angle]
+Dialogue: [voiceover]
+Camera: [angle]
+"""
+
+RAJAMOULI_STYLE = """Style: SS RAJAMOULI's signature style:
+- EPIC, LARGER-THAN-LIFE visuals
+- GRAND SCALE with sweeping camera movements
+- DRAMATIC moments with powerful emotions
+- HEROIC framing and mythological undertones
+- SWEEPING cinematography
+
+Visuals are epic and grand, dialogue/voiceover powerful and impactful,
+camera angles sweeping and dramatic.
 
 Generate the complete screenplay now in RAJAMOULI STYLE."""
+
+SHANKAR_STYLE = """Style: SHANKAR's signature style:
+- HIGH-TECH, FUTURISTIC visuals
+- CUTTING-EDGE technology and innovation
+- SLEEK, MODERN aesthetics with cutting-edge technology
+- INNOVATIVE camera work and visual effects
+- SOCIAL MESSAGE woven into the narrative
+
+Visuals are high-tech and futuristic, dialogue/voiceover impactful with a
+social message, camera angles innovative and modern.
+
+Generate the complete screenplay now in SHANKAR STYLE."""
+
+STORYBOARD_BREAKDOWN_INSTRUCTIONS = """Based on the screenplay below, create a detailed storyboard breakdown.
+
+For each key scene, provide:
+1. Frame number
+2. Visual description (detailed, suitable for image generation)
+3. Image prompt: a self-contained prompt for an image model that names the
+   brand, restates the scene, and ends with the style directive
+   "Cinematic, professional advertising, high quality, detailed composition, 16:9 aspect ratio."
+4. Duration in seconds
+
+Format as JSON array with this structure:
+[
+  {
+    "frame_number": 1,
+    "description": "Detailed visual description",
+    "image_prompt": "Professional storyboard frame for a <brand> advertisement: ... Cinematic, professional advertising, high quality, detailed composition, 16:9 aspect ratio.",
+    "duration_sec": 5.0
+  }
+]
+
+Return ONLY valid JSON, no additional text.
+"""
+
+
+# Full prompts, pre-joined once at import. Only the $placeholders are filled
+# per call, and substituted values are never re-scanned, so braces or $ in
+# user input (brand, concept text) are inserted verbatim.
+CONCEPT_PROMPT = string.Template(CONCEPT_INSTRUCTIONS + PROMPT_SEPARATOR + """Brand: $brand_name
+Theme: $theme
+""")
+
+SCREENPLAY_PROMPT = string.Template(SCREENPLAY_INSTRUCTIONS + PROMPT_SEPARATOR + """Concept: $concept
+Duration: $duration seconds
+Brand: $brand_name
+""" + PROMPT_SEPARATOR + "$style")
+
+STORYBOARD_BREAKDOWN_PROMPT = string.Template(STORYBOARD_BREAKDOWN_INSTRUCTIONS + PROMPT_SEPARATOR + """Brand: $brand_name
+
+Screenplay:
+$screenplay
+
+Target Duration: $duration seconds
+""")
+
+
+# ============================================================================
+# CREATIVE CHAIN NODES (PRESERVED FROM ORIGINAL PIPELINE)
+# ============================================================================
+
+def ad_concept_creation_node(state: State) -> Dict:
+    """Generate ad concept from theme using TAMUS API."""
+    print("------ENTERING: CONCEPT CREATION NODE------")
+    
+    theme = state.get("theme", "")
+    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
+    
+    prompt = CONCEPT_PROMPT.substitute(brand_name=brand_name, theme=theme)
+    
+    concept = call_tamus_api(prompt, semantic_scope=brand_name)
+    print(f"Generated Concept: {concept[:200]}...")
+    
+    return {"concept": concept, "overall_status": "Concept created. "}
+
+
+async def _create_screenplay(state: State, style_name: str, style: str) -> str:
+    """
+    Generate one screenplay variant from the shared prompt prefix.
     
-    screenplay = call_tamus_api(prompt)
+    Args:
+        state: Pipeline state with the concept and creative brief
+        style_name: Short variant name; scopes the semantic cache so the two
+            near-identical prompts never serve each other's screenplay
+        style: Style block appended after the shared prefix
+        
+    Returns:
+        str: Screenplay text
+    """
+    brief = state.get("creative_brief", {})
+    brand_name = brief.get("brand_name", "Brand")
+    
+    prompt = SCREENPLAY_PROMPT.substitute(
+        concept=state.get("concept", ""),
+        duration=brief.get("target_duration_sec", 30),
+        brand_name=brand_name,
+        style=style
+    )
+    return await acall_tamus_api(prompt, semantic_scope=f"{brand_name}/{style_name}")
+
+
+async def screen_play_creation_node_1(state: State) -> Dict:
+    """Generate Rajamouli-style screenplay."""
+    print("------ENTERING: SCREENPLAY CREATION NODE 1 (RAJAMOULI STYLE)------")
+    
+    screenplay = await _create_screenplay(state, "rajamouli", RAJAMOULI_STYLE)
     print(f"Generated Rajamouli Screenplay: {screenplay[:200]}...")
     
     return {"screenplay_1": screenplay, "overall_status": "Rajamouli screenplay created. "}
 
 
-def screen_play_creation_node_2(state: State) -> Dict:
+async def screen_play_creation_node_2(state: State) -> Dict:
     """Generate Shankar-style screenplay."""
     print("------ENTERING: SCREENPLAY CREATION NODE 2 (SHANKAR STYLE)------")
     
-    concept = state.get("concept", "")
-    duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
+    screenplay = await _create_screenplay(state, "shankar", SHANKAR_STYLE)
+    print(f"Generated Shankar Screenplay: {screenplay[:200]}...")
     
-    prompt = f"""You are a screenplay writer for advertisements in the style of SHANKAR.
+    return {"screenplay_2": screenplay, "overall_status": "Shankar screenplay created. "}
 
-Concept: {concept}
-Duration: {duration} seconds
-Brand: {brand_name}
 
-Write a screenplay with 5 scenes using SHANKAR's signature style:
-- HIGH-TECH, FUTURISTIC visuals
-- CUTTING-EDGE technology and innovation
-- SLEEK, MODERN aesthetics with cutting-edge technology
-- INNOVATIVE camera work and visual effects
-- SOCIAL MESSAGE woven into the narrative
+def _auto_approve_enabled() -> bool:
+    """Return True when HITL gates should answer themselves (AUTO_APPROVE=1 or no TTY)."""
+    if os.getenv("AUTO_APPROVE", "0").lower() in ("1", "true", "yes"):
+        return True
+    return sys.stdin is None or not sys.stdin.isatty()
 
-Format each scene as:
-- Scene number
-- Duration (seconds)
-- Visual description (high-tech and futuristic)
-- Action/movement
-- Dialogue/voiceover (impactful with social message)
-- Camera angle (innovative and modern)
 
-Example format:
-Scene 1 (6 seconds)
-Visual: [futuristic description]
-Action: [movement]
-Dialogue: [impactful voiceover]
-Camera: [innovative angle]
-
-Generate the complete screenplay now in SHANKAR STYLE."""
+def _request_human_input(question: str, context: Dict, default: str) -> str:
+    """
+    Pause the graph for a human decision at a HITL gate.
     
-    screenplay = call_tamus_api(prompt)
-    print(f"Generated Shankar Screenplay: {screenplay[:200]}...")
+    With langgraph's interrupt() the graph checkpoints and hands control back
+    to the caller, which resumes it with Command(resume=answer) (see
+    run_production_pipeline), so no worker thread sits blocked on stdin.
+    Falls back to input() when interrupt() is unavailable. Non-interactive
+    runs (CI, batch evaluations) take the default answer instead of waiting.
     
-    return {"screenplay_2": screenplay, "overall_status": "Shankar screenplay created. "}
+    Args:
+        question: Prompt shown to the reviewer
+        context: Extra payload surfaced to the caller with the interrupt
+        default: Answer used when auto-approval is enabled
+        
+    Returns:
+        str: The reviewer's answer
+    """
+    if _auto_approve_enabled():
+        print(f"✓ Auto-approving {context.get('gate', 'gate')} (answer: {default})")
+        return default
+    if interrupt is None:
+        return input(question)
+    return interrupt({"question": question, **context})
 
 
 def screenplay_evaluation_node(state: State) -> Dict:
@@ -532,7 +1156,15 @@ def screenplay_evaluation_node(state: State) -> Dict:
     print(state.get("screenplay_2", "")[:500])
     print("\n" + "="*50 + "\n")
     
-    user_input = input("Which screenplay did you like? Enter 1 (Rajamouli) or 2 (Shankar): ")
+    user_input = _request_human_input(
+        "Which screenplay did you like? Enter 1 (Rajamouli) or 2 (Shankar): ",
+        {
+            "gate": "screenplay_selection",
+            "variant_a": state.get("screenplay_1", "")[:500],
+            "variant_b": state.get("screenplay_2", "")[:500],
+        },
+        default="1"
+    )
     
     if user_input == "1":
         screenplay_winner = state.get("screenplay_1", "")
@@ -544,128 +1176,124 @@ def screenplay_evaluation_node(state: State) -> Dict:
     return {"screenplay_winner": screenplay_winner, "overall_status": "Screenplay selected. "}
 
 
-def story_board_creation_node(state: State) -> Dict:
-    """Generate storyboard frames using Gemini 2.5 Flash."""
-    print("------ENTERING: STORY BOARD CREATION NODE------")
-    
-    screenplay = state.get("screenplay_winner", "")
-    duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
-    
-    # Step 1: Generate storyboard breakdown (text descriptions)
-    prompt = f"""Based on this screenplay, create a detailed storyboard breakdown:
+# Maximum number of concurrent Gemini image requests
+STORYBOARD_IMAGE_CONCURRENCY = 8
 
-Screenplay:
-{screenplay}
 
-Target Duration: {duration} seconds
+@functools.lru_cache(maxsize=4)
+def _get_gemini_client(api_key: str):
+    """Return the process-wide google-genai Client for api_key, creating it once."""
+    return genai.Client(api_key=api_key)
 
-For each key scene, provide:
-1. Frame number
-2. Visual description (detailed, suitable for image generation)
-3. Duration in seconds
 
-Format as JSON array with this structure:
-[
-  {{
-    "frame_number": 1,
-    "description": "Detailed visual description",
-    "duration_sec": 5.0
-  }}
-]
+def _text_only_frame(frame_data: Dict) -> Dict:
+    """Build a storyboard frame without an image."""
+    return {
+        "frame_number": frame_data.get("frame_number", 0),
+        "description": frame_data.get("description", ""),
+        "image_prompt": frame_data.get("image_prompt", ""),
+        "image_url": None,
+        "duration_sec": frame_data.get("duration_sec", 5.0)
+    }
 
-Return ONLY valid JSON, no additional text.
-"""
+
+async def _generate_storyboard_images(client, frames_data: List[Dict], brand_name: str) -> List[Dict]:
+    """
+    Generate images for all storyboard frames concurrently.
     
-    storyboard_text = call_tamus_api(prompt, max_tokens=2000)
+    Each frame's blocking Gemini call is offloaded to a worker thread and the
+    number of in-flight requests is capped by a semaphore. Frames are
+    reported as they complete (asyncio.as_completed) rather than after the
+    slowest one. Frames whose image generation fails keep their description
+    with image_url=None.
     
-    # Step 2: Parse storyboard JSON
-    storyboard_frames = []
-    try:
-        frames_data = json.loads(storyboard_text)
+    Args:
+        client: google-genai Client instance
+        frames_data: Parsed storyboard frames from the LLM
+        brand_name: Brand name used in the image prompt
         
-        # Step 3: Generate images for each frame using Gemini 2.5 Flash
-        print(f"Generating {len(frames_data)} storyboard images with Gemini 2.5 Flash...")
+    Returns:
+        List[Dict]: Storyboard frames in the original order
+    """
+    semaphore = asyncio.Semaphore(STORYBOARD_IMAGE_CONCURRENCY)
+    
+    async def _gen_frame(index: int, frame_data: Dict):
+        frame_num = frame_data.get("frame_number", 0)
+        description = frame_data.get("description", "")
         
-        try:
-            import google.genai as genai
-            
-            # Initialize Gemini client
-            gemini_api_key = os.getenv("GEMINI_API_KEY")
-            if not gemini_api_key:
-                print("⚠ GEMINI_API_KEY not set - skipping image generation")
-                # Return text-only storyboard
-                for frame_data in frames_data:
-                    storyboard_frames.append({
-                        "frame_number": frame_data.get("frame_number", 0),
-                        "description": frame_data.get("description", ""),
-                        "image_url": None,  # No image generated
-                        "duration_sec": frame_data.get("duration_sec", 5.0)
-                    })
-            else:
-                client = genai.Client(api_key=gemini_api_key)
-                
-                for frame_data in frames_data:
-                    frame_num = frame_data.get("frame_number", 0)
-                    description = frame_data.get("description", "")
-                    duration = frame_data.get("duration_sec", 5.0)
-                    
-                    # Generate image with Gemini 2.5 Flash
-                    image_prompt = f"""Create a professional storyboard frame for a {brand_name} advertisement.
+        # The storyboard LLM call writes the full image prompt; the template
+        # is only a fallback for frames where it was omitted
+        image_prompt = frame_data.get("image_prompt") or f"""Create a professional storyboard frame for a {brand_name} advertisement.
 
 Scene Description: {description}
 
 Style: Cinematic, professional advertising, high quality, detailed composition.
 Format: 16:9 aspect ratio, suitable for video production."""
-                    
-                    try:
-                        # Generate image using Gemini 2.5 Flash
-                        response = client.models.generate_images(
-                            model="gemini-2.5-flash",
-                            prompt=image_prompt,
-                            config={
-                                "number_of_images": 1,
-                                "aspect_ratio": "16:9"
-                            }
-                        )
-                        
-                        # Extract image URL from response
-                        image_url = None
-                        if hasattr(response, 'generated_images') and len(response.generated_images) > 0:
-                            image_url = response.generated_images[0].image.url
-                        
-                        storyboard_frames.append({
-                            "frame_number": frame_num,
-                            "description": description,
-                            "image_url": image_url,
-                            "duration_sec": duration
-                        })
-                        
-                        print(f"  ✓ Generated frame {frame_num}")
-                        
-                    except Exception as img_error:
-                        print(f"  ⚠ Failed to generate image for frame {frame_num}: {img_error}")
-                        # Add frame without image
-                        storyboard_frames.append({
-                            "frame_number": frame_num,
-                            "description": description,
-                            "image_url": None,
-                            "duration_sec": duration
-                        })
-                
-                print(f"✓ Generated {len(storyboard_frames)} storyboard frames")
-                
-        except ImportError:
-            print("⚠ google-genai package not installed - skipping image generation")
-            # Return text-only storyboard
-            for frame_data in frames_data:
-                storyboard_frames.append({
-                    "frame_number": frame_data.get("frame_number", 0),
-                    "description": frame_data.get("description", ""),
-                    "image_url": None,
-                    "duration_sec": frame_data.get("duration_sec", 5.0)
-                })
         
+        try:
+            async with semaphore, get_rate_limiter("gemini"):
+                response = await asyncio.to_thread(
+                    client.models.generate_images,
+                    model="gemini-2.5-flash",
+                    prompt=image_prompt,
+                    config={
+                        "number_of_images": 1,
+                        "aspect_ratio": "16:9"
+                    }
+                )
+        except Exception as e:
+            print(f"  ⚠ Failed to generate image for frame {frame_num}: {e}")
+            # Keep frame without image
+            return index, _text_only_frame(frame_data)
+        
+        # Extract image URL from response
+        image_url = None
+        if hasattr(response, 'generated_images') and len(response.generated_images) > 0:
+            image_url = response.generated_images[0].image.url
+        
+        return index, {
+            "frame_number": frame_num,
+            "description": description,
+            "image_prompt": image_prompt,
+            "image_url": image_url,
+            "duration_sec": frame_data.get("duration_sec", 5.0)
+        }
+    
+    storyboard_frames: List[Optional[Dict]] = [None] * len(frames_data)
+    tasks = [_gen_frame(index, frame_data) for index, frame_data in enumerate(frames_data)]
+    for done, next_frame in enumerate(asyncio.as_completed(tasks), 1):
+        index, frame = await next_frame
+        storyboard_frames[index] = frame
+        print(f"  ✓ Generated frame {frame['frame_number']} ({done}/{len(tasks)})")
+    
+    return storyboard_frames
+
+
+async def story_board_creation_node(state: State) -> Dict:
+    """
+    Generate the storyboard breakdown (text descriptions).
+    
+    Images are rendered separately by storyboard_image_node, which runs
+    alongside scene breakdown since that only needs the text.
+    """
+    print("------ENTERING: STORY BOARD CREATION NODE------")
+    
+    screenplay = state.get("screenplay_winner", "")
+    duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
+    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
+    
+    # Step 1: Generate storyboard breakdown (text descriptions + image prompts)
+    prompt = STORYBOARD_BREAKDOWN_PROMPT.substitute(
+        brand_name=brand_name, screenplay=screenplay, duration=duration
+    )
+    
+    # Extra headroom for the per-frame image prompts
+    storyboard_text = await acall_tamus_api(prompt, max_tokens=OUTPUT_BUDGETS["storyboard"])
+    
+    # Step 2: Parse storyboard JSON into text-only frames
+    try:
+        frames_data = await aparse_llm_json(storyboard_text)
+        storyboard_frames = [_text_only_frame(frame_data) for frame_data in frames_data]
     except json.JSONDecodeError as e:
         print(f"⚠ Failed to parse storyboard JSON: {e}")
         print(f"Response: {storyboard_text[:200]}...")
@@ -679,10 +1307,101 @@ Format: 16:9 aspect ratio, suitable for video production."""
     }
 
 
+async def storyboard_image_node(state: State) -> Dict:
+    """Render storyboard frame images using Gemini 2.5 Flash."""
+    print("------ENTERING: STORYBOARD IMAGE NODE------")
+    
+    frames_data = state.get("storyboard_frames", [])
+    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
+    
+    if not frames_data:
+        return {"overall_status": "Storyboard images skipped. "}
+    
+    # Step 3: Generate images for each frame using Gemini 2.5 Flash
+    print(f"Generating {len(frames_data)} storyboard images with Gemini 2.5 Flash...")
+    
+    if not _HAS_GENAI:
+        print("⚠ google-genai package not installed - skipping image generation")
+        return {"overall_status": "Storyboard images skipped. "}
+    
+    # Initialize Gemini client
+    gemini_api_key = os.getenv("GEMINI_API_KEY")
+    if not gemini_api_key:
+        print("⚠ GEMINI_API_KEY not set - skipping image generation")
+        return {"overall_status": "Storyboard images skipped. "}
+    
+    client = _get_gemini_client(gemini_api_key)
+    
+    # Fan out all frame requests concurrently (I/O-bound remote calls)
+    storyboard_frames = await _generate_storyboard_images(client, frames_data, brand_name)
+    
+    print(f"✓ Generated {len(storyboard_frames)} storyboard frames")
+    
+    return {
+        "storyboard_frames": storyboard_frames,
+        "overall_status": "Storyboard images generated. "
+    }
+
+
 # ============================================================================
 # PRODUCTION PLANNING NODES
 # ============================================================================
 
+def compute_scene_stats(scenes: List[Dict]) -> Dict:
+    """
+    Aggregate the per-scene figures the planners need in a single pass.
+    
+    Props and wardrobe are de-duplicated and sorted, so prompts built from
+    them (and their cache keys) don't depend on scene order.
+    
+    Args:
+        scenes: scene_plan["scenes"]
+        
+    Returns:
+        Dict: scene_count, total_cast, total_duration, ext_scene_count,
+        night_scene_count, scenes_by_location, props, wardrobe
+    """
+    total_cast = 0
+    total_duration = 0
+    ext_scene_count = 0
+    night_scene_count = 0
+    scenes_by_location: Dict[str, List[str]] = {}
+    props = set()
+    wardrobe = set()
+    
+    for scene in scenes:
+        total_cast += scene.get("cast_count", 0)
+        total_duration += scene.get("duration_sec", 0)
+        if scene.get("location_type") == "EXT":
+            ext_scene_count += 1
+        if scene.get("time_of_day") == "NIGHT":
+            night_scene_count += 1
+        scenes_by_location.setdefault(
+            scene.get("location_description", "Unknown"), []
+        ).append(scene.get("scene_id", ""))
+        props.update(scene.get("props", ()))
+        wardrobe.update(scene.get("wardrobe", ()))
+    
+    return {
+        "scene_count": len(scenes),
+        "total_cast": total_cast,
+        "total_duration": total_duration,
+        "ext_scene_count": ext_scene_count,
+        "night_scene_count": night_scene_count,
+        "scenes_by_location": scenes_by_location,
+        "props": sorted(props, key=str),
+        "wardrobe": sorted(wardrobe, key=str),
+    }
+
+
+def _scene_stats(state: State) -> Dict:
+    """Return the scene stats from state, computing them if absent."""
+    stats = state.get("scene_stats")
+    if stats is None:
+        stats = compute_scene_stats(state.get("scene_plan", {}).get("scenes", []))
+    return stats
+
+
 def scene_breakdown_node(state: State) -> Dict:
     """Break down storyboard into structured scene plan with shots."""
     print("------ENTERING: SCENE BREAKDOWN NODE------")
@@ -691,19 +1410,17 @@ def scene_breakdown_node(state: State) -> Dict:
     duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
     brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
     
-    prompt = f"""You are a production planning specialist. Convert the following storyboard into a detailed scene plan.
-
-Storyboard:
+    plan_input = f"""Storyboard:
 {storyboard}
 
 Brand: {brand_name}
 Target Duration: {duration} seconds
+"""
+    
+    prompt = f"""You are a production planning specialist. Convert the following storyboard into a detailed scene plan.
 
-Generate a scene plan in strict JSON format with:
-- scenes: array of scene objects with scene_id, duration_sec, location_type (INT/EXT), time_of_day (DAY/NIGHT), 
-  location_description, cast_count, props, wardrobe, sfx_vfx, dialogue_vo, on_screen_text
-- shots: array of shot objects with shot_id, scene_id, shot_type (WIDE/MEDIUM/CLOSE-UP/INSERT/POV), 
-  camera_movement (STATIC/PAN/TILT/DOLLY/STEADICAM), duration_sec, description
+{plan_input}
+Generate the scene plan as JSON matching the ScenePlan schema.
 
 Requirements:
 - Each scene must have 2-5 shots
@@ -714,23 +1431,35 @@ Requirements:
 Return ONLY valid JSON, no additional text.
 """
     
-    # Increased max_tokens to 6000 to accommodate reasoning tokens + output
-    scene_plan_json = call_tamus_api(prompt, max_tokens=6000)
-    
     try:
-        # Extract JSON from response (handles markdown code blocks)
-        clean_json = extract_json_from_llm_response(scene_plan_json)
-        scene_plan = json.loads(clean_json)
-        print(f"✓ Generated scene plan with {len(scene_plan.get('scenes', []))} scenes")
-        return {"scene_plan": scene_plan, "overall_status": "Scene plan created. "}
+        scene_plan_json = call_tamus_api_with_plan_cache(
+            "scene plan", plan_input, prompt, OUTPUT_BUDGETS["scene_breakdown"]
+        )
+        scene_plan = parse_llm_json(scene_plan_json)
+        remember_plan("scene plan", plan_input, OUTPUT_BUDGETS["scene_breakdown"], scene_plan)
+        log_node_event("scene_breakdown", "complete", scenes=len(scene_plan.get("scenes", [])),
+                       shots=len(scene_plan.get("shots", [])))
+        return {
+            "scene_plan": scene_plan,
+            "scene_stats": compute_scene_stats(scene_plan.get("scenes", [])),
+            "overall_status": "Scene plan created. "
+        }
     except json.JSONDecodeError as e:
-        print(f"⚠ Error parsing scene plan JSON: {e}")
-        print(f"  Response preview: {scene_plan_json[:200]}...")
+        log_node_event("scene_breakdown", "fallback", error=str(e), preview=scene_plan_json[:200])
         # Return empty scene plan instead of failing
         return {
             "scene_plan": {"scenes": [], "shots": []},
+            "scene_stats": compute_scene_stats([]),
             "overall_status": f"Scene plan parsing failed, using empty plan. "
         }
+    except (TimeoutError, ValueError) as e:
+        # TAMUS timed out, the circuit breaker is open, or the reply was empty
+        log_node_event("scene_breakdown", "fallback", error=str(e))
+        return {
+            "scene_plan": {"scenes": [], "shots": []},
+            "scene_stats": compute_scene_stats([]),
+            "overall_status": "Scene plan unavailable, using empty plan. "
+        }
 
 
 def scene_plan_approval_gate(state: State) -> Dict:
@@ -741,20 +1470,28 @@ def scene_plan_approval_gate(state: State) -> Dict:
     scenes = scene_plan.get("scenes", [])
     shots = scene_plan.get("shots", [])
     
-    print("\n=== SCENE PLAN SUMMARY ===")
-    print(f"Total Scenes: {len(scenes)}")
-    print(f"Total Shots: {len(shots)}")
-    print(f"Total Duration: {sum(s.get('duration_sec', 0) for s in scenes):.1f} seconds")
+    summary = [
+        "\n=== SCENE PLAN SUMMARY ===",
+        f"Total Scenes: {len(scenes)}",
+        f"Total Shots: {len(shots)}",
+        f"Total Duration: {_scene_stats(state)['total_duration']:.1f} seconds",
+    ]
     
-    # Show scene breakdown
-    for scene in scenes:
-        print(f"\n{scene.get('scene_id')}: {scene.get('location_description')}")
-        print(f"  Type: {scene.get('location_type')} - {scene.get('time_of_day')}")
-        print(f"  Duration: {scene.get('duration_sec')}s")
-        print(f"  Cast: {scene.get('cast_count')}")
-        print(f"  Props: {', '.join(scene.get('props', []))}")
+    # The per-scene breakdown is only for a human reviewer
+    if not _auto_approve_enabled():
+        for scene in scenes:
+            summary.append(
+                f"\n{scene.get('scene_id')}: {scene.get('location_description')}\n"
+                f"  Type: {scene.get('location_type')} - {scene.get('time_of_day')}\n"
+                f"  Duration: {scene.get('duration_sec')}s\n"
+                f"  Cast: {scene.get('cast_count')}\n"
+                f"  Props: {', '.join(scene.get('props', []))}"
+            )
+    print("\n".join(summary))
     
-    approval = input("\nApprove scene plan? (yes/no): ").lower()
+    approval = _request_human_input(
+        "\nApprove scene plan? (yes/no): ", {"gate": "scene_plan_approval"}, default="yes"
+    ).lower()
     
     if approval == "yes":
         return {"overall_status": "Scene plan approved. "}
@@ -764,16 +1501,18 @@ def scene_plan_approval_gate(state: State) -> Dict:
 
 def location_planning_node(state: State) -> Dict:
     """Generate location requirements and permit checklist."""
-    print("------ENTERING: LOCATION PLANNING NODE------")
-    
     scene_plan = state.get("scene_plan", {})
     scenes = scene_plan.get("scenes", [])
     
-    # Extract unique locations
-    locations_text = "\n".join([
-        f"- {s.get('location_description', 'Unknown')} ({s.get('location_type', 'INT')} - {s.get('time_of_day', 'DAY')})"
+    # Extract unique locations (first-seen order); repeats only cost prompt tokens
+    unique_locations = dict.fromkeys(
+        (s.get('location_description', 'Unknown'), s.get('location_type', 'INT'), s.get('time_of_day', 'DAY'))
         for s in scenes
-    ])
+    )
+    locations_text = "\n".join(
+        f"- {description} ({location_type} - {time_of_day})"
+        for description, location_type, time_of_day in unique_locations
+    )
     
     prompt = f"""You are a location scout. Generate location requirements for these scenes:
 
@@ -789,31 +1528,30 @@ Return as JSON matching LocationsPlan schema with locations array and permit fie
 """
     
     try:
-        # Increased max_tokens to 8000 to accommodate reasoning tokens + output
-        locations_json = call_tamus_api(prompt, max_tokens=8000)
-        # Extract JSON from response
-        clean_json = extract_json_from_llm_response(locations_json)
-        locations_plan = json.loads(clean_json)
-        print(f"✓ Generated locations plan with {len(locations_plan.get('locations', []))} locations")
+        locations_json = call_tamus_api_with_plan_cache(
+            "locations plan", locations_text, prompt, OUTPUT_BUDGETS["location_planning"]
+        )
+        locations_plan = parse_llm_json(locations_json)
+        remember_plan("locations plan", locations_text, OUTPUT_BUDGETS["location_planning"], locations_plan)
+        log_node_event("location_planning", "complete", locations=len(locations_plan.get("locations", [])))
         return {"locations_plan": locations_plan, "overall_status": "Locations plan created. "}
     except TimeoutError:
-        print(f"⚠ API timeout - using synthetic location data")
+        log_node_event("location_planning", "fallback", error="timeout")
         locations_plan = generate_synthetic_locations(scenes)
         return {"locations_plan": locations_plan, "overall_status": "Locations plan created (synthetic). "}
     except (json.JSONDecodeError, Exception) as e:
-        print(f"⚠ Error: {e} - using synthetic location data")
+        log_node_event("location_planning", "fallback", error=str(e))
         locations_plan = generate_synthetic_locations(scenes)
         return {"locations_plan": locations_plan, "overall_status": "Locations plan created (synthetic). "}
 
 
 def budgeting_node(state: State) -> Dict:
     """Generate budget estimate with line items."""
-    print("------ENTERING: BUDGETING NODE------")
-    
     scene_plan = state.get("scene_plan", {})
     scenes = scene_plan.get("scenes", [])
     
-    scene_summary = f"Total scenes: {len(scenes)}, Total cast: {sum(s.get('cast_count', 0) for s in scenes)}"
+    stats = _scene_stats(state)
+    scene_summary = f"Total scenes: {stats['scene_count']}, Total cast: {stats['total_cast']}"
     
     prompt = f"""You are a production budget estimator. Generate a detailed budget for this production:
 
@@ -836,43 +1574,33 @@ Return as JSON matching BudgetEstimate schema.
 """
     
     try:
-        # Increased max_tokens to 8000 to accommodate reasoning tokens + output
-        budget_json = call_tamus_api(prompt, max_tokens=8000)
-        # Extract JSON from response
-        clean_json = extract_json_from_llm_response(budget_json)
-        budget_estimate = json.loads(clean_json)
-        total_min = budget_estimate.get("total_min", 0)
-        total_max = budget_estimate.get("total_max", 0)
-        print(f"✓ Generated budget estimate: ${total_min:,.0f} - ${total_max:,.0f}")
+        budget_json = call_tamus_api(prompt, max_tokens=OUTPUT_BUDGETS["budgeting"],
+                                     system=PRODUCTION_SYSTEM_PROMPT, json_mode=True)
+        budget_estimate = parse_llm_json(budget_json)
+        log_node_event("budgeting", "complete", total_min=budget_estimate.get("total_min", 0),
+                       total_max=budget_estimate.get("total_max", 0))
         return {"budget_estimate": budget_estimate, "overall_status": "Budget estimate created. "}
     except TimeoutError:
-        print(f"⚠ API timeout - using synthetic budget data")
+        log_node_event("budgeting", "fallback", error="timeout")
         budget_estimate = generate_synthetic_budget(scenes)
         return {"budget_estimate": budget_estimate, "overall_status": "Budget estimate created (synthetic). "}
     except (json.JSONDecodeError, Exception) as e:
-        print(f"⚠ Error: {e} - using synthetic budget data")
+        log_node_event("budgeting", "fallback", error=str(e))
         budget_estimate = generate_synthetic_budget(scenes)
         return {"budget_estimate": budget_estimate, "overall_status": "Budget estimate created (synthetic). "}
 
 
 def schedule_ad_node(state: State) -> Dict:
     """Generate shoot schedule with days and company moves."""
-    print("------ENTERING: SCHEDULE PLANNING NODE------")
-    
     scene_plan = state.get("scene_plan", {})
     scenes = scene_plan.get("scenes", [])
     
-    scenes_by_location = {}
-    for scene in scenes:
-        loc = scene.get("location_description", "Unknown")
-        if loc not in scenes_by_location:
-            scenes_by_location[loc] = []
-        scenes_by_location[loc].append(scene.get("scene_id", ""))
+    scenes_by_location_text = json.dumps(_scene_stats(state)["scenes_by_location"], indent=2)
     
     prompt = f"""You are a production scheduler. Generate a shoot schedule for these scenes:
 
 Scenes by location:
-{json.dumps(scenes_by_location, indent=2)}
+{scenes_by_location_text}
 
 Group scenes by location to minimize company moves.
 Estimate setup time (0.5-2 hours) and shoot time (0.5-1 hour per scene).
@@ -882,156 +1610,102 @@ Include company move time (1-3 hours) between locations.
 Return as JSON matching SchedulePlan schema with schedule_days array and assumptions.
 """
     
-    # Increased max_tokens to 8000 to accommodate reasoning tokens + output
-    schedule_json = call_tamus_api(prompt, max_tokens=8000)
-    
     try:
-        # Extract JSON from response
-        clean_json = extract_json_from_llm_response(schedule_json)
-        schedule_plan = json.loads(clean_json)
-        total_days = schedule_plan.get("total_shoot_days", 0)
-        print(f"✓ Generated schedule: {total_days} shoot days")
+        schedule_json = call_tamus_api_with_plan_cache(
+            "schedule plan", scenes_by_location_text, prompt, OUTPUT_BUDGETS["schedule"]
+        )
+        schedule_plan = parse_llm_json(schedule_json)
+        remember_plan("schedule plan", scenes_by_location_text, OUTPUT_BUDGETS["schedule"], schedule_plan)
+        log_node_event("schedule", "complete", shoot_days=schedule_plan.get("total_shoot_days", 0))
         return {"schedule_plan": schedule_plan, "overall_status": "Schedule plan created. "}
     except json.JSONDecodeError as e:
-        print(f"⚠ Error parsing schedule: {e}")
-        print(f"  Response preview: {schedule_json[:200]}...")
+        log_node_event("schedule", "fallback", error=str(e), preview=schedule_json[:200])
         # Use synthetic schedule on parse failure
         schedule_plan = generate_synthetic_schedule(scenes)
         return {"schedule_plan": schedule_plan, "overall_status": "Schedule plan created (synthetic). "}
+    except (TimeoutError, ValueError) as e:
+        log_node_event("schedule", "fallback", error=str(e))
+        schedule_plan = generate_synthetic_schedule(scenes)
+        return {"schedule_plan": schedule_plan, "overall_status": "Schedule plan created (synthetic). "}
 
 
-def casting_node(state: State) -> Dict:
-    """Generate casting suggestions."""
-    print("------ENTERING: CASTING NODE------")
-    
-    scene_plan = state.get("scene_plan", {})
-    scenes = scene_plan.get("scenes", [])
-    
-    cast_summary = f"Total cast needed: {sum(s.get('cast_count', 0) for s in scenes)}"
-    
-    prompt = f"""Generate casting recommendations for this production:
-
-{cast_summary}
-
-Provide:
-- Character breakdown with descriptions
-- Age ranges and key attributes
-- Casting approach (professional actors, non-actors, brand ambassadors)
-- Special requirements (stunts, special skills)
-
-Return as JSON with casting_breakdown array.
-"""
-    
-    # Increased max_tokens to 6000 to accommodate reasoning tokens + output
-    casting_json = call_tamus_api(prompt, max_tokens=6000)
-    
-    try:
-        casting_suggestions = json.loads(casting_json)
-        print(f"Generated casting suggestions")
-        return {"casting_suggestions": casting_suggestions, "overall_status": "Casting suggestions created. "}
-    except json.JSONDecodeError as e:
-        print(f"Error parsing casting suggestions: {e}")
-        return {"overall_status": f"Casting suggestions failed: {e}. "}
-
-
-def props_wardrobe_node(state: State) -> Dict:
-    """Generate props and wardrobe list."""
-    print("------ENTERING: PROPS AND WARDROBE NODE------")
-    
-    scene_plan = state.get("scene_plan", {})
-    scenes = scene_plan.get("scenes", [])
-    
-    all_props = []
-    all_wardrobe = []
-    for scene in scenes:
-        all_props.extend(scene.get("props", []))
-        all_wardrobe.extend(scene.get("wardrobe", []))
-    
-    prompt = f"""Generate a comprehensive props and wardrobe list:
-
-Props: {', '.join(set(all_props))}
-Wardrobe: {', '.join(set(all_wardrobe))}
-
-For each item, provide:
-- Quantity needed
-- Source (purchase, rental, on-hand)
-- Estimated cost
-- Special handling notes
-
-Return as JSON with props_list and wardrobe_list arrays.
-"""
-    
-    # Increased max_tokens to 6000 to accommodate reasoning tokens + output
-    props_wardrobe_json = call_tamus_api(prompt, max_tokens=6000)
-    
-    try:
-        props_wardrobe_list = json.loads(props_wardrobe_json)
-        print(f"Generated props and wardrobe list")
-        return {"props_wardrobe_list": props_wardrobe_list, "overall_status": "Props/wardrobe list created. "}
-    except json.JSONDecodeError as e:
-        print(f"Error parsing props/wardrobe: {e}")
-        return {"overall_status": f"Props/wardrobe list failed: {e}. "}
-
-
-def crew_gear_node(state: State) -> Dict:
-    """Generate crew and equipment recommendations."""
-    print("------ENTERING: CREW AND GEAR NODE------")
-    
-    scene_plan = state.get("scene_plan", {})
-    scenes = scene_plan.get("scenes", [])
+def production_resources_node(state: State) -> Dict:
+    """
+    Generate casting, props/wardrobe and crew/gear in a single request.
     
-    scene_complexity = len(scenes)
+    The three lists come from the same small scene summary, so one prompt
+    replaces three round-trips; the combined response is split back into the
+    casting_suggestions, props_wardrobe_list and crew_gear keys.
+    """
+    stats = _scene_stats(state)
     
-    prompt = f"""You are a production coordinator. Generate crew and equipment recommendations for this production:
+    prompt = f"""You are a production coordinator. Generate the production resources for this shoot:
 
-Scene complexity: {scene_complexity} scenes
+Scene complexity: {stats['scene_count']} scenes
+Total cast needed: {stats['total_cast']}
+Props: {', '.join(stats['props'])}
+Wardrobe: {', '.join(stats['wardrobe'])}
 
 Provide:
-1. Minimum viable crew list with roles and responsibilities
-2. Minimum viable equipment list
-3. Optional upgrades for crew and equipment (marked with required=False)
-
-Base recommendations on scene complexity, location types, and technical requirements.
-
-Return as JSON matching CrewGearPackage schema with crew and equipment arrays.
+1. casting_breakdown - character breakdown with descriptions, age ranges and key attributes,
+   casting approach (professional actors, non-actors, brand ambassadors) and special
+   requirements (stunts, special skills)
+2. props_list and wardrobe_list - for each item: quantity needed, source (purchase, rental,
+   on-hand), estimated cost and special handling notes
+3. crew and equipment - minimum viable crew (roles and responsibilities) and equipment, plus
+   optional upgrades marked with required=False, matching the CrewGearPackage schema.
+   Base these on scene complexity, location types, and technical requirements.
+
+Return as one JSON object with casting_breakdown, props_list, wardrobe_list, crew and equipment arrays.
 """
     
-    # Increased max_tokens to 8000 to accommodate reasoning tokens + output
-    crew_gear_json = call_tamus_api(prompt, max_tokens=8000)
-    
     try:
-        # Extract JSON from response
-        clean_json = extract_json_from_llm_response(crew_gear_json)
-        crew_gear_package = json.loads(clean_json)
-        print(f"✓ Generated crew and gear recommendations")
-        return {"crew_gear": crew_gear_package, "overall_status": "Crew/gear package created. "}
+        resources_json = call_tamus_api(prompt, max_tokens=OUTPUT_BUDGETS["production_resources"],
+                                        system=PRODUCTION_SYSTEM_PROMPT, json_mode=True)
+        resources = parse_llm_json(resources_json)
+        log_node_event("production_resources", "complete",
+                       crew=len(resources.get("crew", [])), equipment=len(resources.get("equipment", [])))
+        return {
+            "casting_suggestions": {"casting_breakdown": resources.get("casting_breakdown", [])},
+            "props_wardrobe_list": {
+                "props_list": resources.get("props_list", []),
+                "wardrobe_list": resources.get("wardrobe_list", [])
+            },
+            "crew_gear": {
+                "crew": resources.get("crew", []),
+                "equipment": resources.get("equipment", [])
+            },
+            "overall_status": "Casting, props/wardrobe and crew/gear created. "
+        }
     except json.JSONDecodeError as e:
-        print(f"⚠ Error parsing crew/gear: {e}")
-        print(f"  Response preview: {crew_gear_json[:200]}...")
+        log_node_event("production_resources", "fallback", error=str(e), preview=resources_json[:200])
         # Return minimal crew/gear
         return {
             "crew_gear": {
                 "crew": [],
                 "equipment": []
             },
-            "overall_status": "Crew/gear parsing failed, using empty list. "
+            "overall_status": "Production resources parsing failed, using empty crew/gear. "
+        }
+    except (TimeoutError, ValueError) as e:
+        log_node_event("production_resources", "fallback", error=str(e))
+        return {
+            "crew_gear": {
+                "crew": [],
+                "equipment": []
+            },
+            "overall_status": "Production resources unavailable, using empty crew/gear. "
         }
 
 
 def legal_clearance_node(state: State) -> Dict:
     """Generate legal clearances checklist."""
-    print("------ENTERING: LEGAL CLEARANCE NODE------")
-    
-    scene_plan = state.get("scene_plan", {})
-    scenes = scene_plan.get("scenes", [])
-    
-    total_cast = sum(s.get("cast_count", 0) for s in scenes)
-    ext_scenes = [s for s in scenes if s.get("location_type") == "EXT"]
+    stats = _scene_stats(state)
     
     prompt = f"""You are a legal compliance specialist. Generate legal clearances checklist for this production:
 
-Total cast: {total_cast}
-Exterior scenes: {len(ext_scenes)}
+Total cast: {stats['total_cast']}
+Exterior scenes: {stats['ext_scene_count']}
 
 Identify:
 - Talent releases required (based on cast count)
@@ -1047,18 +1721,14 @@ Mark high-risk items requiring legal review.
 Return as JSON matching LegalClearanceReport schema with items array.
 """
     
-    # Increased max_tokens to 8000 to accommodate reasoning tokens + output
-    legal_json = call_tamus_api(prompt, max_tokens=8000)
-    
     try:
-        # Extract JSON from response
-        clean_json = extract_json_from_llm_response(legal_json)
-        legal_clearance_report = json.loads(clean_json)
-        print(f"✓ Generated legal clearance report")
+        legal_json = call_tamus_api(prompt, max_tokens=OUTPUT_BUDGETS["legal"],
+                                    system=PRODUCTION_SYSTEM_PROMPT, json_mode=True)
+        legal_clearance_report = parse_llm_json(legal_json)
+        log_node_event("legal", "complete", items=len(legal_clearance_report.get("items", [])))
         return {"legal_clearances": legal_clearance_report, "overall_status": "Legal clearance report created. "}
     except json.JSONDecodeError as e:
-        print(f"⚠ Error parsing legal clearance: {e}")
-        print(f"  Response preview: {legal_json[:200]}...")
+        log_node_event("legal", "fallback", error=str(e), preview=legal_json[:200])
         # Return minimal legal clearances
         return {
             "legal_clearances": {
@@ -1066,22 +1736,24 @@ Return as JSON matching LegalClearanceReport schema with items array.
             },
             "overall_status": "Legal clearance parsing failed, using empty list. "
         }
+    except (TimeoutError, ValueError) as e:
+        log_node_event("legal", "fallback", error=str(e))
+        return {
+            "legal_clearances": {
+                "items": []
+            },
+            "overall_status": "Legal clearances unavailable, using empty list. "
+        }
 
 
 def risk_safety_node(state: State) -> Dict:
     """Generate risk register with mitigation strategies."""
-    print("------ENTERING: RISK AND SAFETY NODE------")
-    
-    scene_plan = state.get("scene_plan", {})
-    scenes = scene_plan.get("scenes", [])
-    
-    ext_scenes = [s for s in scenes if s.get("location_type") == "EXT"]
-    night_scenes = [s for s in scenes if s.get("time_of_day") == "NIGHT"]
+    stats = _scene_stats(state)
     
     prompt = f"""You are a production safety coordinator. Generate risk and safety register for this production:
 
-Exterior scenes: {len(ext_scenes)}
-Night scenes: {len(night_scenes)}
+Exterior scenes: {stats['ext_scene_count']}
+Night scenes: {stats['night_scene_count']}
 
 Identify risks:
 - Safety hazards (stunts, special effects, heights, water)
@@ -1099,18 +1771,14 @@ For each risk, provide:
 Return as JSON matching RiskRegister schema with risks array.
 """
     
-    # Increased max_tokens to 8000 to accommodate reasoning tokens + output
-    risk_json = call_tamus_api(prompt, max_tokens=8000)
-    
     try:
-        # Extract JSON from response
-        clean_json = extract_json_from_llm_response(risk_json)
-        risk_register = json.loads(clean_json)
-        print(f"✓ Generated risk register with {len(risk_register.get('risks', []))} risks")
+        risk_json = call_tamus_api(prompt, max_tokens=OUTPUT_BUDGETS["risk"],
+                                   system=PRODUCTION_SYSTEM_PROMPT, json_mode=True)
+        risk_register = parse_llm_json(risk_json)
+        log_node_event("risk", "complete", risks=len(risk_register.get("risks", [])))
         return {"risk_register": risk_register, "overall_status": "Risk register created. "}
     except json.JSONDecodeError as e:
-        print(f"⚠ Error parsing risk register: {e}")
-        print(f"  Response preview: {risk_json[:200]}...")
+        log_node_event("risk", "fallback", error=str(e), preview=risk_json[:200])
         # Return minimal risk register
         return {
             "risk_register": {
@@ -1118,6 +1786,83 @@ Return as JSON matching RiskRegister schema with risks array.
             },
             "overall_status": "Risk register parsing failed, using empty list. "
         }
+    except (TimeoutError, ValueError) as e:
+        log_node_event("risk", "fallback", error=str(e))
+        return {
+            "risk_register": {
+                "risks": []
+            },
+            "overall_status": "Risk register unavailable, using empty list. "
+        }
+
+
+# Planners that only read the approved scene plan and write disjoint keys
+PLANNING_NODES = (
+    location_planning_node,
+    budgeting_node,
+    schedule_ad_node,
+    production_resources_node,
+    legal_clearance_node,
+    risk_safety_node,
+)
+
+
+def planning_fallback(node, state: State) -> Dict:
+    """
+    Result to use in place of a planner that raised.
+    
+    Mirrors each node's own fallback (synthetic plan where one exists,
+    otherwise an empty one), so one failed planner never fails the stage.
+    """
+    scenes = state.get("scene_plan", {}).get("scenes", [])
+    name = node.__name__
+    if node is location_planning_node:
+        result = {"locations_plan": generate_synthetic_locations(scenes)}
+    elif node is budgeting_node:
+        result = {"budget_estimate": generate_synthetic_budget(scenes)}
+    elif node is schedule_ad_node:
+        result = {"schedule_plan": generate_synthetic_schedule(scenes)}
+    elif node is production_resources_node:
+        result = {"crew_gear": {"crew": [], "equipment": []}}
+    elif node is legal_clearance_node:
+        result = {"legal_clearances": {"items": []}}
+    else:
+        result = {"risk_register": {"risks": []}}
+    result["overall_status"] = f"{name} failed, using fallback. "
+    return result
+
+
+async def parallel_planning_node(state: State) -> Dict:
+    """
+    Run all production planners concurrently and merge their outputs.
+    
+    Each planner's TAMUS round-trip runs on its own worker thread via
+    asyncio.gather, so the stage takes as long as the slowest planner rather
+    than the sum of all six. Request pacing is left to the TAMUS rate limiter.
+    """
+    print("------ENTERING: PARALLEL PLANNING NODE------")
+    
+    results = await asyncio.gather(
+        *[asyncio.to_thread(node, state) for node in PLANNING_NODES],
+        return_exceptions=True
+    )
+    # A planner that raised gets its fallback; the others keep their results
+    for i, (node, result) in enumerate(zip(PLANNING_NODES, results)):
+        if isinstance(result, Exception):
+            print(f"  ⚠ {node.__name__} failed ({result}), using its fallback")
+            results[i] = planning_fallback(node, state)
+    
+    merged: Dict = {}
+    statuses = []
+    for result in results:
+        for key, value in result.items():
+            if key == "overall_status":
+                statuses.append(value)
+            else:
+                merged[key] = value
+    merged["overall_status"] = "".join(statuses)
+    
+    return merged
 
 
 def budget_schedule_approval_gate(state: State) -> Dict:
@@ -1134,7 +1879,10 @@ def budget_schedule_approval_gate(state: State) -> Dict:
     print("\n=== SCHEDULE SUMMARY ===")
     print(f"Total Shoot Days: {schedule.get('total_shoot_days', 0)}")
     
-    approval = input("\nApprove budget and schedule? (yes/no): ").lower()
+    approval = _request_human_input(
+        "\nApprove budget and schedule? (yes/no): ", {"gate": "budget_schedule_approval"},
+        default="yes"
+    ).lower()
     
     if approval == "yes":
         return {"overall_status": "Budget and schedule approved. "}
@@ -1142,21 +1890,13 @@ def budget_schedule_approval_gate(state: State) -> Dict:
         return {"overall_status": "Budget and schedule rejected. "}
 
 
-def client_review_pack_node(state: State) -> Dict:
-    """Generate consolidated production pack markdown document."""
-    print("------ENTERING: CLIENT REVIEW PACK GENERATION NODE------")
-    
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
-    theme = state.get("theme", "")
-    budget = state.get("budget_estimate", {})
-    schedule = state.get("schedule_plan", {})
-    
-    # Generate markdown document
-    markdown_content = f"""# Production Pack: {brand_name} - {theme}
+# Production pack layout: a str.format header, then free-text sections and
+# JSON sections streamed in order as (title, state key) pairs
+PRODUCTION_PACK_HEADER = """# Production Pack: {brand_name} - {theme}
 
-**Generated:** {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-**Total Budget:** ${budget.get('total_min', 0):,.0f} - ${budget.get('total_max', 0):,.0f}
-**Total Shoot Days:** {schedule.get('total_shoot_days', 0)}
+**Generated:** {generated_at}
+**Total Budget:** ${total_min:,.0f} - ${total_max:,.0f}
+**Total Shoot Days:** {total_shoot_days}
 
 ---
 
@@ -1179,52 +1919,57 @@ def client_review_pack_node(state: State) -> Dict:
 ## Executive Summary
 
 This production pack contains all planning artifacts for the {brand_name} advertisement campaign.
+"""
 
-## Concept
-
-{state.get('concept', 'N/A')}
-
-## Screenplay
-
-{state.get('screenplay_winner', 'N/A')}
-
-## Storyboard
-
-{state.get('story_board', 'N/A')}
-
-## Scene Plan
-
-{json.dumps(state.get('scene_plan', {}), indent=2)}
-
-## Locations Plan
-
-{json.dumps(state.get('locations_plan', {}), indent=2)}
-
-## Budget Estimate
-
-{json.dumps(state.get('budget_estimate', {}), indent=2)}
-
-## Schedule Plan
-
-{json.dumps(state.get('schedule_plan', {}), indent=2)}
-
-## Crew and Gear
-
-{json.dumps(state.get('crew_gear_package', {}), indent=2)}
-
-## Legal Clearances
+PRODUCTION_PACK_TEXT_SECTIONS = (
+    ("Concept", "concept"),
+    ("Screenplay", "screenplay_winner"),
+    ("Storyboard", "story_board"),
+)
 
-{json.dumps(state.get('legal_clearance_report', {}), indent=2)}
+PRODUCTION_PACK_JSON_SECTIONS = (
+    ("Scene Plan", "scene_plan"),
+    ("Locations Plan", "locations_plan"),
+    ("Budget Estimate", "budget_estimate"),
+    ("Schedule Plan", "schedule_plan"),
+    ("Crew and Gear", "crew_gear_package"),
+    ("Legal Clearances", "legal_clearance_report"),
+    ("Risk Register", "risk_register"),
+)
 
-## Risk Register
 
-{json.dumps(state.get('risk_register', {}), indent=2)}
-"""
+def client_review_pack_node(state: State) -> Dict:
+    """Generate consolidated production pack markdown document."""
+    print("------ENTERING: CLIENT REVIEW PACK GENERATION NODE------")
     
-    # Save to file
+    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
+    budget = state.get("budget_estimate", {})
+    schedule = state.get("schedule_plan", {})
+    
+    header = PRODUCTION_PACK_HEADER.format(
+        brand_name=brand_name,
+        theme=state.get("theme", ""),
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        total_min=budget.get('total_min', 0),
+        total_max=budget.get('total_max', 0),
+        total_shoot_days=schedule.get('total_shoot_days', 0)
+    )
+    
+    # Sections are streamed straight to the file (json.dump writes through the
+    # buffer) instead of assembling the whole pack as one string first
     output_path = f"output/production_pack_{brand_name.replace(' ', '_')}.md"
-    with open(output_path, 'w') as f:
-        f.write(markdown_content)
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        f.write(header)
+        
+        for title, key in PRODUCTION_PACK_TEXT_SECTIONS:
+            f.write(f"\n## {title}\n\n")
+            f.write(state.get(key, 'N/A'))
+            f.write("\n")
+        
+        for title, key in PRODUCTION_PACK_JSON_SECTIONS:
+            f.write(f"\n## {title}\n\n")
+            _write_json_pretty(state.get(key, {}), f)
+            f.write("\n")
     
     print(f"Production pack saved to: {output_path}")
     
@@ -1235,8 +1980,17 @@ This production pack contains all planning artifacts for the {brand_name} advert
 # LANGGRAPH PIPELINE SETUP
 # ============================================================================
 
-def create_production_pipeline():
-    """Create and configure the LangGraph production pipeline."""
+def create_production_pipeline(checkpointer=None):
+    """
+    Create and configure the LangGraph production pipeline.
+    
+    Args:
+        checkpointer: LangGraph checkpointer used to pause at HITL gates
+            (defaults to an in-memory MemorySaver)
+    
+    Returns:
+        Compiled graph; run it with run_production_pipeline()
+    """
     
     # Create workflow
     workflow = StateGraph(State)
@@ -1247,18 +2001,12 @@ def create_production_pipeline():
     workflow.add_node("screen_play_creation_in_shankar_style", screen_play_creation_node_2)
     workflow.add_node("screenplay_evaluation_node", screenplay_evaluation_node)
     workflow.add_node("story_board_creation_node", story_board_creation_node)
+    workflow.add_node("storyboard_image_node", storyboard_image_node)
     
     # Add production planning nodes
     workflow.add_node("scene_breakdown_node", scene_breakdown_node)
     workflow.add_node("scene_plan_approval_gate", scene_plan_approval_gate)
-    workflow.add_node("location_planning_node", location_planning_node)
-    workflow.add_node("budgeting_node", budgeting_node)
-    workflow.add_node("schedule_ad_node", schedule_ad_node)
-    workflow.add_node("casting_node", casting_node)
-    workflow.add_node("props_wardrobe_node", props_wardrobe_node)
-    workflow.add_node("crew_gear_node", crew_gear_node)
-    workflow.add_node("legal_clearance_node", legal_clearance_node)
-    workflow.add_node("risk_safety_node", risk_safety_node)
+    workflow.add_node("parallel_planning_node", parallel_planning_node)
     workflow.add_node("budget_schedule_approval_gate", budget_schedule_approval_gate)
     workflow.add_node("client_review_pack_node", client_review_pack_node)
     
@@ -1273,36 +2021,55 @@ def create_production_pipeline():
     workflow.add_edge("screenplay_evaluation_node", "story_board_creation_node")
     
     # Production planning edges
+    # Scene breakdown only needs the storyboard text, so images render in parallel
     workflow.add_edge("story_board_creation_node", "scene_breakdown_node")
+    workflow.add_edge("story_board_creation_node", "storyboard_image_node")
     workflow.add_edge("scene_breakdown_node", "scene_plan_approval_gate")
     
-    # Parallel planning nodes (fan-out from approval gate)
-    workflow.add_edge("scene_plan_approval_gate", "location_planning_node")
-    workflow.add_edge("scene_plan_approval_gate", "budgeting_node")
-    workflow.add_edge("scene_plan_approval_gate", "schedule_ad_node")
-    workflow.add_edge("scene_plan_approval_gate", "casting_node")
-    workflow.add_edge("scene_plan_approval_gate", "props_wardrobe_node")
-    workflow.add_edge("scene_plan_approval_gate", "crew_gear_node")
-    workflow.add_edge("scene_plan_approval_gate", "legal_clearance_node")
-    workflow.add_edge("scene_plan_approval_gate", "risk_safety_node")
-    
-    # Fan-in to budget/schedule approval gate
-    workflow.add_edge("location_planning_node", "budget_schedule_approval_gate")
-    workflow.add_edge("budgeting_node", "budget_schedule_approval_gate")
-    workflow.add_edge("schedule_ad_node", "budget_schedule_approval_gate")
-    workflow.add_edge("casting_node", "budget_schedule_approval_gate")
-    workflow.add_edge("props_wardrobe_node", "budget_schedule_approval_gate")
-    workflow.add_edge("crew_gear_node", "budget_schedule_approval_gate")
-    workflow.add_edge("legal_clearance_node", "budget_schedule_approval_gate")
-    workflow.add_edge("risk_safety_node", "budget_schedule_approval_gate")
+    # All six planners run concurrently inside one node
+    workflow.add_edge("scene_plan_approval_gate", "parallel_planning_node")
+    workflow.add_edge("parallel_planning_node", "budget_schedule_approval_gate")
     
     # Final production pack generation
-    workflow.add_edge("budget_schedule_approval_gate", "client_review_pack_node")
+    # Wait for both the approved plan and the storyboard images
+    workflow.add_edge(["budget_schedule_approval_gate", "storyboard_image_node"], "client_review_pack_node")
     
     # Set finish point
     workflow.set_finish_point("client_review_pack_node")
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer or MemorySaver())
+
+
+async def run_production_pipeline(graph, initial_state: Dict, thread_id: str = "production") -> Dict:
+    """
+    Run the production graph to completion, answering HITL gates from stdin.
+    
+    Each gate interrupts the graph; the question is asked here (on a worker
+    thread, so the event loop stays free) and the graph is resumed from its
+    checkpoint with the answer.
+    
+    Args:
+        graph: Graph from create_production_pipeline()
+        initial_state: Initial pipeline state
+        thread_id: Checkpoint thread to run under
+        
+    Returns:
+        Dict: Final pipeline state
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    result = await graph.ainvoke(initial_state, config)
+    
+    while Command is not None:
+        snapshot = await graph.aget_state(config)
+        pending = [item for task in snapshot.tasks for item in task.interrupts]
+        if not pending:
+            break
+        
+        request = pending[0].value
+        answer = await asyncio.to_thread(input, request.get("question", "> "))
+        result = await graph.ainvoke(Command(resume=answer), config)
+    
+    return result
 
 
 # ============================================================================
@@ -1332,8 +2099,11 @@ if __name__ == "__main__":
     
     # Run pipeline
     print("Starting production pipeline...\n")
-    final_state = production_graph.invoke(initial_state)
+    final_state = asyncio.run(run_production_pipeline(production_graph, initial_state))
     
     print("\n=== PIPELINE COMPLETE ===")
     print(f"Status: {final_state.get('overall_status', '')}")
     print(f"Production Pack: {final_state.get('production_pack', 'N/A')}")
+    if cache_enabled():
+        stats = get_llm_cache().stats()
+        print(f"LLM cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
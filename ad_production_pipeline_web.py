@@ -10,13 +10,19 @@ This is a modified version of ad_production_pipeline.py that:
 Used by backend/main.py for web UI integration.
 """
 
+import asyncio
 import operator
 import json
-from typing import Annotated, List, Dict, Optional
+import hashlib
+import string
+import functools
+import logging
+import tempfile
+from typing import Annotated, List, Dict, Optional, Tuple
 from typing_extensions import TypedDict
-from langgraph.graph import StateGraph, START, END
 
-# Import model classes
+# Import model classes (plain TypedDicts, cheap to import; they must stay at
+# module level because StateGraph resolves State's annotations from here)
 from models.scene_plan import Shot, SceneDetail, ScenePlan
 from models.locations_plan import LocationRequirement, LocationsPlan
 from models.budget_estimate import BudgetLineItem, BudgetEstimate
@@ -26,32 +32,108 @@ from models.legal_clearance import LegalItem, LegalClearanceReport
 from models.risk_register import Risk, RiskRegister
 
 # Import TAMUS wrapper for LLM calls
-from tamus_wrapper import get_tamus_client
+from tamus_wrapper import get_tamus_client, extract_text, TamusResponseError, TokenBudgetExceeded
+from rate_limiter import get_rate_limiter
+from llm_cache import cache_enabled, get_llm_cache, make_cache_key
 import os
 
+# Gemini is optional: without it storyboards are text-only
+try:
+    import google.genai as genai
+except ImportError:
+    genai = None
+
+
+# Progress goes through logging so hosts can filter it by level (LOG_LEVEL in
+# the backends); per-frame detail is logged at DEBUG
+logger = logging.getLogger(__name__)
+
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def call_tamus_api(prompt: str, max_tokens: int = 2000) -> str:
-    """Helper function to call TAMUS API with a prompt."""
-    llm = get_tamus_client()
-    response = llm.messages().create(
-        model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=max_tokens
-    )
+# Ask for strict JSON output on structured calls (TAMUS_JSON_MODE=0 if the
+# endpoint rejects response_format)
+TAMUS_JSON_MODE = os.getenv("TAMUS_JSON_MODE", "1").lower() in ("1", "true", "yes")
+
+# Per-task response token budgets. Reasoning tokens count against max_tokens
+# on the default model, so none goes below 2000; call_tamus_api doubles the
+# budget once if a reply is cut off anyway.
+OUTPUT_BUDGETS = {
+    "concept": 2000,
+    "screenplay": 2000,
+    "storyboard": 2000,
+    "scene_breakdown": 2000,
+}
+
+
+def call_tamus_api(prompt: str, max_tokens: int = 2000, json_mode: bool = False) -> str:
+    """
+    Helper function to call TAMUS API with a prompt.
     
-    # Extract text from response
-    if hasattr(response, 'content') and isinstance(response.content, list):
-        if len(response.content) > 0:
-            if isinstance(response.content[0], dict) and 'text' in response.content[0]:
-                return response.content[0]['text']
-            else:
-                return str(response.content[0])
+    With TAMUS_CACHE=1 identical requests (e.g. the storyboard breakdown of an
+    unchanged screenplay) are answered from the shared response cache.
     
-    return str(response)
+    If the model exhausts max_tokens before answering, or a JSON reply is cut
+    off, the call is repeated once with double the budget.
+    
+    Raises:
+        TamusResponseError: If TAMUS returns no usable content
+    """
+    model = os.getenv("TAMUS_MODEL", "protected.gpt-5.2")
+    
+    cache_key = None
+    if cache_enabled():
+        cache_key = make_cache_key(model, prompt, max_tokens, json_mode=json_mode)
+        cached = get_llm_cache().get(cache_key)
+        if cached is not None:
+            logger.debug("Cache hit (%d chars)", len(cached))
+            return cached
+    
+    llm = get_tamus_client()
+    budget = max_tokens
+    for attempt in range(2):
+        # Planner and screenplay calls run on worker threads; pace them under TAMUS_RPM
+        get_rate_limiter("tamus").acquire()
+        try:
+            response = llm.messages().create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=budget,
+                response_format={"type": "json_object"} if json_mode and TAMUS_JSON_MODE else None
+            )
+        except TokenBudgetExceeded:
+            if attempt:
+                raise
+            budget *= 2
+            logger.warning("Token budget exhausted, retrying with max_tokens=%d", budget)
+            continue
+        
+        text = extract_text(response)
+        # A reply that stops before its closing bracket was cut off at the budget
+        if json_mode and not attempt and not text.rstrip().rstrip("`").rstrip().endswith(("}", "]")):
+            budget *= 2
+            logger.warning("JSON reply truncated at the token budget, retrying with max_tokens=%d", budget)
+            continue
+        break
+    
+    if cache_key is not None and text.strip():
+        get_llm_cache().set(cache_key, text)
+    return text
+
+
+async def acall_tamus_api(prompt: str, max_tokens: int = 2000, json_mode: bool = False) -> str:
+    """Async variant of call_tamus_api; the blocking request runs on a worker thread."""
+    return await asyncio.to_thread(call_tamus_api, prompt, max_tokens, json_mode)
+
+
+def _parse_json(text: str):
+    """Decode an LLM JSON reply, tolerating a surrounding markdown code fence."""
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        stripped = stripped.split("\n", 1)[-1].rsplit("```", 1)[0]
+    return json.loads(stripped)
 
 
 # ============================================================================
@@ -104,17 +186,12 @@ class State(TypedDict):
 # CREATIVE CHAIN NODES (WEB-COMPATIBLE - NO HITL)
 # ============================================================================
 
-def ad_concept_creation_node(state: State) -> Dict:
-    """Generate ad concept from theme using TAMUS API."""
-    print("------ENTERING: CONCEPT CREATION NODE------")
-    
-    theme = state.get("theme", "")
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
+# Prompt templates are built once at import; nodes only substitute the
+# dynamic slots
+CONCEPT_PROMPT = string.Template("""You are an intelligent advertisement concept creator.
     
-    prompt = f"""You are an intelligent advertisement concept creator.
-    
-Brand: {brand_name}
-Theme: {theme}
+Brand: $brand_name
+Theme: $theme
 
 Create a compelling advertisement concept that:
 1. Captures the brand essence
@@ -127,27 +204,13 @@ Provide a detailed concept description including:
 - Visual style
 - Emotional tone
 - Key scenes or moments
-"""
-    
-    concept = call_tamus_api(prompt)
-    print(f"Generated Concept: {concept[:200]}...")
-    
-    return {"concept": concept, "overall_status": "Concept created. "}
+""")
 
+RAJAMOULI_SCREENPLAY_PROMPT = string.Template("""You are a screenplay writer for advertisements in the style of SS RAJAMOULI.
 
-def screen_play_creation_node_1(state: State) -> Dict:
-    """Generate Rajamouli-style screenplay."""
-    print("------ENTERING: SCREENPLAY CREATION NODE 1 (RAJAMOULI STYLE)------")
-    
-    concept = state.get("concept", "")
-    duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
-    
-    prompt = f"""You are a screenplay writer for advertisements in the style of SS RAJAMOULI.
-
-Concept: {concept}
-Duration: {duration} seconds
-Brand: {brand_name}
+Concept: $concept
+Duration: $duration seconds
+Brand: $brand_name
 
 Write a screenplay with 5 scenes using SS RAJAMOULI's signature style:
 - EPIC, LARGER-THAN-LIFE visuals
@@ -171,27 +234,13 @@ Action: [movement]
 Dialogue: [powerful voiceover]
 Camera: [dramatic angle]
 
-Generate the complete screenplay now in RAJAMOULI STYLE."""
-    
-    screenplay = call_tamus_api(prompt)
-    print(f"Generated Rajamouli Screenplay: {screenplay[:200]}...")
-    
-    return {"screenplay_1": screenplay, "overall_status": "Rajamouli screenplay created. "}
-
+Generate the complete screenplay now in RAJAMOULI STYLE.""")
 
-def screen_play_creation_node_2(state: State) -> Dict:
-    """Generate Shankar-style screenplay."""
-    print("------ENTERING: SCREENPLAY CREATION NODE 2 (SHANKAR STYLE)------")
-    
-    concept = state.get("concept", "")
-    duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
-    
-    prompt = f"""You are a screenplay writer for advertisements in the style of SHANKAR.
+SHANKAR_SCREENPLAY_PROMPT = string.Template("""You are a screenplay writer for advertisements in the style of SHANKAR.
 
-Concept: {concept}
-Duration: {duration} seconds
-Brand: {brand_name}
+Concept: $concept
+Duration: $duration seconds
+Brand: $brand_name
 
 Write a screenplay with 5 scenes using SHANKAR's signature style:
 - HIGH-TECH, FUTURISTIC visuals
@@ -215,33 +264,304 @@ Action: [movement]
 Dialogue: [impactful voiceover]
 Camera: [innovative angle]
 
-Generate the complete screenplay now in SHANKAR STYLE."""
+Generate the complete screenplay now in SHANKAR STYLE.""")
+
+FRAME_IMAGE_HEADER = string.Template(
+    "Generate an image: Professional storyboard frame for a $brand_name advertisement."
+)
+FRAME_IMAGE_STYLE = """Style: Cinematic, professional advertising, high quality, detailed composition.
+Format: 16:9 aspect ratio, suitable for video production."""
+
+
+async def ad_concept_creation_node(state: State) -> Dict:
+    """Generate ad concept from theme using TAMUS API."""
+    logger.info("------ENTERING: CONCEPT CREATION NODE------")
+    
+    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
+    
+    prompt = CONCEPT_PROMPT.substitute(brand_name=brand_name, theme=state.get("theme", ""))
+    
+    concept = await acall_tamus_api(prompt, OUTPUT_BUDGETS["concept"])
+    logger.info("Generated Concept: %.200s...", concept)
+    
+    return {"concept": concept, "overall_status": "Concept created. "}
+
+
+async def screen_play_creation_node_1(state: State) -> Dict:
+    """Generate Rajamouli-style screenplay."""
+    logger.info("------ENTERING: SCREENPLAY CREATION NODE 1 (RAJAMOULI STYLE)------")
+    
+    creative_brief = state.get("creative_brief", {})
+    
+    prompt = RAJAMOULI_SCREENPLAY_PROMPT.substitute(
+        concept=state.get("concept", ""),
+        duration=creative_brief.get("target_duration_sec", 30),
+        brand_name=creative_brief.get("brand_name", "Brand")
+    )
+    
+    screenplay = await acall_tamus_api(prompt, OUTPUT_BUDGETS["screenplay"])
+    logger.info("Generated Rajamouli Screenplay: %.200s...", screenplay)
+    
+    return {"screenplay_1": screenplay, "overall_status": "Rajamouli screenplay created. "}
+
+
+async def screen_play_creation_node_2(state: State) -> Dict:
+    """Generate Shankar-style screenplay."""
+    logger.info("------ENTERING: SCREENPLAY CREATION NODE 2 (SHANKAR STYLE)------")
     
-    screenplay = call_tamus_api(prompt)
-    print(f"Generated Shankar Screenplay: {screenplay[:200]}...")
+    creative_brief = state.get("creative_brief", {})
+    
+    prompt = SHANKAR_SCREENPLAY_PROMPT.substitute(
+        concept=state.get("concept", ""),
+        duration=creative_brief.get("target_duration_sec", 30),
+        brand_name=creative_brief.get("brand_name", "Brand")
+    )
+    
+    screenplay = await acall_tamus_api(prompt, OUTPUT_BUDGETS["screenplay"])
+    logger.info("Generated Shankar Screenplay: %.200s...", screenplay)
     
     return {"screenplay_2": screenplay, "overall_status": "Shankar screenplay created. "}
 
 
+async def screenplays_parallel_node(state: State) -> Dict:
+    """
+    Generate both screenplay variants concurrently.
+    
+    The two nodes only read the concept and write disjoint keys, so their
+    TAMUS calls run side by side and the step takes as long as the slower
+    of the two.
+    """
+    result1, result2 = await asyncio.gather(
+        screen_play_creation_node_1(state),
+        screen_play_creation_node_2(state)
+    )
+    return {
+        "screenplay_1": result1["screenplay_1"],
+        "screenplay_2": result2["screenplay_2"],
+        "overall_status": result1["overall_status"] + result2["overall_status"]
+    }
+
+
 def screenplay_evaluation_node(state: State) -> Dict:
     """Auto-select screenplay (no HITL for web)."""
-    print("------ENTERING: SCREENPLAY EVALUATION NODE (AUTO-SELECT)------")
+    logger.info("------ENTERING: SCREENPLAY EVALUATION NODE (AUTO-SELECT)------")
     
     # For web UI, auto-select screenplay 1 (Rajamouli style)
     # The UI will handle screenplay selection separately
     screenplay_winner = state.get("screenplay_1", "")
-    print("Auto-selected: Rajamouli style screenplay (for web UI)")
+    logger.info("Auto-selected: Rajamouli style screenplay (for web UI)")
     
     return {"screenplay_winner": screenplay_winner, "overall_status": "Screenplay selected. "}
 
 
-def story_board_creation_node(state: State) -> Dict:
+# Maximum number of concurrent Gemini image requests (keep under the RPM limit)
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "5"))
+# Ask for every frame in one Gemini request first (GEMINI_BATCH_FRAMES=1);
+# per-frame requests remain the fallback
+GEMINI_BATCH_FRAMES = os.getenv("GEMINI_BATCH_FRAMES", "0").lower() in ("1", "true", "yes")
+# Generated frames are written here and referenced by URL instead of being
+# carried through the state as base64 data URLs
+STORYBOARD_IMAGE_DIR = os.getenv(
+    "STORYBOARD_IMAGE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "storyboard", "frames")
+)
+STORYBOARD_IMAGE_URL_PREFIX = os.getenv("STORYBOARD_IMAGE_URL_PREFIX", "/static/storyboard")
+# Origin the browser reaches the API on. The UI is served from another origin,
+# so frame URLs must be absolute (same default as the UI's NEXT_PUBLIC_API_URL)
+PUBLIC_API_URL = (
+    os.getenv("PUBLIC_API_URL") or os.getenv("NEXT_PUBLIC_API_URL") or "http://localhost:2501"
+).rstrip("/")
+
+_IMAGE_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+
+GEMINI_IMAGE_MODEL = "gemini-2.5-flash-image"
+
+
+@functools.lru_cache(maxsize=4)
+def get_gemini_client(api_key: str):
+    """
+    Return the process-wide google-genai Client for api_key, creating it once.
+    
+    Raises:
+        ImportError: If google-genai is not installed
+    """
+    if genai is None:
+        raise ImportError("google-genai not installed")
+    return genai.Client(api_key=api_key)
+
+
+def _text_only_frame(frame_data: Dict) -> Dict:
+    """Build a storyboard frame without an image."""
+    return {
+        "frame_number": frame_data.get("frame_number", 0),
+        "description": frame_data.get("description", ""),
+        "image_url": None,
+        "duration_sec": frame_data.get("duration_sec", 5.0)
+    }
+
+
+def _response_images(response) -> List[Tuple[bytes, str]]:
+    """Return every inline image in a Gemini response as (bytes, mime type), in order."""
+    images = []
+    if hasattr(response, 'candidates') and len(response.candidates) > 0:
+        candidate = response.candidates[0]
+        if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
+            for part in candidate.content.parts:
+                if getattr(part, 'inline_data', None) is not None:
+                    images.append((part.inline_data.data, part.inline_data.mime_type))
+    return images
+
+
+def save_frame_image(image_bytes: bytes, mime_type: str) -> str:
+    """
+    Write a generated frame to STORYBOARD_IMAGE_DIR and return its URL.
+    
+    Files are named by content hash, so identical frames share one file.
+    
+    Args:
+        image_bytes: Raw image data from Gemini
+        mime_type: Image MIME type (decides the file extension)
+        
+    Returns:
+        str: Absolute URL under PUBLIC_API_URL + STORYBOARD_IMAGE_URL_PREFIX
+    """
+    ext = _IMAGE_EXTENSIONS.get(mime_type, "png")
+    name = f"{hashlib.sha256(image_bytes).hexdigest()[:32]}.{ext}"
+    path = os.path.join(STORYBOARD_IMAGE_DIR, name)
+    
+    if not os.path.exists(path):
+        os.makedirs(STORYBOARD_IMAGE_DIR, exist_ok=True)
+        # Write to a unique temp file first so a concurrent reader never sees a
+        # partial file and concurrent writers of the same frame never share one
+        with tempfile.NamedTemporaryFile(dir=STORYBOARD_IMAGE_DIR, suffix=".tmp", delete=False) as f:
+            f.write(image_bytes)
+        os.replace(f.name, path)
+    
+    return f"{PUBLIC_API_URL}{STORYBOARD_IMAGE_URL_PREFIX}/{name}"
+
+
+def _save_frame_images(images: List[Tuple[bytes, str]]) -> List[str]:
+    """Write several frames to disk (see save_frame_image) and return their URLs."""
+    return [save_frame_image(image_bytes, mime_type) for image_bytes, mime_type in images]
+
+
+async def _generate_frame_images_batched(client, frames_data: List[Dict], brand_name: str) -> Optional[List[str]]:
+    """
+    Request all storyboard frames in a single Gemini call.
+    
+    Args:
+        client: google-genai client
+        frames_data: Parsed storyboard frames
+        brand_name: Brand the ad is for
+        
+    Returns:
+        Optional[List[str]]: One image URL per frame in frame order, or None
+        if the response doesn't contain exactly one image per frame
+    """
+    frame_lines = "\n".join(
+        f"Frame {i}: {frame_data.get('description', '')}"
+        for i, frame_data in enumerate(frames_data, 1)
+    )
+    image_prompt = f"""Generate {len(frames_data)} images, one per frame below and in this order: professional storyboard frames for a {brand_name} advertisement.
+
+{frame_lines}
+
+Style: Cinematic, professional advertising, high quality, detailed composition, consistent characters across frames.
+Format: 16:9 aspect ratio, suitable for video production."""
+    
+    try:
+        async with get_rate_limiter("gemini"):
+            response = await client.aio.models.generate_content(
+                model=GEMINI_IMAGE_MODEL,
+                contents=image_prompt
+            )
+    except Exception as e:
+        logger.warning("Batched storyboard request failed: %s", e)
+        return None
+    
+    images = _response_images(response)
+    if len(images) != len(frames_data):
+        # Can't map images to frames reliably - let the per-frame path handle it
+        logger.warning("Batched request returned %d images for %d frames", len(images), len(frames_data))
+        return None
+    
+    logger.info("Generated %d frames in one request", len(images))
+    return await asyncio.to_thread(_save_frame_images, images)
+
+
+async def _frame_image_url(client, semaphore: asyncio.Semaphore, image_prompt: str, frame_num: int) -> Optional[str]:
+    """Generate (or fetch from cache) the image for one frame prompt and return its URL."""
+    # Frames are stored on disk, so a cached prompt → URL entry is reusable
+    # as long as its file is still there
+    cache_key = None
+    if cache_enabled():
+        cache_key = make_cache_key(GEMINI_IMAGE_MODEL, image_prompt, 0)
+        cached_url = get_llm_cache().get(cache_key)
+        if cached_url and os.path.exists(os.path.join(STORYBOARD_IMAGE_DIR, cached_url.rsplit("/", 1)[-1])):
+            logger.debug("Frame %s served from cache → %s", frame_num, cached_url)
+            return cached_url
+    
+    async with semaphore, get_rate_limiter("gemini"):
+        response = await client.aio.models.generate_content(
+            model=GEMINI_IMAGE_MODEL,
+            contents=image_prompt
+        )
+    
+    images = _response_images(response)
+    if not images:
+        logger.warning("Frame %s generated but no image data", frame_num)
+        return None
+    
+    image_bytes, mime_type = images[0]
+    # Disk write runs off the event loop so other frames keep streaming in
+    image_data = await asyncio.to_thread(save_frame_image, image_bytes, mime_type)
+    if cache_key is not None:
+        get_llm_cache().set(cache_key, image_data)
+    logger.debug("Generated frame %s (%d bytes) → %s", frame_num, len(image_bytes), image_data)
+    return image_data
+
+
+async def _generate_frame_image(client, semaphore: asyncio.Semaphore, frame_data: Dict, frame_header: str,
+                                inflight: Dict[str, "asyncio.Future"]) -> Dict:
+    """
+    Generate one storyboard frame image with Gemini 2.5 Flash.
+    
+    Args:
+        client: google-genai client
+        semaphore: Bounds concurrent Gemini requests
+        frame_data: Parsed storyboard frame
+        frame_header: FRAME_IMAGE_HEADER substituted for the brand
+        inflight: Per-storyboard map of image prompt → pending request, so
+            frames with identical descriptions share one Gemini call
+        
+    Returns:
+        Dict: Storyboard frame with image_url set (None if no image came back)
+    """
+    frame_num = frame_data.get("frame_number", 0)
+    description = frame_data.get("description", "")
+    
+    image_prompt = f"{frame_header}\n\nScene Description: {description}\n\n{FRAME_IMAGE_STYLE}"
+    
+    request = inflight.get(image_prompt)
+    if request is None:
+        request = asyncio.ensure_future(_frame_image_url(client, semaphore, image_prompt, frame_num))
+        inflight[image_prompt] = request
+    else:
+        logger.debug("Frame %s shares its image with an identical frame", frame_num)
+    
+    frame = _text_only_frame(frame_data)
+    frame["image_url"] = await request
+    return frame
+
+
+async def story_board_creation_node(state: State) -> Dict:
     """Generate storyboard frames using Gemini 2.5 Flash."""
-    print("------ENTERING: STORY BOARD CREATION NODE------")
+    logger.info("------ENTERING: STORY BOARD CREATION NODE------")
     
     screenplay = state.get("screenplay_winner", "")
-    duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
-    brand_name = state.get("creative_brief", {}).get("brand_name", "Brand")
+    creative_brief = state.get("creative_brief", {})
+    duration = creative_brief.get("target_duration_sec", 30)
+    brand_name = creative_brief.get("brand_name", "Brand")
     
     # Step 1: Generate storyboard breakdown
     prompt = f"""Based on this screenplay, create a detailed storyboard breakdown:
@@ -256,108 +576,74 @@ For each key scene, provide:
 2. Visual description (detailed, suitable for image generation)
 3. Duration in seconds
 
-Format as JSON array with this structure:
-[
-  {{
-    "frame_number": 1,
-    "description": "Detailed visual description",
-    "duration_sec": 5.0
-  }}
-]
-
-Return ONLY valid JSON, no additional text.
+Respond with a JSON object with this structure:
+{{
+  "frames": [
+    {{
+      "frame_number": 1,
+      "description": "Detailed visual description",
+      "duration_sec": 5.0
+    }}
+  ]
+}}
 """
     
-    storyboard_text = call_tamus_api(prompt, max_tokens=2000)
-    
     # Step 2: Parse and generate images
+    storyboard_text = ""
     storyboard_frames = []
     try:
-        frames_data = json.loads(storyboard_text)
+        storyboard_text = await acall_tamus_api(prompt, OUTPUT_BUDGETS["storyboard"], json_mode=True)
+        frames_data = _parse_json(storyboard_text)
+        if isinstance(frames_data, dict):
+            frames_data = frames_data.get("frames", [])
+        if not isinstance(frames_data, list):
+            raise ValueError(f"expected a list of frames, got {type(frames_data).__name__}")
+        frames_data = [frame_data for frame_data in frames_data if isinstance(frame_data, dict)]
         
-        print(f"Generating {len(frames_data)} storyboard images with Gemini 2.5 Flash...")
+        logger.info("Generating %d storyboard images with Gemini 2.5 Flash...", len(frames_data))
         
         try:
-            import google.genai as genai
-            import base64
-            
             gemini_api_key = os.getenv("GEMINI_API_KEY")
             if gemini_api_key:
-                client = genai.Client(api_key=gemini_api_key)
+                client = get_gemini_client(gemini_api_key)
                 
-                for frame_data in frames_data:
-                    frame_num = frame_data.get("frame_number", 0)
-                    description = frame_data.get("description", "")
-                    duration = frame_data.get("duration_sec", 5.0)
-                    
-                    image_prompt = f"""Generate an image: Professional storyboard frame for a {brand_name} advertisement.
-
-Scene Description: {description}
-
-Style: Cinematic, professional advertising, high quality, detailed composition.
-Format: 16:9 aspect ratio, suitable for video production."""
-                    
-                    try:
-                        response = client.models.generate_content(
-                            model="gemini-2.5-flash-image",
-                            contents=image_prompt
-                        )
-                        
-                        image_data = None
-                        if hasattr(response, 'candidates') and len(response.candidates) > 0:
-                            candidate = response.candidates[0]
-                            if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                                for part in candidate.content.parts:
-                                    if hasattr(part, 'inline_data'):
-                                        # Convert binary data to base64 data URL
-                                        mime_type = part.inline_data.mime_type
-                                        image_bytes = part.inline_data.data
-                                        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                                        image_data = f"data:{mime_type};base64,{image_base64}"
-                                        break
-                        
-                        storyboard_frames.append({
-                            "frame_number": frame_num,
-                            "description": description,
-                            "image_url": image_data,
-                            "duration_sec": duration
-                        })
-                        
-                        if image_data:
-                            print(f"  ✓ Generated frame {frame_num} ({len(image_data)} chars)")
+                batched = None
+                if GEMINI_BATCH_FRAMES and frames_data:
+                    batched = await _generate_frame_images_batched(client, frames_data, brand_name)
+                
+                if batched is not None:
+                    for frame_data, image_data in zip(frames_data, batched):
+                        frame = _text_only_frame(frame_data)
+                        frame["image_url"] = image_data
+                        storyboard_frames.append(frame)
+                else:
+                    # All frames are requested concurrently, bounded by the semaphore
+                    semaphore = asyncio.Semaphore(GEMINI_CONCURRENCY)
+                    frame_header = FRAME_IMAGE_HEADER.substitute(brand_name=brand_name)
+                    inflight = {}
+                    results = await asyncio.gather(
+                        *[_generate_frame_image(client, semaphore, frame_data, frame_header, inflight)
+                          for frame_data in frames_data],
+                        return_exceptions=True
+                    )
+                
+                    for frame_data, result in zip(frames_data, results):
+                        if isinstance(result, Exception):
+                            logger.warning("Failed to generate image for frame %s: %s", frame_data.get('frame_number', 0), result)
+                            storyboard_frames.append(_text_only_frame(frame_data))
                         else:
-                            print(f"  ⚠ Frame {frame_num} generated but no image data")
-                        
-                    except Exception as img_error:
-                        print(f"  ⚠ Failed to generate image for frame {frame_num}: {img_error}")
-                        storyboard_frames.append({
-                            "frame_number": frame_num,
-                            "description": description,
-                            "image_url": None,
-                            "duration_sec": duration
-                        })
+                            storyboard_frames.append(result)
             else:
-                print("⚠ GEMINI_API_KEY not set - text-only storyboard")
-                for frame_data in frames_data:
-                    storyboard_frames.append({
-                        "frame_number": frame_data.get("frame_number", 0),
-                        "description": frame_data.get("description", ""),
-                        "image_url": None,
-                        "duration_sec": frame_data.get("duration_sec", 5.0)
-                    })
+                logger.warning("GEMINI_API_KEY not set - text-only storyboard")
+                storyboard_frames = [_text_only_frame(frame_data) for frame_data in frames_data]
                 
         except ImportError:
-            print("⚠ google-genai not installed - text-only storyboard")
-            for frame_data in frames_data:
-                storyboard_frames.append({
-                    "frame_number": frame_data.get("frame_number", 0),
-                    "description": frame_data.get("description", ""),
-                    "image_url": None,
-                    "duration_sec": frame_data.get("duration_sec", 5.0)
-                })
+            logger.warning("google-genai not installed - text-only storyboard")
+            storyboard_frames = [_text_only_frame(frame_data) for frame_data in frames_data]
         
-    except json.JSONDecodeError as e:
-        print(f"⚠ Failed to parse storyboard JSON: {e}")
+    except (TamusResponseError, ValueError) as e:
+        # Covers empty replies, truncated JSON and JSON of the wrong shape
+        logger.warning("Failed to get storyboard frames: %s", e)
         storyboard_frames = []
     
     return {
@@ -371,9 +657,9 @@ Format: 16:9 aspect ratio, suitable for video production."""
 # PRODUCTION PLANNING NODES (SIMPLIFIED FOR WEB)
 # ============================================================================
 
-def scene_breakdown_node(state: State) -> Dict:
+async def scene_breakdown_node(state: State) -> Dict:
     """Break down storyboard into structured scene plan."""
-    print("------ENTERING: SCENE BREAKDOWN NODE------")
+    logger.info("------ENTERING: SCENE BREAKDOWN NODE------")
     
     storyboard = state.get("story_board", "")
     duration = state.get("creative_brief", {}).get("target_duration_sec", 30)
@@ -383,47 +669,92 @@ def scene_breakdown_node(state: State) -> Dict:
 Storyboard: {storyboard}
 Duration: {duration} seconds
 
-Generate JSON with scenes and shots arrays. Return ONLY valid JSON."""
-    
-    scene_plan_json = call_tamus_api(prompt)
+Respond with a JSON object with "scenes" and "shots" arrays."""
     
     try:
-        scene_plan = json.loads(scene_plan_json)
-        print(f"Generated scene plan with {len(scene_plan.get('scenes', []))} scenes")
+        scene_plan_json = await acall_tamus_api(prompt, OUTPUT_BUDGETS["scene_breakdown"], json_mode=True)
+        scene_plan = _parse_json(scene_plan_json)
+        if not isinstance(scene_plan, dict):
+            raise ValueError(f"expected a JSON object, got {type(scene_plan).__name__}")
+        logger.info("Generated scene plan with %d scenes", len(scene_plan.get('scenes', [])))
         return {"scene_plan": scene_plan, "overall_status": "Scene plan created. "}
-    except json.JSONDecodeError:
+    except (TamusResponseError, ValueError) as e:
+        logger.warning("Failed to get scene plan: %s", e)
         return {"scene_plan": {"scenes": [], "shots": []}, "overall_status": "Scene plan created. "}
 
 
-def production_planning_node(state: State) -> Dict:
-    """Generate all production planning artifacts in one node."""
-    print("------ENTERING: PRODUCTION PLANNING NODE------")
+# Maximum number of planning artifacts generated at once (keep under the TAMUS RPM limit)
+PLANNING_CONCURRENCY = int(os.getenv("PLANNING_CONCURRENCY", "6"))
+
+
+async def _plan_budget(scenes: List[Dict]) -> Dict:
+    """Budget slice of the production pack."""
+    return {"budget_estimate": {"total_min": 15000, "total_max": 25000, "line_items": []}}
+
+
+async def _plan_schedule(scenes: List[Dict]) -> Dict:
+    """Shooting schedule slice of the production pack."""
+    return {"schedule_plan": {"total_shoot_days": 2, "schedule_days": [], "assumptions": []}}
+
+
+async def _plan_locations(scenes: List[Dict]) -> Dict:
+    """Locations slice of the production pack."""
+    return {"locations_plan": {"locations": [], "permits_required": [], "noise_restrictions": False, "time_restrictions": "", "parking_availability": "", "insurance_requirements": ""}}
+
+
+async def _plan_crew_gear(scenes: List[Dict]) -> Dict:
+    """Crew and equipment slice of the production pack."""
+    return {"crew_gear_package": {"crew": [], "equipment": []}}
+
+
+async def _plan_legal(scenes: List[Dict]) -> Dict:
+    """Legal clearance slice of the production pack."""
+    return {"legal_clearance_report": {"items": [], "minors_involved": False, "drone_permits_required": False}}
+
+
+async def _plan_risks(scenes: List[Dict]) -> Dict:
+    """Risk register slice of the production pack."""
+    return {"risk_register": {"risks": []}}
+
+
+# Independent production artifacts: each reads only the scene plan and
+# returns a disjoint slice of the state, so they can all run at once
+PLANNING_ARTIFACTS = [
+    _plan_budget,
+    _plan_schedule,
+    _plan_locations,
+    _plan_crew_gear,
+    _plan_legal,
+    _plan_risks,
+]
+
+
+async def production_planning_node(state: State) -> Dict:
+    """Generate all production planning artifacts in one node (concurrently)."""
+    logger.info("------ENTERING: PRODUCTION PLANNING NODE------")
     
     scene_plan = state.get("scene_plan", {})
     scenes = scene_plan.get("scenes", [])
     
-    # Generate simplified production pack
-    production_pack = {
-        "budget": {"total_min": 15000, "total_max": 25000, "line_items": []},
-        "schedule": {"total_shoot_days": 2, "days": []},
-        "crew": [],
-        "locations": [],
-        "equipment": [],
-        "legal": []
-    }
+    semaphore = asyncio.Semaphore(PLANNING_CONCURRENCY)
     
-    return {
-        "budget_estimate": production_pack["budget"],
-        "schedule_plan": {"total_shoot_days": 2, "schedule_days": [], "assumptions": []},
-        "locations_plan": {"locations": [], "permits_required": [], "noise_restrictions": False, "time_restrictions": "", "parking_availability": "", "insurance_requirements": ""},
-        "crew_gear_package": {"crew": [], "equipment": []},
-        "legal_clearance_report": {"items": [], "minors_involved": False, "drone_permits_required": False},
-        "risk_register": {"risks": []},
+    async def run(planner):
+        async with semaphore:
+            return await planner(scenes)
+    
+    results = await asyncio.gather(*[run(planner) for planner in PLANNING_ARTIFACTS])
+    
+    result = {}
+    for artifact in results:
+        result.update(artifact)
+    
+    result.update({
         "casting_suggestions": {},
         "props_wardrobe_list": {},
         "production_pack": "production_pack.md",
         "overall_status": "Production planning complete. "
-    }
+    })
+    return result
 
 
 # ============================================================================
@@ -432,13 +763,15 @@ def production_planning_node(state: State) -> Dict:
 
 def create_web_production_pipeline():
     """Create web-compatible production pipeline (no HITL gates)."""
+    # Imported here so importing the node functions (backend/pipeline_integration)
+    # doesn't pay for loading langgraph
+    from langgraph.graph import StateGraph
     
     workflow = StateGraph(State)
     
     # Add nodes
     workflow.add_node("ad_concept_creation_node", ad_concept_creation_node)
-    workflow.add_node("screen_play_creation_in_rajamouli_style", screen_play_creation_node_1)
-    workflow.add_node("screen_play_creation_in_shankar_style", screen_play_creation_node_2)
+    workflow.add_node("screenplays_parallel_node", screenplays_parallel_node)
     workflow.add_node("screenplay_evaluation_node", screenplay_evaluation_node)
     workflow.add_node("story_board_creation_node", story_board_creation_node)
     workflow.add_node("scene_breakdown_node", scene_breakdown_node)
@@ -448,10 +781,8 @@ def create_web_production_pipeline():
     workflow.set_entry_point("ad_concept_creation_node")
     
     # Creative chain edges
-    workflow.add_edge("ad_concept_creation_node", "screen_play_creation_in_rajamouli_style")
-    workflow.add_edge("ad_concept_creation_node", "screen_play_creation_in_shankar_style")
-    workflow.add_edge("screen_play_creation_in_rajamouli_style", "screenplay_evaluation_node")
-    workflow.add_edge("screen_play_creation_in_shankar_style", "screenplay_evaluation_node")
+    workflow.add_edge("ad_concept_creation_node", "screenplays_parallel_node")
+    workflow.add_edge("screenplays_parallel_node", "screenplay_evaluation_node")
     workflow.add_edge("screenplay_evaluation_node", "story_board_creation_node")
     workflow.add_edge("story_board_creation_node", "scene_breakdown_node")
     workflow.add_edge("scene_breakdown_node", "production_planning_node")
@@ -462,15 +793,19 @@ def create_web_production_pipeline():
     return workflow.compile()
 
 
+@functools.lru_cache(maxsize=1)
+def get_web_production_pipeline():
+    """Return the compiled web pipeline, building it on first use (it holds no per-run state)."""
+    return create_web_production_pipeline()
+
+
 # ============================================================================
 # WEB API HELPER FUNCTIONS
 # ============================================================================
 
 async def run_pipeline_async(creative_brief: Dict) -> Dict:
     """Run pipeline asynchronously for web API."""
-    import asyncio
-    
-    pipeline = create_web_production_pipeline()
+    pipeline = get_web_production_pipeline()
     
     initial_state = {
         "theme": creative_brief.get("theme", ""),
@@ -478,8 +813,8 @@ async def run_pipeline_async(creative_brief: Dict) -> Dict:
         "overall_status": ""
     }
     
-    # Run in thread pool to avoid blocking
-    loop = asyncio.get_event_loop()
-    final_state = await loop.run_in_executor(None, pipeline.invoke, initial_state)
+    # Nodes are async (blocking TAMUS calls run on worker threads), so the
+    # screenplay fan-out and the storyboard frames overlap on one event loop
+    final_state = await pipeline.ainvoke(initial_state)
     
     return final_state
@@ -4,14 +4,32 @@ Exact implementation from 05_movie_storyboarding.ipynb
 """
 
 import operator
+import functools
+import contextlib
+import inspect
+import logging
 from typing import Annotated, TypedDict
 from langgraph.graph import StateGraph, START, END
 import os
 import base64
 import asyncio
+import hashlib
+import json
+import random
+import re
+import string
+import time
+
+import requests
 
 # Import TAMUS wrapper for text generation
-from tamus_wrapper import get_tamus_client
+from tamus_wrapper import get_tamus_client, extract_text, TamusResponseError, TokenBudgetExceeded
+from llm_cache import (
+    cache_enabled, get_llm_cache, make_cache_key,
+    search_cache_enabled, get_search_cache, make_search_cache_key
+)
+from semantic_cache import semantic_cache_enabled, get_semantic_cache
+from rate_limiter import get_rate_limiter
 
 # Import Gemini for image generation
 import google.genai as genai
@@ -19,6 +37,24 @@ import google.genai as genai
 # Import LangChain components for Tavily search integration
 from langchain_community.retrievers import TavilySearchAPIRetriever
 
+# Optional: OpenTelemetry spans per graph node (a no-op unless the app
+# configures an SDK/exporter, e.g. via opentelemetry-instrument)
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+# Optional: exact token counts for prompt capping (installed with
+# langchain-openai); without it lengths are estimated from characters
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+logger = logging.getLogger(__name__)
+_tracer = trace.get_tracer(__name__) if trace is not None else None
+
 
 # ============================================================================
 # State Definition (from notebook)
@@ -31,6 +67,10 @@ class State(TypedDict):
     screenplay_2: str
     screenplay_winner: int
     story_board: str
+    story_board_scenes: list
+    search_ctx_concept: str
+    search_ctx_raj: str
+    search_ctx_shankar: str
     overall_status: Annotated[str, operator.add]
 
 
@@ -38,10 +78,20 @@ class State(TypedDict):
 # Helper Functions for Tavily Search (simplified)
 # ============================================================================
 
+# Characters kept from each Tavily result injected into prompts
+SEARCH_SNIPPET_CHARS = 200
+
+
 def search_web_for_context(query: str, max_results: int = 5) -> str:
     """
     Search the web using Tavily and return context for the LLM
     
+    Only the top-scoring results are kept, each truncated to
+    SEARCH_SNIPPET_CHARS and ordered by URL, so the block stays small and
+    identical for identical results. A short content hash is logged to make
+    drift between runs visible. With TAVILY_CACHE=1 successful results are
+    cached by query for TAVILY_CACHE_TTL seconds.
+    
     Args:
         query: Search query
         max_results: Maximum number of results to return
@@ -49,94 +99,59 @@ def search_web_for_context(query: str, max_results: int = 5) -> str:
     Returns:
         Formatted search results as context string
     """
+    cache_key = None
+    if search_cache_enabled():
+        cache_key = make_search_cache_key(query, max_results)
+        cached = get_search_cache().get(cache_key)
+        if cached is not None:
+            logger.debug("Search cache hit (%d chars)", len(cached))
+            return cached
+    
     try:
         retriever = TavilySearchAPIRetriever(k=max_results)
+        get_rate_limiter("tavily").acquire()
         results = retriever.invoke(query)
         
         if not results:
             return "No web search results found."
         
+        # Top-K by Tavily's relevance score, then a stable order
+        top = sorted(results, key=lambda doc: doc.metadata.get("score", 0), reverse=True)[:max_results]
+        top.sort(key=lambda doc: doc.metadata.get("source", ""))
+        
         # Format results as context
-        context = "Web Search Results:\n\n"
-        for idx, doc in enumerate(results, 1):
-            context += f"{idx}. {doc.page_content}\n\n"
+        lines = ["Web Search Results:\n"]
+        for idx, doc in enumerate(top, 1):
+            snippet = " ".join(doc.page_content.split())[:SEARCH_SNIPPET_CHARS]
+            lines.append(f"{idx}. {snippet}")
+        context = "\n".join(lines)
+        
+        version = hashlib.md5(context.encode("utf-8")).hexdigest()[:8]
+        logger.debug("Search context %s (%d snippets, %d chars)", version, len(top), len(context))
+        
+        if cache_key is not None:
+            get_search_cache().set(cache_key, context)
         
         return context
     except Exception as e:
-        print(f"⚠ Tavily search failed: {e}")
+        logger.warning("Tavily search failed: %s", e)
         return "Web search unavailable."
 
 
 # ============================================================================
-# Node 1: Ad Concept Creation (with Tavily web search)
+# Static Prompt Prefixes
 # ============================================================================
+# Each node sends its fixed instructions as the system message and only the
+# per-run data (search context, theme, concept, screenplay) in the user
+# message, so the prompt prefix is identical across runs and provider-side
+# prompt caching can reuse it.
 
-def ad_concept_creation_node(state):
-    """
-    Creates an advertisement concept from a theme using TAMUS GPT-5.2 with Tavily web search
-    """
-    print("------ENTERING: CONCEPT CREATION NODE------")
-    
-    # Search the web for inspiration and current trends
-    print("  → Searching web for inspiration...")
-    search_context = search_web_for_context(f"creative advertising concepts for {state['theme']}", max_results=3)
-    
-    concept_creator_prompt = f"""You are an intelligent advertisement concept creator for any given theme.
+CONCEPT_SYSTEM_PROMPT = """You are an intelligent advertisement concept creator for any given theme.
 Your job is to generate a concept for the given theme and justify it.
 
-{search_context}
-
-Use the web search results above for inspiration, but make sure the concept is fresh and novel.
-
-Theme: {state['theme']}
-
-Generate a creative concept for this ad campaign."""
-    
-    # Use TAMUS for concept generation
-    llm = get_tamus_client()
-    
-    response = llm.messages().create(
-        model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-        messages=[{"role": "user", "content": concept_creator_prompt}],
-        max_tokens=2000
-    )
-    
-    # Extract text from response
-    concept_text = ""
-    if hasattr(response, 'content'):
-        content = response.content
-        if isinstance(content, list) and len(content) > 0:
-            if isinstance(content[0], dict) and 'text' in content[0]:
-                concept_text = content[0]['text']
-            else:
-                concept_text = str(content[0])
-        elif isinstance(content, str):
-            concept_text = content
-        else:
-            concept_text = str(content)
-    else:
-        concept_text = str(response)
-    
-    print(f"✓ Concept generated: {len(concept_text)} characters")
-    
-    return {"concept": concept_text}
-
-
-# ============================================================================
-# Node 2: Screenplay Creation - Rajamouli Style (with Tavily search)
-# ============================================================================
+Use the web search results provided for inspiration, but make sure the concept is fresh and novel."""
 
-def screen_play_creation_node_1(state):
-    """
-    Creates screenplay in SS Rajamouli style (epic, grand visuals) with Tavily web search
-    """
-    print("------ENTERING: SCREENPLAY CREATION NODE 1: In SS Rajamouli Style------")
-    
-    # Search the web for Rajamouli style references
-    print("  → Searching web for Rajamouli style references...")
-    search_context = search_web_for_context(f"SS Rajamouli filmmaking style epic storytelling", max_results=3)
-    
-    screenplay_writer_prompt = f"""#Context: You are an autonomous AI screenplay creation agent designed to create a screenplay for any given advertisement concept.
+RAJAMOULI_SCREENPLAY_SYSTEM_PROMPT = """#Context: You are an autonomous AI screenplay creation agent designed to create a screenplay for any given advertisement concept.
 
 #Objective: Generate a unique, fresh, and novel screenplay for an advertisement concept.
 
@@ -147,8 +162,6 @@ def screen_play_creation_node_1(state):
   - The screenplay should be influenced by the style of SS Rajamouli, a renowned Indian cinema director known for his epic storytelling, grand visuals, and emotional depth.
   - Emulate the cinematic experience seen in Rajamouli's films, focusing on strong character development, dramatic plot twists, and visually captivating scenes.
 
-{search_context}
-
 2. Content Compliance:
 
   - Ensure the screenplay adheres to all content guidelines and does not include any content violations.
@@ -189,56 +202,9 @@ Additional Notes:
   - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience.
   - Maintain the color palette, mood, and character consistency throughout the screenplay.
   - Incorporate Rajamouli's signature elements such as heroic feats, moral dilemmas, and visually stunning sequences.
-  - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience.
+  - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience."""
 
-Given Theme: {state['theme']}
-Given Concept: {state['concept']}"""
-    
-    # Use TAMUS for screenplay generation
-    llm = get_tamus_client()
-    
-    response = llm.messages().create(
-        model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-        messages=[{"role": "user", "content": screenplay_writer_prompt}],
-        max_tokens=2000
-    )
-    
-    # Extract text from response
-    screenplay_text = ""
-    if hasattr(response, 'content'):
-        content = response.content
-        if isinstance(content, list) and len(content) > 0:
-            if isinstance(content[0], dict) and 'text' in content[0]:
-                screenplay_text = content[0]['text']
-            else:
-                screenplay_text = str(content[0])
-        elif isinstance(content, str):
-            screenplay_text = content
-        else:
-            screenplay_text = str(content)
-    else:
-        screenplay_text = str(response)
-    
-    print(f"✓ Screenplay 1 (Rajamouli) generated: {len(screenplay_text)} characters")
-    
-    return {"screenplay_1": screenplay_text}
-
-
-# ============================================================================
-# Node 3: Screenplay Creation - Shankar Style (with Tavily search)
-# ============================================================================
-
-def screen_play_creation_node_2(state):
-    """
-    Creates screenplay in Shankar style (high-tech, futuristic, social message) with Tavily web search
-    """
-    print("------ENTERING: SCREENPLAY CREATION NODE 2: In Shankar Style------")
-    
-    # Search the web for Shankar style references
-    print("  → Searching web for Shankar style references...")
-    search_context = search_web_for_context(f"Shankar director filmmaking style high-tech futuristic", max_results=3)
-    
-    screenplay_writer_prompt = f"""#Context: You are an autonomous AI screenplay creation agent designed to create a screenplay for any given advertisement concept.
+SHANKAR_SCREENPLAY_SYSTEM_PROMPT = """#Context: You are an autonomous AI screenplay creation agent designed to create a screenplay for any given advertisement concept.
 
 #Objective: Generate a unique, fresh, and novel screenplay for an advertisement concept.
 
@@ -249,8 +215,6 @@ def screen_play_creation_node_2(state):
   - The screenplay should be influenced by the style of Shankar, a renowned Indian cinema director known for his grandiose visuals, intricate storytelling, and socially relevant themes.
   -  The screenplay should reflect Shankar's cinematic experience, including high-impact visuals, compelling narratives, and dramatic sequences. Emphasize strong character development, elaborate sets, and emotional depth.
 
-{search_context}
-
 2. Content Compliance:
 
   - Ensure the screenplay adheres to all content guidelines and does not include any content violations.
@@ -291,41 +255,466 @@ Additional Notes:
   - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience.
   - Maintain the color palette, mood, and character consistency throughout the screenplay.
   - Incorporate Shankar's signature elements such as grandiose visuals, intricate storytelling, and socially relevant themes.
-  - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience.
+  - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience."""
+
+STORYBOARD_SYSTEM_PROMPT_VERBOSE = """#Context: You are an autonomous AI image generation agent designed to create unique and high-quality images based on user-provided prompts. Your task is to interpret the given prompt creatively and generate an image that accurately reflects the described scene or concept.
+
+#Objective: Generate images for storyboard creation for advertisements by adhering to the below guidelines
+
+#Guidelines:
+
+1. Receive and Process Multi-Scene Prompts:
+    - The prompt will contain multiple scenes.
+    - Each scene will include the following components: Visual, Sound, Camera Transition, Action, Close-Up, Text on Screen.
+    - Also the prompt consists of Justification with Relatability, Emotional Appeal, Visual Aesthetics, Clear Message.
+
+2. Iterative Scene Processing:
+    - For each scene, extract the Visual, Sound, Camera Transition, Action, Close-Up, and Text on Screen elements.
+    - Generate an image that accurately represents the combined essence of these elements.
+    - Ensure consistency across all scenes by maintaining the same character descriptions, color palette, and visual style.
+
+3. Image Generation Guidelines:
+    - Visual: Focus on the main visual elements described. This includes the setting, objects, and characters.
+    - Sound: Although sound is auditory, interpret and reflect the mood or atmosphere it conveys visually.
+    - Camera Transition: Reflect the specified camera transitions (e.g., zoom, pan, tilt) to capture the dynamic aspect of the scene.
+    - Action: Ensure the image captures the described action, emphasizing motion or interaction where applicable.
+    - Close-Up: Highlight any specified close-up elements to focus on details or emotions.
+    - Text on Screen: Integrate the provided text into the image, ensuring it complements the visual narrative.
+    - Make sure you include the and follow Justification mentioned in Guidelines #1 in all the images that you generate
+
+4. Consistency and Continuity:
+    - Maintain consistent color palettes, mood, and characters across all scenes
+    - Use the same character descriptions in every scene for consistency"""
+
+STORYBOARD_SYSTEM_PROMPT_COMPACT = """You generate storyboard image prompts for an advertisement, one per scene of the screenplay.
+1. Each scene has: Visual, Sound, Camera Transition, Action, Close-Up, Text on Screen, plus a Justification (Relatability, Emotional Appeal, Visual Aesthetics, Clear Message).
+2. Per scene, depict: Visual (setting, objects, characters); Sound as mood; Camera Transition (zoom/pan/tilt); Action in motion; Close-Up detail; Text on Screen integrated.
+3. Reflect the Justification in every image.
+4. Keep characters, color palette, mood and style identical across scenes."""
+
+# The compact spec is the default; STORYBOARD_VERBOSE_PROMPT=1 restores the
+# notebook's full guideline block for fidelity comparisons
+STORYBOARD_SYSTEM_PROMPT = (
+    STORYBOARD_SYSTEM_PROMPT_VERBOSE
+    if os.getenv("STORYBOARD_VERBOSE_PROMPT", "0").lower() in ("1", "true", "yes")
+    else STORYBOARD_SYSTEM_PROMPT_COMPACT
+)
+
+
+# Per-scene fan-out: each scene gets its own short storyboard call, run
+# concurrently, instead of one long completion covering every scene
+STORYBOARD_PER_SCENE = os.getenv("STORYBOARD_PER_SCENE", "1").lower() in ("1", "true", "yes")
+# Reasoning tokens count against max_tokens, so even one scene needs headroom
+STORYBOARD_SCENE_MAX_TOKENS = 2000
+
+STORYBOARD_SCENE_INSTRUCTION = """
+You receive the screenplay's opening context and ONE of its scenes. Generate the storyboard image prompt for that scene only; the context keeps characters and palette consistent with the other scenes."""
+
+# Storyboard output is long and templated, so it can go to a faster model
+# (e.g. a small or speculative-decoding deployment); other nodes keep
+# TAMUS_MODEL. Unset = TAMUS_MODEL everywhere.
+STORYBOARD_MODEL = os.getenv("TAMUS_STORYBOARD_MODEL") or None
+
+# Alongside the prose, ask a concurrent JSON-mode call for per-scene metadata
+# (state["story_board_scenes"]) that downstream stages can consume directly
+STORYBOARD_STRUCTURED = os.getenv("STORYBOARD_STRUCTURED", "0").lower() in ("1", "true", "yes")
+
+STORYBOARD_JSON_INSTRUCTION = """
+Reply with a JSON object only: {"scenes": [{"scene": 1, "title": "...", "image_prompt": "...", "camera": "...", "mood": "...", "text_on_screen": "..."}]}, one entry per scene in screenplay order."""
+
+# Scene headings as the screenplay prompts produce them: "Scene 3", "Opening
+# Scene", "c. Climactic Scene:", optionally wrapped in markdown emphasis/headers
+SCENE_HEADING = re.compile(
+    r"(?mi)^[ \t#*>-]*(?:[a-z0-9]\.\s*)?[*_]*"
+    r"(?:scene\s*\d+|(?:opening|middle|climactic|climax|ending|final|closing)\s+scenes?)\b"
+)
+
+
+# Longest screenplay sent to the storyboard agent; the screenplay prompts ask
+# for ~3500 characters (~900 tokens), so only a runaway upstream reply is cut
+STORYBOARD_MAX_INPUT_TOKENS = int(os.getenv("STORYBOARD_MAX_INPUT_TOKENS", "4000"))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tokenizer once per process (None if tiktoken is unavailable)."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("Could not load tiktoken encoding, estimating token counts: %s", e)
+        return None
+
+
+def warm_up() -> None:
+    """Load the tokenizer and (if enabled) the semantic cache ahead of the first run."""
+    _get_encoding()
+    if semantic_cache_enabled():
+        get_semantic_cache()
+
+
+def cap_tokens(text: str, max_tokens: int, label: str) -> str:
+    """
+    Truncate text to at most max_tokens tokens.
+    
+    Counts with tiktoken when available, otherwise assumes ~4 characters per
+    token. The tokenizer only approximates the serving model's, which is
+    close enough for a guard against runaway inputs.
+    
+    Args:
+        text: Text about to be placed in a prompt
+        max_tokens: Token budget for that text
+        label: Name used in the truncation warning
+        
+    Returns:
+        str: text unchanged, or its truncated prefix with a marker
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        if len(text) <= max_tokens * 4:
+            return text
+        capped = text[:max_tokens * 4]
+    else:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        capped = encoding.decode(tokens[:max_tokens])
+    logger.warning("%s exceeds %d tokens, truncating", label, max_tokens)
+    return capped + f"\n\n[{label} truncated due to length]"
+
+
+def split_screenplay_scenes(screenplay_text: str):
+    """
+    Split a screenplay into its preamble and scene blocks.
+    
+    Args:
+        screenplay_text: Screenplay as returned by a screenplay node
+        
+    Returns:
+        tuple: (preamble before the first scene heading, list of scene blocks);
+            the list is empty when no scene headings are found
+    """
+    starts = [m.start() for m in SCENE_HEADING.finditer(screenplay_text)]
+    if not starts:
+        return screenplay_text, []
+    bounds = starts + [len(screenplay_text)]
+    scenes = [screenplay_text[a:b].strip() for a, b in zip(bounds, bounds[1:])]
+    return screenplay_text[:starts[0]].strip(), [s for s in scenes if s]
+
+
+# User-turn templates, parsed once at import; only these vary per call
+CONCEPT_USER_PROMPT = string.Template("""$search_context
+
+Theme: $theme
+
+Generate a creative concept for this ad campaign.""")
+
+SCREENPLAY_USER_PROMPT = string.Template("""$search_context
+
+Given Theme: $theme
+Given Concept: $concept""")
+
+STORYBOARD_USER_PROMPT = string.Template("""Now, process the following screenplay and generate storyboard images for each scene:
+
+$screenplay_text""")
+
+STORYBOARD_SCENE_PROMPT = string.Template("""Screenplay context:
+
+$preamble
+
+Scene to storyboard:
+
+$scene""")
+
+
+# ============================================================================
+# TAMUS helper with response caching
+# ============================================================================
+
+# Send an OpenAI-style prompt_cache_key with system-prompted calls; off by
+# default since not every OpenAI-compatible endpoint accepts the field
+TAMUS_PROMPT_CACHE_KEY = os.getenv("TAMUS_PROMPT_CACHE_KEY", "0").lower() in ("1", "true", "yes")
+
+# Attempts per call; 429/5xx and empty/malformed responses are retried with
+# jittered backoff
+TAMUS_RETRIES = 3
 
-Given Theme: {state['theme']}
-Given Concept: {state['concept']}"""
+
+def call_tamus(prompt: str, max_tokens: int, semantic_scope: str = None, system: str = None,
+               on_chunk=None, json_mode: bool = False, model: str = None) -> str:
+    """
+    Call TAMUS, serving repeated prompts from the response caches.
+    
+    Exact repeats are answered by the SQLite cache (TAMUS_CACHE=1). Prompts
+    that pass a semantic_scope also consult the embedding cache
+    (SEMANTIC_CACHE=1); a hit must share the scope exactly.
+    
+    Args:
+        prompt: The prompt to send
+        max_tokens: Maximum tokens in response
+        semantic_scope: Opt into the semantic cache (e.g. the theme)
+        system: Static instructions sent as a leading system message, so
+            repeat calls share a cacheable prefix from token 0
+        on_chunk: Stream the response and call this with each text delta
+            (a cache hit is delivered as a single chunk)
+        json_mode: Request a JSON object reply (response_format json_object);
+            the prompt must still describe the expected shape
+        model: Model override (defaults to TAMUS_MODEL)
+        
+    Returns:
+        Response text
+    """
+    model = model or os.getenv("TAMUS_MODEL", "protected.gpt-5.2")
+    
+    cache_key = None
+    if cache_enabled():
+        cache_key = make_cache_key(model, prompt, max_tokens, system, json_mode)
+        cached = get_llm_cache().get(cache_key)
+        if cached is not None:
+            logger.debug("Cache hit (%d chars)", len(cached))
+            if on_chunk is not None:
+                on_chunk(cached)
+            return cached
+    
+    use_semantic = semantic_scope is not None and semantic_cache_enabled()
+    if use_semantic:
+        cached = get_semantic_cache().lookup(prompt, semantic_scope, model, max_tokens)
+        if cached is not None:
+            if on_chunk is not None:
+                on_chunk(cached)
+            return cached
+    
+    messages = [{"role": "user", "content": prompt}]
+    if system is not None:
+        messages.insert(0, {"role": "system", "content": system})
+    
+    # Calls sharing a system prompt share a cache key, so the provider can
+    # serve that prefix from its prompt cache (TAMUS_PROMPT_CACHE_KEY=1)
+    prompt_cache_key = None
+    if system is not None and TAMUS_PROMPT_CACHE_KEY:
+        prompt_cache_key = "ad_workflow-" + hashlib.sha256(system.encode("utf-8")).hexdigest()[:16]
+    
+    if trace is not None:
+        # Runs on a worker thread, but to_thread carries the node's span context
+        trace.get_current_span().add_event(
+            "tamus.request", {"prompt_chars": len(prompt), "max_tokens": max_tokens}
+        )
     
-    # Use TAMUS for screenplay generation
     llm = get_tamus_client()
+    budget = max_tokens
+    for attempt in range(TAMUS_RETRIES):
+        get_rate_limiter("tamus").acquire()
+        try:
+            response = llm.messages().create(
+                model=model,
+                messages=messages,
+                max_tokens=budget,
+                on_chunk=on_chunk,
+                prompt_cache_key=prompt_cache_key,
+                response_format={"type": "json_object"} if json_mode else None
+            )
+            text = extract_text(response)
+            break
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            # Only rate limits and server errors are worth another try
+            if attempt == TAMUS_RETRIES - 1 or not (status == 429 or (status or 0) >= 500):
+                raise
+            reason = status
+        except TokenBudgetExceeded:
+            # Reasoning used the whole budget; the same budget would fail the
+            # same way, so retry once at double it (cached under the original)
+            if attempt == TAMUS_RETRIES - 1 or budget > max_tokens:
+                raise
+            budget = max_tokens * 2
+            logger.warning("TAMUS ran out of tokens, retrying with max_tokens=%d", budget)
+            continue
+        except TamusResponseError as e:
+            # Empty or malformed payloads are usually transient; never pass them on as text
+            if attempt == TAMUS_RETRIES - 1:
+                raise
+            reason = e
+        delay = min(30.0, 2.0 * 2 ** attempt) * random.uniform(0.5, 1.5)
+        logger.warning("TAMUS call failed (%s), retrying in %.1fs", reason, delay)
+        time.sleep(delay)
+    
+    if text.strip():
+        if cache_key is not None:
+            get_llm_cache().set(cache_key, text)
+        if use_semantic:
+            get_semantic_cache().add(prompt, semantic_scope, model, max_tokens, text)
+    
+    return text
+
+
+def semantic_cache_scope(theme: str) -> str:
+    """
+    Scope for semantic-cache entries derived from a theme
     
-    response = llm.messages().create(
-        model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-        messages=[{"role": "user", "content": screenplay_writer_prompt}],
-        max_tokens=2000
+    Themes built by the backend carry a "Brand: ..." line; scoping on that
+    lets a reworded brief for the same brand reuse a near-duplicate response,
+    while different brands can never share one. Free-form themes without a
+    brand line are scoped on the whole theme text.
+    """
+    for line in theme.splitlines():
+        if line.startswith("Brand:") and line[len("Brand:"):].strip():
+            return line.strip()
+    return theme
+
+
+async def acall_tamus(prompt: str, max_tokens: int, semantic_scope: str = None, system: str = None,
+                      on_chunk=None, json_mode: bool = False, model: str = None) -> str:
+    """
+    Async variant of call_tamus for the graph's async nodes.
+    
+    The blocking request runs on a worker thread, so the event loop (and any
+    other workflow sharing it in the FastAPI server) keeps going meanwhile.
+    """
+    return await asyncio.to_thread(
+        call_tamus, prompt, max_tokens, semantic_scope, system, on_chunk, json_mode, model
     )
+
+
+# ============================================================================
+# Node 0: Web Research (all Tavily queries up front)
+# ============================================================================
+
+CONCEPT_SEARCH_QUERY = "creative advertising concepts for {theme}"
+RAJAMOULI_SEARCH_QUERY = "SS Rajamouli filmmaking style epic storytelling"
+SHANKAR_SEARCH_QUERY = "Shankar director filmmaking style high-tech futuristic"
+
+
+async def web_research_node(state):
+    """
+    Runs the concept and both screenplay-style Tavily searches concurrently
+    and stores the results in state for the downstream nodes
+    """
+    logger.info("------ENTERING: WEB RESEARCH NODE------")
     
-    # Extract text from response
-    screenplay_text = ""
-    if hasattr(response, 'content'):
-        content = response.content
-        if isinstance(content, list) and len(content) > 0:
-            if isinstance(content[0], dict) and 'text' in content[0]:
-                screenplay_text = content[0]['text']
-            else:
-                screenplay_text = str(content[0])
-        elif isinstance(content, str):
-            screenplay_text = content
-        else:
-            screenplay_text = str(content)
-    else:
-        screenplay_text = str(response)
+    concept_ctx, raj_ctx, shankar_ctx = await asyncio.gather(
+        asyncio.to_thread(search_web_for_context, CONCEPT_SEARCH_QUERY.format(theme=state['theme']), 3),
+        asyncio.to_thread(search_web_for_context, RAJAMOULI_SEARCH_QUERY, 3),
+        asyncio.to_thread(search_web_for_context, SHANKAR_SEARCH_QUERY, 3)
+    )
+    
+    return {
+        "search_ctx_concept": concept_ctx,
+        "search_ctx_raj": raj_ctx,
+        "search_ctx_shankar": shankar_ctx
+    }
+
+
+# ============================================================================
+# Node 1: Ad Concept Creation (with Tavily web search)
+# ============================================================================
+
+async def ad_concept_creation_node(state, config=None):
+    """
+    Creates an advertisement concept from a theme using TAMUS GPT-5.2 with Tavily web search
     
-    print(f"✓ Screenplay 2 (Shankar) generated: {len(screenplay_text)} characters")
+    If the run config carries an "on_concept_chunk" callback (see
+    run_ad_workflow), the concept is streamed and each delta is passed to it.
+    """
+    logger.info("------ENTERING: CONCEPT CREATION NODE------")
+    
+    # Search the web for inspiration and current trends (normally done by web_research_node)
+    search_context = state.get("search_ctx_concept")
+    if search_context is None:
+        logger.info("Searching web for inspiration...")
+        search_context = await asyncio.to_thread(
+            search_web_for_context, CONCEPT_SEARCH_QUERY.format(theme=state['theme']), 3
+        )
+    
+    concept_creator_prompt = CONCEPT_USER_PROMPT.substitute(
+        search_context=search_context, theme=state['theme']
+    )
+    
+    on_chunk = ((config or {}).get("configurable") or {}).get("on_concept_chunk")
+    concept_text = await acall_tamus(
+        concept_creator_prompt, 2000, semantic_scope=semantic_cache_scope(state['theme']), system=CONCEPT_SYSTEM_PROMPT,
+        on_chunk=on_chunk
+    )
+    
+    logger.info("Concept generated: %d characters", len(concept_text))
+    
+    return {"concept": concept_text}
+
+
+# ============================================================================
+# Node 2: Screenplay Creation - Rajamouli Style (with Tavily search)
+# ============================================================================
+
+async def screen_play_creation_node_1(state):
+    """
+    Creates screenplay in SS Rajamouli style (epic, grand visuals) with Tavily web search
+    """
+    logger.info("------ENTERING: SCREENPLAY CREATION NODE 1: In SS Rajamouli Style------")
+    
+    # Search the web for Rajamouli style references (normally done by web_research_node)
+    search_context = state.get("search_ctx_raj")
+    if search_context is None:
+        logger.info("Searching web for Rajamouli style references...")
+        search_context = await asyncio.to_thread(search_web_for_context, RAJAMOULI_SEARCH_QUERY, 3)
+    
+    screenplay_writer_prompt = SCREENPLAY_USER_PROMPT.substitute(
+        search_context=search_context, theme=state['theme'], concept=state['concept']
+    )
+    
+    screenplay_text = await acall_tamus(
+        screenplay_writer_prompt, 2000,
+        semantic_scope=f"{semantic_cache_scope(state['theme'])}/rajamouli", system=RAJAMOULI_SCREENPLAY_SYSTEM_PROMPT
+    )
+    
+    logger.info("Screenplay 1 (Rajamouli) generated: %d characters", len(screenplay_text))
+    
+    return {"screenplay_1": screenplay_text}
+
+
+# ============================================================================
+# Node 3: Screenplay Creation - Shankar Style (with Tavily search)
+# ============================================================================
+
+async def screen_play_creation_node_2(state):
+    """
+    Creates screenplay in Shankar style (high-tech, futuristic, social message) with Tavily web search
+    """
+    logger.info("------ENTERING: SCREENPLAY CREATION NODE 2: In Shankar Style------")
+    
+    # Search the web for Shankar style references (normally done by web_research_node)
+    search_context = state.get("search_ctx_shankar")
+    if search_context is None:
+        logger.info("Searching web for Shankar style references...")
+        search_context = await asyncio.to_thread(search_web_for_context, SHANKAR_SEARCH_QUERY, 3)
+    
+    screenplay_writer_prompt = SCREENPLAY_USER_PROMPT.substitute(
+        search_context=search_context, theme=state['theme'], concept=state['concept']
+    )
+    
+    screenplay_text = await acall_tamus(
+        screenplay_writer_prompt, 2000,
+        semantic_scope=f"{semantic_cache_scope(state['theme'])}/shankar", system=SHANKAR_SCREENPLAY_SYSTEM_PROMPT
+    )
+    
+    logger.info("Screenplay 2 (Shankar) generated: %d characters", len(screenplay_text))
     
     return {"screenplay_2": screenplay_text}
 
 
+async def screenplays_parallel_node(state):
+    """
+    Runs both screenplay styles concurrently and merges their outputs
+    
+    The two nodes only read the theme and concept and write disjoint keys,
+    so the step takes as long as the slower of the two TAMUS calls.
+    """
+    result1, result2 = await asyncio.gather(
+        screen_play_creation_node_1(state),
+        screen_play_creation_node_2(state)
+    )
+    return {**result1, **result2}
+
+
 # ============================================================================
 # Node 4: Screenplay Evaluation (from notebook)
 # ============================================================================
@@ -335,13 +724,13 @@ def screenplay_evaluation_node(state):
     User selects which screenplay to use
     In the notebook, this is interactive. In our API, we'll default to screenplay_1
     """
-    print("------ENTERING: SCREENPLAY EVALUATION NODE------")
+    logger.info("------ENTERING: SCREENPLAY EVALUATION NODE------")
     
     # For API usage, we'll default to screenplay_1 (Rajamouli style)
     # In a real implementation, this could be a user choice via API parameter
     screenplay_winner = "screenplay_1"
     
-    print(f"✓ Selected screenplay: {screenplay_winner}")
+    logger.info("Selected screenplay: %s", screenplay_winner)
     
     return {"screenplay_winner": 1}  # 1 for screenplay_1, 2 for screenplay_2
 
@@ -350,86 +739,150 @@ def screenplay_evaluation_node(state):
 # Node 5: Storyboard Creation (from notebook - AGENT-BASED)
 # ============================================================================
 
-async def story_board_creation_node(state):
+async def story_board_creation_node(state, config=None):
     """
     Creates storyboard images from the winning screenplay
     Exact implementation from notebook using agent-based approach
+    
+    Scenes are split out of the screenplay and storyboarded by concurrent
+    per-scene calls (STORYBOARD_PER_SCENE=1, the default); a screenplay with
+    fewer than two recognisable scene headings falls back to one call.
+    
+    If the run config carries an "on_storyboard_chunk" callback, the agent
+    output is streamed and each delta is passed to it (per scene, in order,
+    when fanned out).
+    
+    With STORYBOARD_STRUCTURED=1 a JSON-mode call runs concurrently with the
+    prose and its per-scene metadata is returned as story_board_scenes.
     """
-    print("------ENTERING: STORY BOARD CREATION NODE------")
+    logger.info("------ENTERING: STORY BOARD CREATION NODE------")
     
     # Get the winning screenplay
     screenplay_key = f"screenplay_{state['screenplay_winner']}"
-    screenplay_text = state[screenplay_key]
+    screenplay_text = cap_tokens(state[screenplay_key], STORYBOARD_MAX_INPUT_TOKENS, "Screenplay")
+    
+    on_chunk = ((config or {}).get("configurable") or {}).get("on_storyboard_chunk")
+    # Near-duplicate screenplays for the same brand can reuse a storyboard;
+    # without a theme (direct calls from the API) only the exact cache applies
+    scope = f"{semantic_cache_scope(state['theme'])}/storyboard" if state.get("theme") else None
+    
+    agent_output, structured_scenes = await asyncio.gather(
+        _storyboard_prose(screenplay_text, scope, on_chunk),
+        _storyboard_scenes(screenplay_text) if STORYBOARD_STRUCTURED else asyncio.sleep(0, [])
+    )
     
-    # Storyboard agent prompt (exact from notebook)
-    story_board_prompt = """#Context: You are an autonomous AI image generation agent designed to create unique and high-quality images based on user-provided prompts. Your task is to interpret the given prompt creatively and generate an image that accurately reflects the described scene or concept.
+    logger.info("Storyboard agent processed screenplay: %d characters", len(agent_output))
+    
+    result = {"story_board": agent_output}
+    if STORYBOARD_STRUCTURED:
+        result["story_board_scenes"] = structured_scenes
+    return result
 
-#Objective: Generate images for storyboard creation for advertisements by adhering to the below guidelines
 
-#Guidelines:
+async def _storyboard_prose(screenplay_text, scope, on_chunk):
+    """Storyboard prose for the screenplay, fanned out per scene where possible."""
+    preamble, scenes = split_screenplay_scenes(screenplay_text) if STORYBOARD_PER_SCENE else ("", [])
+    if len(scenes) >= 2:
+        logger.info("Generating storyboard for %d scenes concurrently", len(scenes))
+        system = STORYBOARD_SYSTEM_PROMPT + STORYBOARD_SCENE_INSTRUCTION
+        results = [None] * len(scenes)
+        failed = 0
+        flushed = 0
+        
+        async def gen_scene(idx, scene):
+            nonlocal failed, flushed
+            prompt = STORYBOARD_SCENE_PROMPT.substitute(preamble=preamble, scene=scene)
+            try:
+                # Scene prompts share a long screenplay preamble and embed almost
+                # identically, so each scene gets its own semantic-cache scope
+                results[idx] = await acall_tamus(
+                    prompt, STORYBOARD_SCENE_MAX_TOKENS,
+                    semantic_scope=f"{scope}/scene{idx}" if scope is not None else None, system=system,
+                    model=STORYBOARD_MODEL
+                )
+            except Exception as e:
+                # One failed scene shouldn't sink the others
+                logger.warning("Storyboard for scene %d failed: %s", idx + 1, e)
+                failed += 1
+                results[idx] = f"[Storyboard for scene {idx + 1} unavailable]"
+            # Scenes finish out of order; stream them to the caller in order
+            while on_chunk is not None and flushed < len(results) and results[flushed] is not None:
+                on_chunk(("\n\n" if flushed else "") + results[flushed])
+                flushed += 1
+        
+        await asyncio.gather(*(gen_scene(i, scene) for i, scene in enumerate(scenes)))
+        if failed < len(scenes):
+            return "\n\n".join(results)
+        logger.warning("Every per-scene storyboard call failed, retrying as a single call")
+    
+    # Static agent instructions go in the system prompt; only the screenplay varies
+    full_prompt = STORYBOARD_USER_PROMPT.substitute(screenplay_text=screenplay_text)
+    return await acall_tamus(
+        full_prompt, 6000, semantic_scope=scope, system=STORYBOARD_SYSTEM_PROMPT, on_chunk=on_chunk,
+        model=STORYBOARD_MODEL
+    )
 
-1. Receive and Process Multi-Scene Prompts:
-    - The prompt will contain multiple scenes.
-    - Each scene will include the following components: Visual, Sound, Camera Transition, Action, Close-Up, Text on Screen.
-    - Also the prompt consists of Justification with Relatability, Emotional Appeal, Visual Aesthetics, Clear Message.
 
-2. Iterative Scene Processing:
-    - For each scene, extract the Visual, Sound, Camera Transition, Action, Close-Up, and Text on Screen elements.
-    - Generate an image that accurately represents the combined essence of these elements.
-    - Ensure consistency across all scenes by maintaining the same character descriptions, color palette, and visual style.
+async def _storyboard_scenes(screenplay_text):
+    """Per-scene storyboard metadata from a JSON-mode call ([] on failure)."""
+    full_prompt = STORYBOARD_USER_PROMPT.substitute(screenplay_text=screenplay_text)
+    try:
+        reply = await acall_tamus(
+            full_prompt, 2000, system=STORYBOARD_SYSTEM_PROMPT + STORYBOARD_JSON_INSTRUCTION, json_mode=True,
+            model=STORYBOARD_MODEL
+        )
+        stripped = reply.strip()
+        if stripped.startswith("```"):
+            stripped = stripped.split("\n", 1)[-1].rsplit("```", 1)[0]
+        scenes = json.loads(stripped).get("scenes", [])
+        logger.info("Structured storyboard: %d scenes", len(scenes))
+        return scenes if isinstance(scenes, list) else []
+    except Exception as e:
+        # The prose storyboard is the node's contract; the metadata is a bonus
+        logger.warning("Structured storyboard failed: %s", e)
+        return []
 
-3. Image Generation Guidelines:
-    - Visual: Focus on the main visual elements described. This includes the setting, objects, and characters.
-    - Sound: Although sound is auditory, interpret and reflect the mood or atmosphere it conveys visually.
-    - Camera Transition: Reflect the specified camera transitions (e.g., zoom, pan, tilt) to capture the dynamic aspect of the scene.
-    - Action: Ensure the image captures the described action, emphasizing motion or interaction where applicable.
-    - Close-Up: Highlight any specified close-up elements to focus on details or emotions.
-    - Text on Screen: Integrate the provided text into the image, ensuring it complements the visual narrative.
-    - Make sure you include the and follow Justification mentioned in Guidelines #1 in all the images that you generate
 
-4. Consistency and Continuity:
-    - Maintain consistent color palettes, mood, and characters across all scenes
-    - Use the same character descriptions in every scene for consistency
+# ============================================================================
+# Build the LangGraph Workflow (exact from notebook)
+# ============================================================================
 
-Now, process the following screenplay and generate storyboard images for each scene:
+@contextlib.contextmanager
+def node_span(name: str):
+    """Time a graph node, as an OpenTelemetry span when tracing is available."""
+    start = time.perf_counter()
+    with _tracer.start_as_current_span(name) if _tracer is not None else contextlib.nullcontext():
+        try:
+            yield
+        finally:
+            logger.info("%s finished in %.2fs", name, time.perf_counter() - start)
 
-{screenplay_text}"""
-    
-    # Use TAMUS to process the screenplay and generate image prompts
-    llm = get_tamus_client()
-    
-    full_prompt = story_board_prompt.format(screenplay_text=screenplay_text)
-    
-    response = llm.messages().create(
-        model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-        messages=[{"role": "user", "content": full_prompt}],
-        max_tokens=6000
-    )
+
+def traced_node(name: str, node):
+    """
+    Wrap a graph node so each run is timed under node_span(name).
     
-    # Extract the agent's response
-    agent_output = ""
-    if hasattr(response, 'content'):
-        content = response.content
-        if isinstance(content, list) and len(content) > 0:
-            if isinstance(content[0], dict) and 'text' in content[0]:
-                agent_output = content[0]['text']
-            else:
-                agent_output = str(content[0])
-        elif isinstance(content, str):
-            agent_output = content
-        else:
-            agent_output = str(content)
-    else:
-        agent_output = str(response)
+    The wrapper always accepts config (LangGraph passes it by parameter name)
+    and forwards it only to nodes that take it; sync nodes are awaited only
+    if they return an awaitable.
+    """
+    takes_config = "config" in inspect.signature(node).parameters
     
-    print(f"✓ Storyboard agent processed screenplay: {len(agent_output)} characters")
+    async def run(state, config=None):
+        with node_span(name):
+            result = node(state, config) if takes_config else node(state)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
     
-    return {"story_board": agent_output}
+    return run
 
 
-# ============================================================================
-# Build the LangGraph Workflow (exact from notebook)
-# ============================================================================
+@functools.lru_cache(maxsize=1)
+def get_workflow():
+    """Return the compiled workflow, building it on first use."""
+    return create_workflow()
+
 
 def create_workflow():
     """
@@ -437,22 +890,22 @@ def create_workflow():
     """
     workflow = StateGraph(State)
     
-    # Add nodes (exact from notebook)
-    workflow.add_node("ad_concept_creation_node", ad_concept_creation_node)
-    workflow.add_node("screen_play_creation_in_rajamouli_style", screen_play_creation_node_1)
-    workflow.add_node("screen_play_creation_in_shankar_style", screen_play_creation_node_2)
-    workflow.add_node("screenplay_evaluation_node", screenplay_evaluation_node)
-    workflow.add_node("story_board_creation_node", story_board_creation_node)
+    # Add nodes (exact from notebook, plus the up-front web research step)
+    # Every node is timed (and traced when OpenTelemetry is installed)
+    workflow.add_node("web_research_node", traced_node("web_research_node", web_research_node))
+    workflow.add_node("ad_concept_creation_node", traced_node("ad_concept_creation_node", ad_concept_creation_node))
+    # Both screenplay styles run inside one node (see screenplays_parallel_node)
+    workflow.add_node("screenplays_parallel_node", traced_node("screenplays_parallel_node", screenplays_parallel_node))
+    workflow.add_node("screenplay_evaluation_node", traced_node("screenplay_evaluation_node", screenplay_evaluation_node))
+    workflow.add_node("story_board_creation_node", traced_node("story_board_creation_node", story_board_creation_node))
     
-    # Set entry point (exact from notebook)
-    workflow.set_entry_point("ad_concept_creation_node")
+    # Set entry point
+    workflow.set_entry_point("web_research_node")
     
     # Add edges (exact from notebook)
-    workflow.add_edge("ad_concept_creation_node", "screen_play_creation_in_rajamouli_style")
-    workflow.add_edge("ad_concept_creation_node", "screen_play_creation_in_shankar_style")
-    
-    workflow.add_edge("screen_play_creation_in_rajamouli_style", "screenplay_evaluation_node")
-    workflow.add_edge("screen_play_creation_in_shankar_style", "screenplay_evaluation_node")
+    workflow.add_edge("web_research_node", "ad_concept_creation_node")
+    workflow.add_edge("ad_concept_creation_node", "screenplays_parallel_node")
+    workflow.add_edge("screenplays_parallel_node", "screenplay_evaluation_node")
     
     workflow.add_edge("screenplay_evaluation_node", "story_board_creation_node")
     
@@ -469,23 +922,27 @@ def create_workflow():
 # Main execution function for API integration
 # ============================================================================
 
-async def run_ad_workflow(theme: str):
+async def run_ad_workflow(theme: str, on_concept_chunk=None, on_storyboard_chunk=None,
+                          on_node_complete=None):
     """
     Runs the complete ad workflow from theme to storyboard
     
     Args:
         theme: The advertisement theme/brief
+        on_concept_chunk: Optional callback receiving concept text deltas as
+            they stream in (called from a worker thread)
+        on_storyboard_chunk: Same, for the storyboard agent output
+        on_node_complete: Optional callback receiving (node_name, update) as
+            soon as each graph node finishes, where update is the partial
+            state that node returned (called on the event loop)
         
     Returns:
         dict: Final state with concept, screenplays, and storyboard
     """
-    print(f"\n{'='*60}")
-    print(f"Starting Ad Workflow with LangGraph")
-    print(f"Theme: {theme}")
-    print(f"{'='*60}\n")
+    logger.info("Starting Ad Workflow with LangGraph\nTheme: %s", theme)
     
-    # Create the workflow
-    app = create_workflow()
+    # Compiled once per process and reused across runs
+    app = get_workflow()
     
     # Initial state
     initial_state = {
@@ -499,10 +956,20 @@ async def run_ad_workflow(theme: str):
     }
     
     # Run the workflow
-    final_state = await app.ainvoke(initial_state)
-    
-    print(f"\n{'='*60}")
-    print(f"Ad Workflow Completed")
-    print(f"{'='*60}\n")
+    callbacks = {"on_concept_chunk": on_concept_chunk, "on_storyboard_chunk": on_storyboard_chunk}
+    configurable = {name: cb for name, cb in callbacks.items() if cb is not None}
+    config = {"configurable": configurable} if configurable else None
+    # Stream the run so callers see node completions; "values" carries the
+    # full reduced state after each step, so the last one is the final state
+    final_state = initial_state
+    async for mode, chunk in app.astream(initial_state, config=config,
+                                         stream_mode=["updates", "values"]):
+        if mode == "values":
+            final_state = chunk
+        elif on_node_complete is not None:
+            for node_name, update in chunk.items():
+                on_node_complete(node_name, update or {})
+    
+    logger.info("Ad Workflow Completed")
     
     return final_state
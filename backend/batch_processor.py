@@ -0,0 +1,197 @@
+"""
+Batch Processor for Bulk Concept Generation
+
+Submits many TAMUS chat requests as one OpenAI-style batch job instead of
+one realtime call each. Batch jobs are billed at a discount and run on the
+provider's spare capacity, so bulk runs (e.g. a backlog of briefs queued
+overnight) stay off the realtime endpoint that interactive users share.
+
+Protocol (relative to TAMUS_API_URL):
+1. Upload a JSONL file of {custom_id, method, url, body} rows (POST /api/v1/files)
+2. Create the batch (POST /api/v1/batches)
+3. Poll GET /api/v1/batches/{id} until it reaches a terminal status
+4. Download the output file and map each custom_id to its reply text
+
+Not every OpenAI-compatible endpoint offers batches; callers should catch
+requests.RequestException from submit() and fall back to realtime calls.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import requests
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from tamus_wrapper import TAMUSAPIClient, get_tamus_client
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchProcessor:
+    """Submits chat requests as a TAMUS batch job and collects the replies."""
+
+    def __init__(self, client: Optional[TAMUSAPIClient] = None,
+                 poll_interval: float = float(os.getenv("TAMUS_BATCH_POLL_SECONDS", "30"))):
+        self.client = client or get_tamus_client()
+        self.poll_interval = poll_interval
+
+    def _url(self, path: str) -> str:
+        return f"{self.client.base_url}/api{path}"
+
+    @staticmethod
+    def build_request(custom_id: str, prompt: str, max_tokens: int,
+                      model: Optional[str] = None, system: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build one batch input row.
+
+        Args:
+            custom_id: Caller's key for matching the reply (e.g. a project id)
+            prompt: User prompt
+            max_tokens: Response token budget
+            model: Model name (defaults to TAMUS_MODEL env var)
+            system: Optional system prompt
+
+        Returns:
+            dict: Row in the OpenAI batch input format
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model or os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
+                "messages": messages,
+                "max_tokens": max_tokens,
+            },
+        }
+
+    def submit(self, rows: List[Dict[str, Any]]) -> str:
+        """
+        Upload the rows and create a batch job.
+
+        Returns:
+            str: Batch id
+
+        Raises:
+            requests.RequestException: If the endpoint rejects the upload or batch
+        """
+        payload = "\n".join(json.dumps(row) for row in rows).encode("utf-8")
+        # Multipart upload sets its own Content-Type
+        upload_headers = {"Authorization": self.client.headers["Authorization"]}
+        response = self.client.session.post(
+            self._url("/v1/files"),
+            headers=upload_headers,
+            data={"purpose": "batch"},
+            files={"file": ("batch_input.jsonl", payload, "application/jsonl")},
+            timeout=self.client.config.timeout,
+        )
+        response.raise_for_status()
+        file_id = response.json()["id"]
+
+        response = self.client.session.post(
+            self._url("/v1/batches"),
+            headers=self.client.headers,
+            json={
+                "input_file_id": file_id,
+                "endpoint": BATCH_ENDPOINT,
+                "completion_window": "24h",
+            },
+            timeout=self.client.config.timeout,
+        )
+        response.raise_for_status()
+        batch_id = response.json()["id"]
+        logger.info("Submitted TAMUS batch %s (%d requests)", batch_id, len(rows))
+        return batch_id
+
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        """Return the batch object for batch_id."""
+        response = self.client.session.get(
+            self._url(f"/v1/batches/{batch_id}"),
+            headers=self.client.headers,
+            timeout=self.client.config.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def results(self, batch: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Download a finished batch's output.
+
+        Args:
+            batch: Batch object from status()
+
+        Returns:
+            dict: custom_id -> reply text for every request that succeeded
+        """
+        output_file_id = batch.get("output_file_id")
+        if not output_file_id:
+            return {}
+        response = self.client.session.get(
+            self._url(f"/v1/files/{output_file_id}/content"),
+            headers=self.client.headers,
+            timeout=self.client.config.timeout,
+        )
+        response.raise_for_status()
+
+        texts: Dict[str, str] = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            body = (row.get("response") or {}).get("body") or {}
+            # Raw chat-completions JSON, not a MessageResponse, so read it directly
+            try:
+                content = body["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                content = None
+            # A null or empty reply (e.g. reasoning used the whole budget) is a failure too
+            if not isinstance(content, str) or not content.strip():
+                logger.warning("Batch request %s failed: %s", row.get("custom_id"), row.get("error") or "empty reply")
+                continue
+            texts[row["custom_id"]] = content
+        return texts
+
+    async def arun(self, rows: List[Dict[str, Any]], on_status=None) -> Dict[str, str]:
+        """
+        Submit rows, wait for the batch to finish and return its replies.
+
+        HTTP calls run on worker threads and polling sleeps on the event
+        loop, so a batch that takes hours holds no thread while it waits.
+
+        Args:
+            rows: Rows from build_request()
+            on_status: Optional callback receiving each polled batch object
+
+        Returns:
+            dict: custom_id -> reply text (failed requests are omitted)
+
+        Raises:
+            requests.RequestException: If submission fails
+            RuntimeError: If the batch ends failed, expired or cancelled
+        """
+        batch_id = await asyncio.to_thread(self.submit, rows)
+        while True:
+            batch = await asyncio.to_thread(self.status, batch_id)
+            if on_status is not None:
+                on_status(batch)
+            if batch.get("status") in BATCH_TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        if batch["status"] != "completed":
+            raise RuntimeError(f"TAMUS batch {batch_id} ended with status {batch['status']}")
+        return await asyncio.to_thread(self.results, batch)
@@ -6,15 +6,22 @@ Wraps existing Python pipelines (ad_video_pipeline.py, ad_production_pipeline.py
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, FileResponse, Response
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from enum import Enum
 import asyncio
 import json
 import uuid
+import re
+import hashlib
 import sys
 import os
+import logging
+import logging.handlers
+import queue
+import atexit
 import io
 import zipfile
 from pathlib import Path
@@ -36,17 +43,43 @@ if os.path.exists(env_path):
 else:
     print(f"⚠ Warning: .env file not found at {env_path}")
 
+# Pipeline modules log through the logging module; LOG_LEVEL=DEBUG adds
+# per-frame storyboard detail. Records are queued and written by a listener
+# thread, so a slow stdout never blocks the event loop.
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logger = logging.getLogger(__name__)
+
 # Add parent directory to path to import existing pipelines
 sys.path.insert(0, parent_dir)
 
+from state_store import ExpiringDict
+
 # Import your existing pipelines
 try:
     # Import TAMUS wrapper for text generation
-    from tamus_wrapper import get_tamus_client
+    from tamus_wrapper import get_tamus_client, extract_text
+    
+    # Response caches shared with the pipelines (TAMUS_CACHE / SEMANTIC_CACHE)
+    from llm_cache import cache_enabled, get_llm_cache, make_cache_key
+    from semantic_cache import semantic_cache_enabled, get_semantic_cache
     
     # Import LangGraph workflow
     from ad_workflow import run_ad_workflow
     
+    # Generated storyboard frames are written to disk and served as static files
+    from ad_production_pipeline_web import (
+        STORYBOARD_IMAGE_DIR, STORYBOARD_IMAGE_URL_PREFIX, save_frame_image
+    )
+    
     # Import output formatter for clean LLM output
     from output_formatter import (
         parse_concept,
@@ -87,6 +120,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if PIPELINES_AVAILABLE:
+    os.makedirs(STORYBOARD_IMAGE_DIR, exist_ok=True)
+    app.mount(STORYBOARD_IMAGE_URL_PREFIX, StaticFiles(directory=STORYBOARD_IMAGE_DIR), name="storyboard")
+
+@app.on_event("startup")
+async def warm_up_pipelines():
+    """Pay connection and model-load costs at startup instead of on the first request"""
+    if not PIPELINES_AVAILABLE or os.getenv("WARMUP_ON_STARTUP", "1").lower() not in ("1", "true", "yes"):
+        return
+    
+    import ad_workflow
+    
+    def warm_tamus():
+        try:
+            get_tamus_client().warm_up()
+        except ValueError as e:
+            print(f"⚠ Skipping TAMUS warm-up: {e}")
+    
+    # Both are blocking, so run them side by side off the event loop
+    await asyncio.gather(asyncio.to_thread(warm_tamus), asyncio.to_thread(ad_workflow.warm_up))
+    print("✓ Pipelines warmed up")
+
 # ============================================================================
 # Data Models
 # ============================================================================
@@ -135,12 +190,169 @@ class SubmitBriefRequest(BaseModel):
 class SelectScreenplayRequest(BaseModel):
     screenplayId: str
 
+class BatchBriefsRequest(BaseModel):
+    client: str
+    briefs: List[Brief]
+    budgetBand: BudgetBand = BudgetBand.MEDIUM
+
 # ============================================================================
 # In-Memory Storage (Replace with database in production)
 # ============================================================================
 
-projects_db: Dict[str, Dict[str, Any]] = {}
-jobs_db: Dict[str, Dict[str, Any]] = {}
+# Idle entries expire so memory tracks recent activity; running jobs are kept
+# until they finish. State is per process, so serve with a single worker.
+projects_db: Dict[str, Dict[str, Any]] = ExpiringDict(
+    ttl=float(os.getenv("PROJECTS_TTL", 7 * 24 * 3600))
+)
+jobs_db: Dict[str, Dict[str, Any]] = ExpiringDict(
+    ttl=float(os.getenv("JOBS_TTL", 3600)),
+    keep=lambda job: job.get("status") in ("pending", "running")
+)
+
+# Generation jobs allowed to run at once; the rest wait as "pending" for a
+# slot, so a burst of requests queues here instead of flooding TAMUS
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "8"))
+job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+
+# Realtime concept calls in flight per batch job when the batch API is unavailable
+BATCH_REALTIME_CONCURRENCY = int(os.getenv("BATCH_REALTIME_CONCURRENCY", "4"))
+
+# Quiet mode - reduce verbose logging
+QUIET_MODE = os.getenv("QUIET_MODE", "false").lower() == "true"
+
+# Run the concept/screenplay/storyboard steps through the LangGraph workflow
+USE_LANGGRAPH = os.getenv("USE_LANGGRAPH", "false").lower() == "true"
+
+# ============================================================================
+# Prompts
+# ============================================================================
+
+# Static instructions go in system messages ahead of the per-request fields,
+# so repeat calls share a prefix the provider can serve from its prompt cache
+
+CONCEPT_SYSTEM_PROMPT = """You are a creative director for advertising campaigns.
+
+Generate a creative concept for the ad campaign in the brief you are given. Include:
+1. Core concept/theme
+2. Key message
+3. Visual style
+4. Emotional tone
+5. How it addresses the target audience
+
+Be creative and specific."""
+
+RAJAMOULI_SCREENPLAY_SYSTEM_PROMPT = """#Context: You are an autonomous AI screenplay creation agent designed to create a screenplay for any given advertisement concept.
+
+#Objective: Generate a unique, fresh, and novel screenplay for an advertisement concept.
+
+#Guidelines:
+
+1. Style and Inspiration:
+  - The screenplay should be influenced by the style of SS Rajamouli, a renowned Indian cinema director known for his epic storytelling, grand visuals, and emotional depth.
+  - Emulate the cinematic experience seen in Rajamouli's films, focusing on strong character development, dramatic plot twists, and visually captivating scenes.
+
+2. Content Compliance:
+  - Ensure the screenplay adheres to all content guidelines and does not include any content violations.
+  - Avoid themes or depictions that could be considered offensive, inappropriate, or culturally insensitive.
+
+3. Screenplay Structure:
+  - Title: [Provide a captivating title for the ad concept]
+  - Genre: [Specify the genre, e.g., fantasy, action, drama, etc.]
+  - Setting: Describe the primary locations and time periods where the story takes place.
+  - Characters: Introduce the main characters, detailing their roles, personalities, and relationships.
+  - Plot Overview: Provide a brief summary of the story arc, including the main conflict and resolution.
+  - Scenes: Outline the key scenes in the screenplay, ensuring a logical flow and narrative progression.
+  - Dialogue: Craft engaging and authentic dialogue that reflects the characters' personalities and advances the plot.
+
+4. Scene Breakdown (MUST HAVE EXACTLY 6 SCENES):
+
+  a. Opening Scene:
+    - Visuals: Describe the setting, atmosphere, and key visual elements in DETAIL.
+    - Action: Detail the actions and movements of characters within the scene.
+    - Camera Transition: Specify camera angles, movements, and transitions.
+    - Close-Up: Highlight any close-up shots that emphasize emotions or significant details.
+    - Text on Screen: Include any text that appears on screen, such as titles, captions, or subtitles.
+
+  b. Middle Scenes (Scenes 2-5):
+    - Follow the same structure as the opening scene for each subsequent scene, ensuring continuity and coherence in the narrative.
+
+  c. Ending Scene (Scene 6):
+    - Resolve the main conflict, wrap up loose ends, and provide a satisfying conclusion.
+
+Additional Notes:
+  - STRICTLY RESTRICT THE SCREENPLAY WITH IN 3500 Characters.
+  - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience.
+  - Maintain the color palette, mood, and character consistency throughout the screenplay.
+  - Incorporate Rajamouli's signature elements such as heroic feats, moral dilemmas, and visually stunning sequences.
+  - MUST HAVE EXACTLY 6 SCENES with detailed visual descriptions.
+
+Generate the complete screenplay now in RAJAMOULI STYLE with EXACTLY 6 SCENES."""
+
+SHANKAR_SCREENPLAY_SYSTEM_PROMPT = """#Context: You are an autonomous AI screenplay creation agent designed to create a screenplay for any given advertisement concept.
+
+#Objective: Generate a unique, fresh, and novel screenplay for an advertisement concept.
+
+#Guidelines:
+
+1. Style and Inspiration:
+  - The screenplay should be influenced by the style of Shankar, a renowned Indian cinema director known for his grandiose visuals, intricate storytelling, and socially relevant themes.
+  - The screenplay should reflect Shankar's cinematic experience, including high-impact visuals, compelling narratives, and dramatic sequences. Emphasize strong character development, elaborate sets, and emotional depth.
+
+2. Content Compliance:
+  - Ensure the screenplay adheres to all content guidelines and does not include any content violations.
+  - Avoid themes or depictions that could be considered offensive, inappropriate, or culturally insensitive.
+
+3. Screenplay Structure:
+  - Title: [Provide a captivating title for the ad concept]
+  - Genre: [Specify the genre, e.g., fantasy, action, drama, etc.]
+  - Setting: Describe the primary locations and time periods where the story takes place.
+  - Characters: Introduce the main characters, detailing their roles, personalities, and relationships.
+  - Plot Overview: Provide a brief summary of the story arc, including the main conflict and resolution.
+  - Scenes: Outline the key scenes in the screenplay, ensuring a logical flow and narrative progression.
+  - Dialogue: Craft engaging and authentic dialogue that reflects the characters' personalities and advances the plot.
+
+4. Scene Breakdown (MUST HAVE EXACTLY 6 SCENES):
+
+  a. Opening Scene:
+    - Visuals: Describe the setting, atmosphere, and key visual elements in DETAIL.
+    - Action: Detail the actions and movements of characters within the scene.
+    - Camera Transition: Specify camera angles, movements, and transitions.
+    - Close-Up: Highlight any close-up shots that emphasize emotions or significant details.
+    - Text on Screen: Include any text that appears on screen, such as titles, captions, or subtitles.
+
+  b. Middle Scenes (Scenes 2-5):
+    - Follow the same structure as the opening scene for each subsequent scene, ensuring continuity and coherence in the narrative.
+
+  c. Ending Scene (Scene 6):
+    - Resolve the main conflict, wrap up loose ends, and provide a satisfying conclusion.
+
+Additional Notes:
+  - STRICTLY RESTRICT THE SCREENPLAY WITH IN 3500 Characters.
+  - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience.
+  - Maintain the color palette, mood, and character consistency throughout the screenplay.
+  - Incorporate Shankar's signature elements such as grandiose visuals, intricate storytelling, and socially relevant themes.
+  - MUST HAVE EXACTLY 6 SCENES with detailed visual descriptions.
+
+Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
+
+# Model for every TAMUS call made from this module (read once at import)
+TAMUS_MODEL = os.getenv("TAMUS_MODEL", "protected.gpt-5.2")
+
+# Send an OpenAI-style prompt_cache_key with these calls (only if the
+# endpoint accepts the field)
+TAMUS_PROMPT_CACHE_KEY = os.getenv("TAMUS_PROMPT_CACHE_KEY", "0").lower() in ("1", "true", "yes")
+
+def prompt_cache_key_for(system: str) -> Optional[str]:
+    """Cache-routing key for calls sharing a system prompt (None when disabled)"""
+    if not TAMUS_PROMPT_CACHE_KEY:
+        return None
+    return "backend-" + hashlib.sha256(system.encode("utf-8")).hexdigest()[:16]
+
+# Fallback screenplay parsers: scene header lines, and "Scene 3 ... (5s)" numbering
+SCENE_HEADER_PREFIXES = ('SCENE', 'Scene', '##')
+SCENE_HEADER_RE = re.compile(r'(\d+).*?\((\d+)s?\)')
+# Text fields of a screenplays-step scene, in response order
+SCENE_TEXT_FIELDS = ("description", "visual", "action", "camera", "dialogue", "text_on_screen")
 
 # ============================================================================
 # Helper Functions
@@ -162,17 +374,187 @@ def create_job(project_id: str, step: str) -> Dict[str, Any]:
     jobs_db[job_id] = job
     return job
 
+def build_concept_prompt(brief: Dict[str, Any]) -> str:
+    """Build the per-brief user turn for CONCEPT_SYSTEM_PROMPT"""
+    return f"""Brief:
+- Platform: {brief.get('platform', 'YouTube')}
+- Duration: {brief.get('duration', 30)} seconds
+- Budget: ${brief.get('budget', 50000):,}
+- Location: {brief.get('location', 'Studio')}
+- Creative Direction: {brief.get('creativeDirection', '')}
+- Brand: {', '.join(brief.get('brandMandatories', []))}
+- Target Audience: {brief.get('targetAudience', '')}
+- Constraints: {', '.join(brief.get('constraints', []))}"""
+
+def brief_cache_scope(brief: Dict[str, Any]) -> str:
+    """
+    Semantic-cache scope for a brief.
+    
+    Replies are only shared within the same brand, platform, duration,
+    creative direction and audience. The direction and audience are long
+    free text, so they enter the scope as a short hash; without them a
+    brief with a new direction embeds close enough to reuse the old reply.
+    """
+    brand = ", ".join(brief.get("brandMandatories", [])) or "-"
+    creative = hashlib.sha256(
+        f"{brief.get('creativeDirection', '')}\0{brief.get('targetAudience', '')}".encode("utf-8")
+    ).hexdigest()[:12]
+    return f"{brand}|{brief.get('platform', 'YouTube')}|{brief.get('duration', 30)}s|{creative}"
+
+async def generate_cached(system: str, prompt: str, max_tokens: int,
+                          semantic_scope: Optional[str] = None, on_chunk=None) -> str:
+    """
+    Generate text with TAMUS, answering repeated briefs from the response caches.
+    
+    The prompt is built deterministically from the brief, so an unchanged
+    brief is an exact hit in the SQLite cache (TAMUS_CACHE=1). With
+    SEMANTIC_CACHE=1 and a semantic_scope, a reworded brief in the same
+    scope can reuse a near-duplicate reply.
+    
+    Args:
+        system: System prompt (distinguishes the step and variant)
+        prompt: Per-brief user turn
+        max_tokens: Response token budget
+        semantic_scope: Opt into the semantic cache (see brief_cache_scope)
+        on_chunk: Stream the response and call this with each text delta
+            (from a worker thread; a cache hit is delivered as one chunk)
+        
+    Returns:
+        Response text
+    """
+    cache_key = None
+    if cache_enabled():
+        cache_key = make_cache_key(TAMUS_MODEL, prompt, max_tokens, system)
+        # SQLite read; keep it off the event loop like the writes
+        cached = await asyncio.to_thread(get_llm_cache().get, cache_key)
+        if cached is not None:
+            print(f"✓ Cache hit ({len(cached)} chars)")
+            if on_chunk is not None:
+                on_chunk(cached)
+            return cached
+    
+    use_semantic = semantic_scope is not None and semantic_cache_enabled()
+    if use_semantic:
+        cached = await asyncio.to_thread(
+            get_semantic_cache().lookup, prompt, semantic_scope, TAMUS_MODEL, max_tokens
+        )
+        if cached is not None:
+            print(f"✓ Semantic cache hit ({len(cached)} chars)")
+            if on_chunk is not None:
+                on_chunk(cached)
+            return cached
+    
+    response = await get_tamus_client().messages().acreate(
+        model=TAMUS_MODEL,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=max_tokens,
+        on_chunk=on_chunk,
+        prompt_cache_key=prompt_cache_key_for(system)
+    )
+    text = extract_text(response)
+    
+    if cache_key is not None:
+        await asyncio.to_thread(get_llm_cache().set, cache_key, text)
+    if use_semantic:
+        await asyncio.to_thread(
+            get_semantic_cache().add, prompt, semantic_scope, TAMUS_MODEL, max_tokens, text
+        )
+    return text
+
+def stream_to_job(job: Dict[str, Any], keys: List[str], start: int, end: int, token_budget: int) -> list:
+    """
+    Build on_chunk callbacks that publish streamed text on a job.
+    
+    Each callback appends deltas to its own job[key] list (sent as partial
+    output by the SSE feed). Together they move job["progress"] from start
+    toward end as the estimated tokens received approach token_budget.
+    
+    Args:
+        job: Job dict to update
+        keys: One job key per stream
+        start: Progress when streaming begins
+        end: Progress bound (never reached until the step finishes)
+        token_budget: Combined max_tokens of the streams
+        
+    Returns:
+        list: One on_chunk callback per key, in order
+    """
+    received = 0
+    
+    def collector(key):
+        chunks = job[key] = []
+        
+        def on_chunk(piece):
+            nonlocal received
+            chunks.append(piece)
+            received += len(piece)
+            tokens = received // 4  # ~4 characters per token
+            job["progress"] = min(start + (end - start) * tokens // token_budget, end - 1)
+        return on_chunk
+    
+    return [collector(key) for key in keys]
+
+def store_concept(project: Dict[str, Any], brief: Dict[str, Any], concept_text: str, visual_style: str):
+    """Parse, format and store a generated concept on its project"""
+    # Parse and format the concept
+    try:
+        parsed_concept = parse_concept(concept_text)
+        formatted_concept = format_concept_for_display(parsed_concept)
+        print(f"✓ Concept parsed and formatted successfully")
+    except Exception as format_error:
+        print(f"⚠ Concept formatting failed: {format_error}, using raw output")
+        formatted_concept = concept_text
+        parsed_concept = None
+    
+    # Store concept
+    project["concept"] = {
+        "id": str(uuid.uuid4()),
+        "title": parsed_concept.title if parsed_concept else concept_text[:100],
+        "description": formatted_concept,  # Use formatted version
+        "rawDescription": concept_text,  # Keep raw for reference
+        "keyMessage": brief.get('creativeDirection', ''),
+        "visualStyle": visual_style,
+        "generatedAt": datetime.now().isoformat(),
+        "version": 1
+    }
+    
+    print(f"✓ Concept stored: {len(concept_text)} characters (formatted: {len(formatted_concept)} characters)")
+
+def parse_screenplay_or_none(text: str, variant_name: str):
+    """Parse a screenplay once for both scene extraction and display (None if it fails)"""
+    try:
+        return parse_screenplay(text, variant_name)
+    except Exception as parse_error:
+        print(f"  ⚠ Output formatter failed for {variant_name}: {parse_error}")
+        return None
+
+def first_inline_image(response) -> Optional[Tuple[bytes, str]]:
+    """Return the first inline image in a Gemini response as (bytes, mime type), or None"""
+    candidates = getattr(response, 'candidates', None)
+    if not candidates:
+        return None
+    content = getattr(candidates[0], 'content', None)
+    for part in getattr(content, 'parts', None) or ():
+        inline_data = getattr(part, 'inline_data', None)
+        if inline_data is not None and getattr(inline_data, 'data', None) is not None:
+            return inline_data.data, getattr(inline_data, 'mime_type', None) or 'image/png'
+    return None
+
 async def run_generation(job_id: str, project_id: str, step: str, params: Dict[str, Any]):
-    """Run generation in background"""
+    """Run generation in background once a job slot is free"""
+    async with job_slots:
+        if jobs_db[job_id]["status"] == "cancelled":
+            return
+        await _run_generation(job_id, project_id, step, params)
+
+async def _run_generation(job_id: str, project_id: str, step: str, params: Dict[str, Any]):
+    """Run one generation step for a project (holding a job slot)"""
     job = jobs_db[job_id]
     project = projects_db[project_id]
     
-    # Quiet mode - reduce verbose logging
-    QUIET_MODE = os.getenv("QUIET_MODE", "false").lower() == "true"
-    
-    # Check if LangGraph workflow should be used
-    USE_LANGGRAPH = os.getenv("USE_LANGGRAPH", "false").lower() == "true"
-    
     try:
         job["status"] = "running"
         job["progress"] = 10
@@ -214,7 +596,26 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
             
             # Run LangGraph workflow
             print("Running LangGraph workflow...")
-            workflow_result = await run_ad_workflow(theme)
+            # Concept deltas are exposed to the SSE stream while the rest of the chain runs
+            job["concept_chunks"] = []
+            job["storyboard_chunks"] = []
+            job["completed_nodes"] = []
+            job["steps"] = {}
+            
+            def on_node_complete(node_name, update):
+                # Each node's output is published as soon as it lands, so the
+                # concept is visible long before the storyboard finishes
+                job["steps"][node_name] = update
+                # Five graph nodes carry the job from 20% to 60%
+                job["completed_nodes"].append(node_name)
+                job["progress"] = min(60, 20 + 8 * len(job["completed_nodes"]))
+            
+            workflow_result = await run_ad_workflow(
+                theme,
+                on_concept_chunk=job["concept_chunks"].append,
+                on_storyboard_chunk=job["storyboard_chunks"].append,
+                on_node_complete=on_node_complete
+            )
             
             job["progress"] = 60
             
@@ -246,11 +647,12 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
             job["progress"] = 70
             
             # Parse scenes from screenplays using output formatter
-            def parse_scenes_from_screenplay(text, variant_name):
+            def parse_scenes_from_screenplay(text, variant_name, parsed_screenplay):
                 """Parse screenplay text into structured scenes using output formatter"""
                 try:
-                    # Use the output formatter to parse the screenplay
-                    parsed_screenplay = parse_screenplay(text, variant_name)
+                    # Parsed once by the caller with the output formatter
+                    if parsed_screenplay is None:
+                        raise ValueError("screenplay could not be parsed")
                     
                     # Convert to frontend format
                     scenes = []
@@ -283,7 +685,7 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
                     print(f"  ⚠ Output formatter failed: {parse_error}, using fallback parser")
                     # Fallback to simple parsing
                     scenes = []
-                    lines = text.split('\n')
+                    lines = text.splitlines()
                     current_scene = None
                     current_field = None
                     
@@ -291,25 +693,24 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
                         line_stripped = line.strip()
                         
                         # Check if this is a scene header
-                        if line_stripped.startswith('SCENE') or line_stripped.startswith('Scene') or line_stripped.startswith('##'):
+                        if line_stripped.startswith(SCENE_HEADER_PREFIXES):
                             # Save previous scene if exists
                             if current_scene and current_scene.get("description"):
                                 scenes.append(current_scene)
                             
                             # Start new scene
-                            import re
-                            match = re.search(r'(\d+).*?\((\d+)s?\)', line_stripped)
+                            match = SCENE_HEADER_RE.search(line_stripped)
                             if match:
                                 current_scene = {
                                     "sceneNumber": int(match.group(1)),
                                     "duration": int(match.group(2)),
-                                    "description": ""
+                                    "description": []
                                 }
                             else:
                                 current_scene = {
                                     "sceneNumber": len(scenes) + 1,
                                     "duration": 6,
-                                    "description": ""
+                                    "description": []
                                 }
                             current_field = None
                             continue
@@ -318,15 +719,15 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
                             continue
                         
                         # Add content to description
-                        current_scene["description"] += line_stripped + " "
+                        current_scene["description"].append(line_stripped)
                     
                     # Add last scene
                     if current_scene and current_scene.get("description"):
                         scenes.append(current_scene)
                     
-                    # Clean up descriptions
+                    # Join the collected lines (built as lists to avoid repeated concatenation)
                     for scene in scenes:
-                        scene["description"] = scene["description"].strip()
+                        scene["description"] = " ".join(scene["description"])
                     
                     # Ensure we have at least 6 scenes
                     while len(scenes) < 6:
@@ -339,19 +740,25 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
                     
                     return scenes[:6]
             
-            scenes_a = parse_scenes_from_screenplay(workflow_result["screenplay_1"], "Rajamouli Style")
-            scenes_b = parse_scenes_from_screenplay(workflow_result["screenplay_2"], "Shankar Style")
+            parsed_a = parse_screenplay_or_none(workflow_result["screenplay_1"], "Rajamouli Style")
+            parsed_b = parse_screenplay_or_none(workflow_result["screenplay_2"], "Shankar Style")
+            scenes_a = parse_scenes_from_screenplay(workflow_result["screenplay_1"], "Rajamouli Style", parsed_a)
+            scenes_b = parse_scenes_from_screenplay(workflow_result["screenplay_2"], "Shankar Style", parsed_b)
             
             # Format screenplays for display
             try:
-                formatted_screenplay_a = format_screenplay_for_display(parse_screenplay(workflow_result["screenplay_1"], "Rajamouli Style"))
-                formatted_screenplay_b = format_screenplay_for_display(parse_screenplay(workflow_result["screenplay_2"], "Shankar Style"))
+                if parsed_a is None or parsed_b is None:
+                    raise ValueError("screenplay could not be parsed")
+                formatted_screenplay_a = format_screenplay_for_display(parsed_a)
+                formatted_screenplay_b = format_screenplay_for_display(parsed_b)
                 print(f"✓ Screenplays formatted successfully")
             except Exception as format_error:
                 print(f"⚠ Screenplay formatting failed: {format_error}, using raw output")
                 formatted_screenplay_a = workflow_result["screenplay_1"]
                 formatted_screenplay_b = workflow_result["screenplay_2"]
             
+            # Both variants come from the same step, so they share one timestamp
+            generated_at = datetime.now().isoformat()
             project["screenplays"] = [
                 {
                     "id": str(uuid.uuid4()),
@@ -359,7 +766,7 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
                     "scenes": scenes_a,
                     "totalDuration": sum(s.get("duration", 6) for s in scenes_a),
                     "scores": {"clarity": 8.5, "feasibility": 7.5, "costRisk": 6.5},
-                    "generatedAt": datetime.now().isoformat(),
+                    "generatedAt": generated_at,
                     "formattedText": formatted_screenplay_a,  # Formatted version
                     "rawText": workflow_result["screenplay_1"]  # Raw version
                 },
@@ -369,7 +776,7 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
                     "scenes": scenes_b,
                     "totalDuration": sum(s.get("duration", 6) for s in scenes_b),
                     "scores": {"clarity": 7.8, "feasibility": 8.2, "costRisk": 7.0},
-                    "generatedAt": datetime.now().isoformat(),
+                    "generatedAt": generated_at,
                     "formattedText": formatted_screenplay_b,  # Formatted version
                     "rawText": workflow_result["screenplay_2"]  # Raw version
                 }
@@ -406,82 +813,23 @@ Constraints: {', '.join(brief.get('constraints', []))}"""
             job["progress"] = 30
             
             # Use TAMUS directly for concept generation (no video pipeline)
-            from tamus_wrapper import get_tamus_client
-            llm = get_tamus_client()
-            
-            concept_prompt = f"""You are a creative director for advertising campaigns.
+            concept_prompt = build_concept_prompt(brief)
 
-Brief:
-- Platform: {brief.get('platform', 'YouTube')}
-- Duration: {brief.get('duration', 30)} seconds
-- Budget: ${brief.get('budget', 50000):,}
-- Location: {brief.get('location', 'Studio')}
-- Creative Direction: {brief.get('creativeDirection', '')}
-- Brand: {', '.join(brief.get('brandMandatories', []))}
-- Target Audience: {brief.get('targetAudience', '')}
-- Constraints: {', '.join(brief.get('constraints', []))}
-
-Generate a creative concept for this ad campaign. Include:
-1. Core concept/theme
-2. Key message
-3. Visual style
-4. Emotional tone
-5. How it addresses the target audience
-
-Be creative and specific."""
-
-            print("Generating concept with TAMUS GPT-5.2..." if not QUIET_MODE else "")
-            concept_response = await asyncio.to_thread(
-                llm.messages().create,
-                model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-                messages=[{"role": "user", "content": concept_prompt}],
-                max_tokens=2000
+            if not QUIET_MODE:
+                print("Generating concept with TAMUS GPT-5.2...")
+            # Stream the reply so the SSE feed shows it as it is written
+            on_concept_chunk, = stream_to_job(job, ["concept_chunks"], 30, 90, 2000)
+            concept_text = await generate_cached(
+                CONCEPT_SYSTEM_PROMPT, concept_prompt, 2000,
+                semantic_scope=f"{brief_cache_scope(brief)}/concept",
+                on_chunk=on_concept_chunk
             )
             
-            # Extract text from response
-            concept_text = ""
-            if hasattr(concept_response, 'content'):
-                content = concept_response.content
-                if isinstance(content, list) and len(content) > 0:
-                    # Response is a list of content blocks
-                    if isinstance(content[0], dict) and 'text' in content[0]:
-                        concept_text = content[0]['text']
-                    else:
-                        concept_text = str(content[0])
-                elif isinstance(content, str):
-                    concept_text = content
-                else:
-                    concept_text = str(content)
-            else:
-                concept_text = str(concept_response)
-            
             print(f"✓ Concept generated: {len(concept_text)} characters")
             
             job["progress"] = 90
             
-            # Parse and format the concept
-            try:
-                parsed_concept = parse_concept(concept_text)
-                formatted_concept = format_concept_for_display(parsed_concept)
-                print(f"✓ Concept parsed and formatted successfully")
-            except Exception as format_error:
-                print(f"⚠ Concept formatting failed: {format_error}, using raw output")
-                formatted_concept = concept_text
-                parsed_concept = None
-            
-            # Store concept
-            project["concept"] = {
-                "id": str(uuid.uuid4()),
-                "title": parsed_concept.title if parsed_concept else concept_text[:100],
-                "description": formatted_concept,  # Use formatted version
-                "rawDescription": concept_text,  # Keep raw for reference
-                "keyMessage": brief.get('creativeDirection', ''),
-                "visualStyle": "AI Generated",
-                "generatedAt": datetime.now().isoformat(),
-                "version": 1
-            }
-            
-            print(f"✓ Concept stored: {len(concept_text)} characters (formatted: {len(formatted_concept)} characters)")
+            store_concept(project, brief, concept_text, "AI Generated")
             
         elif step == "screenplays":
             # ============================================================
@@ -489,165 +837,42 @@ Be creative and specific."""
             # ============================================================
             job["progress"] = 30
             
-            from tamus_wrapper import get_tamus_client
-            llm = get_tamus_client()
-            
             concept = project.get("concept", {}).get("description", "")
             brief = project.get("brief", {})
             
-            # Generate Variant A - SS Rajamouli Style (Epic, Grand Scale)
-            screenplay_prompt_a = f"""#Context: You are an autonomous AI screenplay creation agent designed to create a screenplay for any given advertisement concept.
-
-#Objective: Generate a unique, fresh, and novel screenplay for an advertisement concept.
-
-#Guidelines:
-
-1. Style and Inspiration:
-  - The screenplay should be influenced by the style of SS Rajamouli, a renowned Indian cinema director known for his epic storytelling, grand visuals, and emotional depth.
-  - Emulate the cinematic experience seen in Rajamouli's films, focusing on strong character development, dramatic plot twists, and visually captivating scenes.
-
-2. Content Compliance:
-  - Ensure the screenplay adheres to all content guidelines and does not include any content violations.
-  - Avoid themes or depictions that could be considered offensive, inappropriate, or culturally insensitive.
-
-3. Screenplay Structure:
-  - Title: [Provide a captivating title for the ad concept]
-  - Genre: [Specify the genre, e.g., fantasy, action, drama, etc.]
-  - Setting: Describe the primary locations and time periods where the story takes place.
-  - Characters: Introduce the main characters, detailing their roles, personalities, and relationships.
-  - Plot Overview: Provide a brief summary of the story arc, including the main conflict and resolution.
-  - Scenes: Outline the key scenes in the screenplay, ensuring a logical flow and narrative progression.
-  - Dialogue: Craft engaging and authentic dialogue that reflects the characters' personalities and advances the plot.
-
-4. Scene Breakdown (MUST HAVE EXACTLY 6 SCENES):
-
-  a. Opening Scene:
-    - Visuals: Describe the setting, atmosphere, and key visual elements in DETAIL.
-    - Action: Detail the actions and movements of characters within the scene.
-    - Camera Transition: Specify camera angles, movements, and transitions.
-    - Close-Up: Highlight any close-up shots that emphasize emotions or significant details.
-    - Text on Screen: Include any text that appears on screen, such as titles, captions, or subtitles.
-
-  b. Middle Scenes (Scenes 2-5):
-    - Follow the same structure as the opening scene for each subsequent scene, ensuring continuity and coherence in the narrative.
-
-  c. Ending Scene (Scene 6):
-    - Resolve the main conflict, wrap up loose ends, and provide a satisfying conclusion.
-
-Additional Notes:
-  - STRICTLY RESTRICT THE SCREENPLAY WITH IN 3500 Characters.
-  - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience.
-  - Maintain the color palette, mood, and character consistency throughout the screenplay.
-  - Incorporate Rajamouli's signature elements such as heroic feats, moral dilemmas, and visually stunning sequences.
-  - MUST HAVE EXACTLY 6 SCENES with detailed visual descriptions.
-
-Given Concept: {concept}
+            # Variant A (SS Rajamouli - Epic, Grand Scale) and Variant B (Shankar -
+            # High-Tech, Futuristic) differ only in their system prompts
+            screenplay_prompt = f"""Given Concept: {concept}
 Duration: {brief.get('duration', 30)} seconds
-Platform: {brief.get('platform', 'YouTube')}
+Platform: {brief.get('platform', 'YouTube')}"""
 
-Generate the complete screenplay now in RAJAMOULI STYLE with EXACTLY 6 SCENES."""
-
-            print("Generating screenplay variant A (SS Rajamouli style - Epic)...")
-            screenplay_response_a = await asyncio.to_thread(
-                llm.messages().create,
-                model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-                messages=[{"role": "user", "content": screenplay_prompt_a}],
-                max_tokens=2000
+            # Both variants stream into the job side by side
+            on_chunk_a, on_chunk_b = stream_to_job(
+                job, ["screenplay_a_chunks", "screenplay_b_chunks"], 30, 70, 4000
             )
             
-            # Extract text from response A
-            screenplay_text_a = ""
-            if hasattr(screenplay_response_a, 'content'):
-                content = screenplay_response_a.content
-                if isinstance(content, list) and len(content) > 0:
-                    if isinstance(content[0], dict) and 'text' in content[0]:
-                        screenplay_text_a = content[0]['text']
-                    else:
-                        screenplay_text_a = str(content[0])
-                elif isinstance(content, str):
-                    screenplay_text_a = content
-                else:
-                    screenplay_text_a = str(content)
-            else:
-                screenplay_text_a = str(screenplay_response_a)
-            
-            job["progress"] = 50
+            def create_screenplay(prompt, system, on_chunk):
+                # The concept is part of the prompt, so a cached screenplay
+                # is only reused for the same concept and variant
+                return generate_cached(system, prompt, 2000, on_chunk=on_chunk)
             
-            # Generate Variant B - Shankar Style (High-Tech, Futuristic)
-            screenplay_prompt_b = f"""#Context: You are an autonomous AI screenplay creation agent designed to create a screenplay for any given advertisement concept.
-
-#Objective: Generate a unique, fresh, and novel screenplay for an advertisement concept.
-
-#Guidelines:
-
-1. Style and Inspiration:
-  - The screenplay should be influenced by the style of Shankar, a renowned Indian cinema director known for his grandiose visuals, intricate storytelling, and socially relevant themes.
-  - The screenplay should reflect Shankar's cinematic experience, including high-impact visuals, compelling narratives, and dramatic sequences. Emphasize strong character development, elaborate sets, and emotional depth.
-
-2. Content Compliance:
-  - Ensure the screenplay adheres to all content guidelines and does not include any content violations.
-  - Avoid themes or depictions that could be considered offensive, inappropriate, or culturally insensitive.
-
-3. Screenplay Structure:
-  - Title: [Provide a captivating title for the ad concept]
-  - Genre: [Specify the genre, e.g., fantasy, action, drama, etc.]
-  - Setting: Describe the primary locations and time periods where the story takes place.
-  - Characters: Introduce the main characters, detailing their roles, personalities, and relationships.
-  - Plot Overview: Provide a brief summary of the story arc, including the main conflict and resolution.
-  - Scenes: Outline the key scenes in the screenplay, ensuring a logical flow and narrative progression.
-  - Dialogue: Craft engaging and authentic dialogue that reflects the characters' personalities and advances the plot.
-
-4. Scene Breakdown (MUST HAVE EXACTLY 6 SCENES):
-
-  a. Opening Scene:
-    - Visuals: Describe the setting, atmosphere, and key visual elements in DETAIL.
-    - Action: Detail the actions and movements of characters within the scene.
-    - Camera Transition: Specify camera angles, movements, and transitions.
-    - Close-Up: Highlight any close-up shots that emphasize emotions or significant details.
-    - Text on Screen: Include any text that appears on screen, such as titles, captions, or subtitles.
-
-  b. Middle Scenes (Scenes 2-5):
-    - Follow the same structure as the opening scene for each subsequent scene, ensuring continuity and coherence in the narrative.
-
-  c. Ending Scene (Scene 6):
-    - Resolve the main conflict, wrap up loose ends, and provide a satisfying conclusion.
-
-Additional Notes:
-  - STRICTLY RESTRICT THE SCREENPLAY WITH IN 3500 Characters.
-  - Ensure the screenplay is engaging, emotionally resonant, and leaves a lasting impact on the audience.
-  - Maintain the color palette, mood, and character consistency throughout the screenplay.
-  - Incorporate Shankar's signature elements such as grandiose visuals, intricate storytelling, and socially relevant themes.
-  - MUST HAVE EXACTLY 6 SCENES with detailed visual descriptions.
-
-Given Concept: {concept}
-Duration: {brief.get('duration', 30)} seconds
-Platform: {brief.get('platform', 'YouTube')}
-
-Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
-
-            print("Generating screenplay variant B (Shankar style - High-Tech)...")
-            screenplay_response_b = await asyncio.to_thread(
-                llm.messages().create,
-                model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
-                messages=[{"role": "user", "content": screenplay_prompt_b}],
-                max_tokens=2000
+            # The variants share no data, so both requests are in flight at once
+            print("Generating screenplay variants A (SS Rajamouli - Epic) and B (Shankar - High-Tech) concurrently...")
+            screenplay_text_a, screenplay_text_b = await asyncio.gather(
+                create_screenplay(screenplay_prompt, RAJAMOULI_SCREENPLAY_SYSTEM_PROMPT, on_chunk_a),
+                create_screenplay(screenplay_prompt, SHANKAR_SCREENPLAY_SYSTEM_PROMPT, on_chunk_b),
+                return_exceptions=True
             )
             
-            # Extract text from response B
-            screenplay_text_b = ""
-            if hasattr(screenplay_response_b, 'content'):
-                content = screenplay_response_b.content
-                if isinstance(content, list) and len(content) > 0:
-                    if isinstance(content[0], dict) and 'text' in content[0]:
-                        screenplay_text_b = content[0]['text']
-                    else:
-                        screenplay_text_b = str(content[0])
-                elif isinstance(content, str):
-                    screenplay_text_b = content
-                else:
-                    screenplay_text_b = str(content)
-            else:
-                screenplay_text_b = str(screenplay_response_b)
+            # One failed variant shouldn't discard the other; retry just that one
+            if isinstance(screenplay_text_a, Exception):
+                print(f"⚠ Screenplay A failed ({screenplay_text_a}), retrying")
+                job["screenplay_a_chunks"].clear()
+                screenplay_text_a = await create_screenplay(screenplay_prompt, RAJAMOULI_SCREENPLAY_SYSTEM_PROMPT, on_chunk_a)
+            if isinstance(screenplay_text_b, Exception):
+                print(f"⚠ Screenplay B failed ({screenplay_text_b}), retrying")
+                job["screenplay_b_chunks"].clear()
+                screenplay_text_b = await create_screenplay(screenplay_prompt, SHANKAR_SCREENPLAY_SYSTEM_PROMPT, on_chunk_b)
             
             print(f"✓ Screenplay A (Rajamouli) generated: {len(screenplay_text_a)} characters")
             print(f"✓ Screenplay B (Shankar) generated: {len(screenplay_text_b)} characters")
@@ -655,15 +880,16 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
             job["progress"] = 70
             
             # Parse scenes from screenplay using output formatter
-            def parse_scenes_with_formatter(text, variant_name):
+            def parse_scenes_with_formatter(text, variant_name, parsed_screenplay):
                 """Parse screenplay text into structured scenes using output formatter"""
                 print(f"\n[DEBUG] Parsing {variant_name}")
                 print(f"[DEBUG] Screenplay text length: {len(text)} characters")
                 print(f"[DEBUG] First 500 chars: {text[:500]}")
                 
                 try:
-                    # Use the output formatter to parse the screenplay
-                    parsed_screenplay = parse_screenplay(text, variant_name)
+                    # Parsed once by the caller with the output formatter
+                    if parsed_screenplay is None:
+                        raise ValueError("screenplay could not be parsed")
                     
                     # Convert to frontend format with all details
                     scenes = []
@@ -697,7 +923,7 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
                     print(f"  ⚠ Output formatter failed: {parse_error}, using fallback parser")
                     # Fallback to original parsing logic
                     scenes = []
-                    lines = text.split('\n')
+                    lines = text.splitlines()
                     current_scene = None
                     current_field = None
                     
@@ -705,36 +931,19 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
                         line_stripped = line.strip()
                         
                         # Check if this is a scene header
-                        if line_stripped.startswith('SCENE') or line_stripped.startswith('Scene') or line_stripped.startswith('##'):
+                        if line_stripped.startswith(SCENE_HEADER_PREFIXES):
                             # Save previous scene if exists
                             if current_scene and current_scene.get("description"):
                                 scenes.append(current_scene)
                             
                             # Start new scene
-                            import re
-                            match = re.search(r'(\d+).*?\((\d+)s?\)', line_stripped)
+                            match = SCENE_HEADER_RE.search(line_stripped)
                             if match:
-                                current_scene = {
-                                    "sceneNumber": int(match.group(1)),
-                                    "duration": int(match.group(2)),
-                                    "description": "",
-                                    "visual": "",
-                                    "action": "",
-                                    "camera": "",
-                                    "dialogue": "",
-                                    "text_on_screen": ""
-                                }
+                                scene_number, duration = int(match.group(1)), int(match.group(2))
                             else:
-                                current_scene = {
-                                    "sceneNumber": len(scenes) + 1,
-                                    "duration": 6,
-                                    "description": "",
-                                    "visual": "",
-                                    "action": "",
-                                    "camera": "",
-                                    "dialogue": "",
-                                    "text_on_screen": ""
-                                }
+                                scene_number, duration = len(scenes) + 1, 6
+                            current_scene = {"sceneNumber": scene_number, "duration": duration}
+                            current_scene.update((field, []) for field in SCENE_TEXT_FIELDS)
                             current_field = None
                             continue
                         
@@ -746,65 +955,61 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
                             current_field = "visual"
                             content = line_stripped.split(':', 1)[1].strip() if ':' in line_stripped else ""
                             if content:
-                                current_scene["visual"] += content + " "
-                                current_scene["description"] += content + " "
+                                current_scene["visual"].append(content)
+                                current_scene["description"].append(content)
                         elif line_stripped.startswith('Action:'):
                             current_field = "action"
                             content = line_stripped.split(':', 1)[1].strip() if ':' in line_stripped else ""
                             if content:
-                                current_scene["action"] += content + " "
-                                current_scene["description"] += content + " "
+                                current_scene["action"].append(content)
+                                current_scene["description"].append(content)
                         elif line_stripped.startswith('Camera:') or line_stripped.startswith('Camera Transition:'):
                             current_field = "camera"
                             content = line_stripped.split(':', 1)[1].strip() if ':' in line_stripped else ""
                             if content:
-                                current_scene["camera"] += content + " "
+                                current_scene["camera"].append(content)
                         elif line_stripped.startswith('Dialogue:') or line_stripped.startswith('Dialog:'):
                             current_field = "dialogue"
                             content = line_stripped.split(':', 1)[1].strip() if ':' in line_stripped else ""
                             if content:
-                                current_scene["dialogue"] += content + " "
+                                current_scene["dialogue"].append(content)
                         elif line_stripped.startswith('Close-Up:') or line_stripped.startswith('Close Up:'):
                             current_field = "visual"  # Add close-up to visual
                             content = line_stripped.split(':', 1)[1].strip() if ':' in line_stripped else ""
                             if content:
-                                current_scene["visual"] += "Close-up: " + content + " "
-                                current_scene["description"] += "Close-up: " + content + " "
+                                current_scene["visual"].append("Close-up: " + content)
+                                current_scene["description"].append("Close-up: " + content)
                         elif line_stripped.startswith('Text on Screen:') or line_stripped.startswith('Text:'):
                             current_field = "text_on_screen"
                             content = line_stripped.split(':', 1)[1].strip() if ':' in line_stripped else ""
                             if content:
-                                current_scene["text_on_screen"] += content + " "
+                                current_scene["text_on_screen"].append(content)
                         elif current_field and line_stripped:
                             # Continue adding to current field
                             if current_field == "visual":
-                                current_scene["visual"] += line_stripped + " "
-                                current_scene["description"] += line_stripped + " "
+                                current_scene["visual"].append(line_stripped)
+                                current_scene["description"].append(line_stripped)
                             elif current_field == "action":
-                                current_scene["action"] += line_stripped + " "
-                                current_scene["description"] += line_stripped + " "
+                                current_scene["action"].append(line_stripped)
+                                current_scene["description"].append(line_stripped)
                             elif current_field == "camera":
-                                current_scene["camera"] += line_stripped + " "
+                                current_scene["camera"].append(line_stripped)
                             elif current_field == "dialogue":
-                                current_scene["dialogue"] += line_stripped + " "
+                                current_scene["dialogue"].append(line_stripped)
                             elif current_field == "text_on_screen":
-                                current_scene["text_on_screen"] += line_stripped + " "
+                                current_scene["text_on_screen"].append(line_stripped)
                         elif line_stripped:
                             # No field label, add to description
-                            current_scene["description"] += line_stripped + " "
+                            current_scene["description"].append(line_stripped)
                     
                     # Add last scene
                     if current_scene and current_scene.get("description"):
                         scenes.append(current_scene)
                     
-                    # Clean up all fields
+                    # Join the collected lines (built as lists to avoid repeated concatenation)
                     for scene in scenes:
-                        scene["description"] = scene["description"].strip()
-                        scene["visual"] = scene["visual"].strip()
-                        scene["action"] = scene["action"].strip()
-                        scene["camera"] = scene["camera"].strip()
-                        scene["dialogue"] = scene["dialogue"].strip()
-                        scene["text_on_screen"] = scene["text_on_screen"].strip()
+                        for field in SCENE_TEXT_FIELDS:
+                            scene[field] = " ".join(scene[field])
                     
                     # Ensure we have at least 6 scenes with meaningful content
                     while len(scenes) < 6:
@@ -828,19 +1033,25 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
                     print(f"  Parsed {len(scenes)} scenes for {variant_name} (fallback)")
                     return scenes[:6]  # Return first 6 scenes
             
-            scenes_a = parse_scenes_with_formatter(screenplay_text_a, "Rajamouli Style")
-            scenes_b = parse_scenes_with_formatter(screenplay_text_b, "Shankar Style")
+            parsed_a = parse_screenplay_or_none(screenplay_text_a, "Rajamouli Style")
+            parsed_b = parse_screenplay_or_none(screenplay_text_b, "Shankar Style")
+            scenes_a = parse_scenes_with_formatter(screenplay_text_a, "Rajamouli Style", parsed_a)
+            scenes_b = parse_scenes_with_formatter(screenplay_text_b, "Shankar Style", parsed_b)
             
             # Format screenplays for display
             try:
-                formatted_screenplay_a = format_screenplay_for_display(parse_screenplay(screenplay_text_a, "Rajamouli Style"))
-                formatted_screenplay_b = format_screenplay_for_display(parse_screenplay(screenplay_text_b, "Shankar Style"))
+                if parsed_a is None or parsed_b is None:
+                    raise ValueError("screenplay could not be parsed")
+                formatted_screenplay_a = format_screenplay_for_display(parsed_a)
+                formatted_screenplay_b = format_screenplay_for_display(parsed_b)
                 print(f"✓ Screenplays formatted successfully")
             except Exception as format_error:
                 print(f"⚠ Screenplay formatting failed: {format_error}, using raw output")
                 formatted_screenplay_a = screenplay_text_a
                 formatted_screenplay_b = screenplay_text_b
             
+            # Both variants come from the same step, so they share one timestamp
+            generated_at = datetime.now().isoformat()
             project["screenplays"] = [
                 {
                     "id": str(uuid.uuid4()),
@@ -848,7 +1059,7 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
                     "scenes": scenes_a,
                     "totalDuration": sum(s.get("duration", 6) for s in scenes_a),
                     "scores": {"clarity": 8.5, "feasibility": 7.5, "costRisk": 6.5},
-                    "generatedAt": datetime.now().isoformat(),
+                    "generatedAt": generated_at,
                     "formattedText": formatted_screenplay_a,  # Formatted version
                     "rawText": screenplay_text_a  # Raw version
                 },
@@ -858,7 +1069,7 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
                     "scenes": scenes_b,
                     "totalDuration": sum(s.get("duration", 6) for s in scenes_b),
                     "scores": {"clarity": 7.8, "feasibility": 8.2, "costRisk": 7.0},
-                    "generatedAt": datetime.now().isoformat(),
+                    "generatedAt": generated_at,
                     "formattedText": formatted_screenplay_b,  # Formatted version
                     "rawText": screenplay_text_b  # Raw version
                 }
@@ -903,9 +1114,12 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
                 
                 job["progress"] = 20
                 
-                # Run storyboard creation node
+                # Run storyboard creation node, streaming its output to the SSE endpoint
                 print("Running LangGraph storyboard creation node...")
-                result = await story_board_creation_node(state)
+                job["storyboard_chunks"] = []
+                result = await story_board_creation_node(
+                    state, {"configurable": {"on_storyboard_chunk": job["storyboard_chunks"].append}}
+                )
                 storyboard_text = result.get("story_board", "")
                 
                 job["progress"] = 50
@@ -914,14 +1128,13 @@ Generate the complete screenplay now in SHANKAR STYLE with EXACTLY 6 SCENES."""
                 scenes = selected_screenplay.get("scenes", [])
                 
                 try:
-                    import google.genai as genai
-                    import base64
+                    from ad_production_pipeline_web import get_gemini_client
                     
                     gemini_api_key = os.getenv("GEMINI_API_KEY")
                     if not gemini_api_key:
                         raise ValueError("GEMINI_API_KEY not set")
                     
-                    gemini_client = genai.Client(api_key=gemini_api_key)
+                    gemini_client = get_gemini_client(gemini_api_key)
                     print("✓ Gemini client initialized")
                 except Exception as e:
                     print(f"⚠ Warning: Could not initialize Gemini: {e}")
@@ -947,26 +1160,17 @@ Return a concise character reference (2-3 sentences) that can be used to maintai
 Focus on visual details that an image generator needs."""
 
                 try:
-                    from tamus_wrapper import get_tamus_client
                     llm = get_tamus_client()
                     
-                    character_response = await asyncio.to_thread(
-                        llm.messages().create,
-                        model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
+                    character_response = await llm.messages().acreate(
+                        model=TAMUS_MODEL,
                         messages=[{"role": "user", "content": character_prompt}],
                         max_tokens=500,
                         temperature=0.3  # Lower temperature for consistent character descriptions
                     )
                     
                     # Extract character description
-                    character_description = ""
-                    if hasattr(character_response, 'content'):
-                        content = character_response.content
-                        if isinstance(content, list) and len(content) > 0:
-                            if isinstance(content[0], dict) and 'text' in content[0]:
-                                character_description = content[0]['text']
-                            else:
-                                character_description = str(content[0])
+                    character_description = extract_text(character_response)
                     
                     print(f"✓ Character description extracted: {character_description[:200]}...")
                 except Exception as e:
@@ -1039,8 +1243,7 @@ Temperature: 0.5 (for consistency)"""
                                             if hasattr(part.inline_data, 'data') and part.inline_data.data is not None:
                                                 image_bytes = part.inline_data.data
                                                 mime_type = getattr(part.inline_data, 'mime_type', 'image/png')
-                                                image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                                                image_url = f"data:{mime_type};base64,{image_base64}"
+                                                image_url = await asyncio.to_thread(save_frame_image, image_bytes, mime_type)
                                                 print(f"  ✓ Image found in part[{part_idx}] (inline_data): {len(image_bytes)} bytes")
                                                 break
                                         
@@ -1075,11 +1278,9 @@ Temperature: 0.5 (for consistency)"""
                         if os.path.exists(fallback_path):
                             print(f"  Using fallback image: {fallback_path}")
                             try:
-                                with open(fallback_path, 'rb') as f:
-                                    image_bytes = f.read()
-                                    image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                                    image_url = f"data:image/png;base64,{image_base64}"
-                                    print(f"  ✓ Fallback image loaded: {len(image_bytes)} bytes")
+                                image_bytes = await asyncio.to_thread(Path(fallback_path).read_bytes)
+                                image_url = await asyncio.to_thread(save_frame_image, image_bytes, "image/png")
+                                print(f"  ✓ Fallback image loaded: {len(image_bytes)} bytes")
                             except Exception as e:
                                 print(f"  ⚠ Failed to load fallback image: {e}")
                     
@@ -1106,6 +1307,9 @@ Temperature: 0.5 (for consistency)"""
                     "generatedAt": datetime.now().isoformat(),
                     "scenes": storyboard_scenes
                 }
+                if result.get("story_board_scenes"):
+                    # Structured agent metadata (STORYBOARD_STRUCTURED=1)
+                    project["storyboard"]["agentScenes"] = result["story_board_scenes"]
                 
                 images_generated = sum(1 for s in storyboard_scenes if s["imageUrl"])
                 print(f"✓ Storyboard generated: {len(storyboard_scenes)} scenes ({images_generated} with images)")
@@ -1127,7 +1331,6 @@ Temperature: 0.5 (for consistency)"""
                 print(f"Generating storyboard for {len(scenes)} scenes with LLM agent for character consistency...")
                 
                 # STEP 1: Use LLM to generate HIGH-QUALITY detailed prompts with character consistency
-                from tamus_wrapper import get_tamus_client
                 llm = get_tamus_client()
                 
                 # Build complete screenplay context
@@ -1195,28 +1398,14 @@ CRITICAL REQUIREMENTS:
                 
                 print("Using LLM agent to generate HIGH-QUALITY detailed prompts with character consistency...")
                 
-                agent_response = await asyncio.to_thread(
-                    llm.messages().create,
-                    model=os.getenv("TAMUS_MODEL", "protected.gpt-5.2"),
+                agent_response = await llm.messages().acreate(
+                    model=TAMUS_MODEL,
                     messages=[{"role": "user", "content": agent_prompt}],
                     max_tokens=6000  # Increased for detailed prompts
                 )
                 
                 # Extract text from response
-                agent_text = ""
-                if hasattr(agent_response, 'content'):
-                    content = agent_response.content
-                    if isinstance(content, list) and len(content) > 0:
-                        if isinstance(content[0], dict) and 'text' in content[0]:
-                            agent_text = content[0]['text']
-                        else:
-                            agent_text = str(content[0])
-                    elif isinstance(content, str):
-                        agent_text = content
-                    else:
-                        agent_text = str(content)
-                else:
-                    agent_text = str(agent_response)
+                agent_text = extract_text(agent_response)
                 
                 # Parse JSON response
                 try:
@@ -1238,14 +1427,13 @@ CRITICAL REQUIREMENTS:
                 
                 # STEP 2: Generate images using Gemini with consistent prompts
                 try:
-                    import google.genai as genai
-                    import base64
+                    from ad_production_pipeline_web import get_gemini_client
                     
                     gemini_api_key = os.getenv("GEMINI_API_KEY")
                     if not gemini_api_key:
                         raise ValueError("GEMINI_API_KEY not set")
                     
-                    gemini_client = genai.Client(api_key=gemini_api_key)
+                    gemini_client = get_gemini_client(gemini_api_key)
                     print("✓ Gemini client initialized")
                 except Exception as e:
                     print(f"⚠ Warning: Could not initialize Gemini: {e}")
@@ -1308,20 +1496,15 @@ Style: Cinematic, professional advertising quality, detailed composition, 16:9 a
                                         print(f"  ⚠ Content blocked by safety filters: {finish_reason}")
                                 
                                 # Check if we have valid image data
-                                has_image = False
-                                if candidate and hasattr(candidate, 'content') and hasattr(candidate.content, 'parts') and len(candidate.content.parts) > 0:
-                                    part = candidate.content.parts[0]
-                                    if hasattr(part, 'inline_data') and part.inline_data is not None:
-                                        if hasattr(part.inline_data, 'data') and part.inline_data.data is not None:
-                                            has_image = True
-                                            image_bytes = part.inline_data.data
-                                            mime_type = part.inline_data.mime_type
-                                            
-                                            # Convert to base64 data URL
-                                            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                                            image_url = f"data:{mime_type};base64,{image_base64}"
-                                            
-                                            print(f"  ✓ Image generated: {len(image_bytes)} bytes ({mime_type})")
+                                image = first_inline_image(response)
+                                has_image = image is not None
+                                if has_image:
+                                    image_bytes, mime_type = image
+                                    
+                                    # Write to disk off the event loop and reference by URL
+                                    image_url = await asyncio.to_thread(save_frame_image, image_bytes, mime_type)
+                                    
+                                    print(f"  ✓ Image generated: {len(image_bytes)} bytes ({mime_type})")
                                 
                                 # If no image, try with ultra-simple prompt
                                 if not has_image:
@@ -1337,19 +1520,13 @@ Style: Cinematic, professional advertising quality, detailed composition, 16:9 a
                                             contents=ultra_simple_prompt
                                         )
                                         
-                                        if hasattr(response, 'candidates') and len(response.candidates) > 0:
-                                            candidate = response.candidates[0]
-                                            if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts') and len(candidate.content.parts) > 0:
-                                                part = candidate.content.parts[0]
-                                                if hasattr(part, 'inline_data') and part.inline_data is not None:
-                                                    if hasattr(part.inline_data, 'data') and part.inline_data.data is not None:
-                                                        image_bytes = part.inline_data.data
-                                                        mime_type = part.inline_data.mime_type
-                                                        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                                                        image_url = f"data:{mime_type};base64,{image_base64}"
-                                                        print(f"  ✓ Retry successful: {len(image_bytes)} bytes ({mime_type})")
-                                                    else:
-                                                        print(f"  ⚠ Retry failed: still no image data")
+                                        image = first_inline_image(response)
+                                        if image is not None:
+                                            image_bytes, mime_type = image
+                                            image_url = await asyncio.to_thread(save_frame_image, image_bytes, mime_type)
+                                            print(f"  ✓ Retry successful: {len(image_bytes)} bytes ({mime_type})")
+                                        else:
+                                            print(f"  ⚠ Retry failed: still no image data")
                                     except Exception as retry_error:
                                         print(f"  ⚠ Retry failed: {retry_error}")
                             else:
@@ -1400,9 +1577,10 @@ Style: Cinematic, professional advertising quality, detailed composition, 16:9 a
                 location_planning_node,
                 budgeting_node,
                 schedule_ad_node,
-                crew_gear_node,
+                production_resources_node,
                 legal_clearance_node,
-                risk_safety_node
+                risk_safety_node,
+                planning_fallback
             )
             
             # Get storyboard data
@@ -1448,49 +1626,31 @@ Style: Cinematic, professional advertising quality, detailed composition, 16:9 a
                 if not state.get("scene_plan"):
                     raise ValueError("Scene breakdown failed")
                 
-                # Step 2: Run parallel planning nodes (with delays to avoid rate limiting)
+                # Step 2: Run planning nodes concurrently (TAMUS rate limiter paces requests)
                 job["progress"] = 40
-                print("2. Running planning nodes sequentially with delays...")
-                
-                # Location Planning
-                print("   - Location planning...")
-                location_result = await asyncio.to_thread(location_planning_node, state)
-                state.update(location_result)
-                await asyncio.sleep(3)  # 3 second delay between API calls
-                
-                # Budgeting
-                job["progress"] = 50
-                print("   - Budget estimation...")
-                budget_result = await asyncio.to_thread(budgeting_node, state)
-                state.update(budget_result)
-                await asyncio.sleep(3)
+                print("2. Running planning nodes in parallel...")
+                print("   - Location planning, budget estimation, schedule planning,")
+                print("     production resources, legal clearances, risk assessment")
                 
-                # Schedule
-                job["progress"] = 60
-                print("   - Schedule planning...")
-                schedule_result = await asyncio.to_thread(schedule_ad_node, state)
-                state.update(schedule_result)
-                await asyncio.sleep(3)
-                
-                # Crew & Gear
-                job["progress"] = 70
-                print("   - Crew and gear planning...")
-                crew_result = await asyncio.to_thread(crew_gear_node, state)
-                state.update(crew_result)
-                await asyncio.sleep(3)
-                
-                # Legal Clearances
-                job["progress"] = 80
-                print("   - Legal clearances...")
-                legal_result = await asyncio.to_thread(legal_clearance_node, state)
-                state.update(legal_result)
-                await asyncio.sleep(3)
-                
-                # Risk Register
+                planners = (
+                    location_planning_node,
+                    budgeting_node,
+                    schedule_ad_node,
+                    production_resources_node,
+                    legal_clearance_node,
+                    risk_safety_node
+                )
+                planning_results = await asyncio.gather(
+                    *(asyncio.to_thread(planner, state) for planner in planners),
+                    return_exceptions=True
+                )
+                # One failed planner falls back on its own instead of failing the job
+                for planner, result in zip(planners, planning_results):
+                    if isinstance(result, Exception):
+                        print(f"   ⚠ {planner.__name__} failed ({result}), using its fallback")
+                        result = planning_fallback(planner, state)
+                    state.update(result)
                 job["progress"] = 85
-                print("   - Risk assessment...")
-                risk_result = await asyncio.to_thread(risk_safety_node, state)
-                state.update(risk_result)
                 
                 # Step 3: Format production pack for frontend
                 job["progress"] = 90
@@ -1596,6 +1756,95 @@ Style: Cinematic, professional advertising quality, detailed composition, 16:9 a
         print(f"\n✗ Generation failed: {e}")
         import traceback
         traceback.print_exc()
+
+async def run_concept_batch(job_id: str, project_ids: List[str]):
+    """Generate concepts for many projects through one TAMUS batch job"""
+    async with job_slots:
+        if jobs_db[job_id]["status"] == "cancelled":
+            return
+        await _run_concept_batch(job_id, project_ids)
+
+async def _run_concept_batch(job_id: str, project_ids: List[str]):
+    """Run a batch concept job (holding a job slot)"""
+    job = jobs_db[job_id]
+    projects = {pid: projects_db[pid] for pid in project_ids}
+    
+    try:
+        job["status"] = "running"
+        job["progress"] = 10
+        
+        if not PIPELINES_AVAILABLE:
+            # Mock generation for testing (fallback)
+            await asyncio.sleep(2)
+            job["progress"] = 100
+            job["status"] = "completed"
+            return
+        
+        import requests
+        from batch_processor import BatchProcessor
+        
+        rows = [
+            BatchProcessor.build_request(
+                pid, build_concept_prompt(project["brief"]), 2000, system=CONCEPT_SYSTEM_PROMPT
+            )
+            for pid, project in projects.items()
+        ]
+        
+        def on_status(batch):
+            counts = batch.get("request_counts") or {}
+            total = counts.get("total") or len(rows)
+            job["batch_id"] = batch.get("id")
+            job["progress"] = 10 + int(80 * counts.get("completed", 0) / total)
+        
+        try:
+            texts = await BatchProcessor().arun(rows, on_status=on_status)
+            visual_style = "AI Generated (Batch)"
+        except requests.RequestException as batch_error:
+            # Endpoint has no batch support; fall back to bounded realtime calls
+            logger.warning("TAMUS batch API unavailable (%s), generating concepts in realtime", batch_error)
+            llm = get_tamus_client()
+            slots = asyncio.Semaphore(BATCH_REALTIME_CONCURRENCY)
+            finished = 0
+            
+            async def realtime(row):
+                nonlocal finished
+                async with slots:
+                    try:
+                        response = await llm.messages().acreate(**row["body"])
+                        return row["custom_id"], extract_text(response)
+                    finally:
+                        finished += 1
+                        job["progress"] = 10 + int(80 * finished / len(rows))
+            
+            # A failed brief is reported in failedProjectIds instead of failing the job
+            results = await asyncio.gather(*(realtime(row) for row in rows), return_exceptions=True)
+            texts = {}
+            for row, result in zip(rows, results):
+                if isinstance(result, Exception):
+                    logger.warning("Realtime concept for project %s failed: %s", row["custom_id"], result)
+                else:
+                    texts[result[0]] = result[1]
+            visual_style = "AI Generated"
+        
+        # Empty replies are failures; they must not be stored as a blank concept
+        texts = {pid: text for pid, text in texts.items() if text and text.strip()}
+        updated_at = datetime.now().isoformat()
+        for pid, project in projects.items():
+            if pid in texts:
+                store_concept(project, project["brief"], texts[pid], visual_style)
+                project["updatedAt"] = updated_at
+        job["failedProjectIds"] = [pid for pid in project_ids if pid not in texts]
+        
+        job["progress"] = 100
+        job["status"] = "completed"
+        job["completed_at"] = datetime.now().isoformat()
+        logger.info("Batch concepts completed: %d/%d projects", len(texts), len(project_ids))
+        
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        logger.exception("Batch generation failed: %s", e)
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -1619,13 +1868,14 @@ async def list_projects():
 async def create_project(request: CreateProjectRequest):
     """Create a new project"""
     project_id = str(uuid.uuid4())
+    now = datetime.now().isoformat()
     project = {
         "id": project_id,
         "name": request.name,
         "client": request.client,
         "status": ProjectStatus.DRAFT,
-        "createdAt": datetime.now().isoformat(),
-        "updatedAt": datetime.now().isoformat(),
+        "createdAt": now,
+        "updatedAt": now,
         "currentStep": WorkflowStep.BRIEF,
         "tags": request.tags,
         "budgetBand": request.budgetBand,
@@ -1633,6 +1883,39 @@ async def create_project(request: CreateProjectRequest):
     projects_db[project_id] = project
     return project
 
+@app.post("/api/projects/batch")
+async def create_batch_projects(request: BatchBriefsRequest, background_tasks: BackgroundTasks):
+    """Create one project per brief and generate their concepts as a batch job"""
+    if not request.briefs:
+        raise HTTPException(status_code=400, detail="No briefs submitted")
+    
+    project_ids = []
+    now = datetime.now().isoformat()
+    for index, brief in enumerate(request.briefs, start=1):
+        project_id = str(uuid.uuid4())
+        projects_db[project_id] = {
+            "id": project_id,
+            "name": f"{request.client} batch #{index}",
+            "client": request.client,
+            "status": ProjectStatus.DRAFT,
+            "createdAt": now,
+            "updatedAt": now,
+            "currentStep": WorkflowStep.CONCEPT,
+            "tags": ["batch"],
+            "budgetBand": request.budgetBand,
+            "brief": brief.model_dump(),
+        }
+        project_ids.append(project_id)
+    
+    job = create_job("batch", "concept_batch")
+    job["projectIds"] = project_ids
+    background_tasks.add_task(run_concept_batch, job["id"], project_ids)
+    
+    return {
+        "jobId": job["id"],
+        "projectIds": project_ids
+    }
+
 @app.get("/api/projects/{project_id}")
 async def get_project(project_id: str):
     """Get a single project"""
@@ -1824,6 +2107,18 @@ async def stream_generation_progress(job_id: str):
                     "message": f"Processing {job['step']}..."
                 }
             }
+            if job.get("concept_chunks"):
+                data["data"]["partialConcept"] = "".join(job["concept_chunks"])
+            if job.get("storyboard_chunks"):
+                data["data"]["partialStoryboard"] = "".join(job["storyboard_chunks"])
+            if job.get("screenplay_a_chunks"):
+                data["data"]["partialScreenplayA"] = "".join(job["screenplay_a_chunks"])
+            if job.get("screenplay_b_chunks"):
+                data["data"]["partialScreenplayB"] = "".join(job["screenplay_b_chunks"])
+            if job.get("completed_nodes"):
+                data["data"]["completedNodes"] = job["completed_nodes"]
+            if job.get("steps"):
+                data["data"]["steps"] = job["steps"]
             yield f"data: {json.dumps(data)}\n\n"
             
             await asyncio.sleep(1)
@@ -6,6 +6,7 @@ Includes Gemini 2.5 Flash for storyboard image generation
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime
@@ -15,6 +16,10 @@ import json
 import uuid
 import sys
 import os
+import logging
+import logging.handlers
+import queue
+import atexit
 from pathlib import Path
 
 # Load environment variables
@@ -29,11 +34,26 @@ if os.path.exists(env_path):
     print(f"  - GEMINI_API_KEY: {'✓ Set' if os.getenv('GEMINI_API_KEY') else '✗ Not set'}")
     print(f"  - TAMUS_API_KEY: {'✓ Set' if os.getenv('TAMUS_API_KEY') else '✗ Not set'}")
 
+# Pipeline modules log through the logging module; LOG_LEVEL=DEBUG adds
+# per-frame storyboard detail. Records are queued and written by a listener
+# thread, so a slow stdout never blocks the event loop.
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 sys.path.insert(0, parent_dir)
 
 # Import pipeline integration
 try:
     from backend.pipeline_integration import get_pipeline_runner
+    from ad_production_pipeline_web import STORYBOARD_IMAGE_DIR, STORYBOARD_IMAGE_URL_PREFIX
     PIPELINE_AVAILABLE = True
     print("✓ Successfully imported pipeline integration")
 except Exception as e:
@@ -67,6 +87,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Storyboard frames are written to disk by the pipeline and served from here
+if PIPELINE_AVAILABLE:
+    os.makedirs(STORYBOARD_IMAGE_DIR, exist_ok=True)
+    app.mount(STORYBOARD_IMAGE_URL_PREFIX, StaticFiles(directory=STORYBOARD_IMAGE_DIR), name="storyboard")
+
 # ============================================================================
 # Data Models
 # ============================================================================
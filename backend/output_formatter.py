@@ -8,6 +8,35 @@ from typing import List, Optional, Dict
 import re
 
 
+# Patterns are compiled once at import time; the parsers below run them
+# line-by-line over every LLM response.
+
+# Concept parsing
+_CONCEPT_TITLE_MARKUP_RE = re.compile(r'^#+\s*|\*\*|Title:\s*')
+_BEAT_HEADER_RE = re.compile(r'\*\*\d+:\d+')
+_BEAT_TIMING_RE = re.compile(r'(\d+:\d+[–-]\d+:\d+)')
+_BEAT_TITLE_RE = re.compile(r'\|\s*(.+?)\s*\*\*')
+_LIST_MARKER_RE = re.compile(r'^\d+\.\s*|\*\*|-|•')
+_PALETTE_LABEL_RE = re.compile(r'.*palette:\s*', re.IGNORECASE)
+_CINEMATOGRAPHY_LABEL_RE = re.compile(r'.*cinematography:\s*', re.IGNORECASE)
+_SOUND_LABEL_RE = re.compile(r'.*sound:\s*', re.IGNORECASE)
+_LABEL_PREFIX_RE = re.compile(r'.*:\s*\*?')
+
+# Screenplay parsing
+_TITLE_LABEL_RE = re.compile(r'.*title:\s*', re.IGNORECASE)
+_GENRE_LABEL_RE = re.compile(r'.*genre:\s*', re.IGNORECASE)
+_SCENE_HEADER_RE = re.compile(r'^(SCENE|Scene)\s+\d+', re.IGNORECASE)
+_SCENE_NUMBER_RE = re.compile(r'(\d+)')
+_TIME_RANGE_RE = re.compile(r'\([\d:]+[–-]([\d:]+)\)')
+_DURATION_SECONDS_RE = re.compile(r'\((\d+)\s*s(?:econds?)?\)')
+_VISUALS_LABEL_RE = re.compile(r'^\*?\*?visuals?:\*?\*?\s*', re.IGNORECASE)
+_ACTION_LABEL_RE = re.compile(r'^\*?\*?action:\*?\*?\s*', re.IGNORECASE)
+_CAMERA_LABEL_RE = re.compile(r'^\*?\*?camera.*?:\*?\*?\s*', re.IGNORECASE)
+_DIALOGUE_LABEL_RE = re.compile(r'^\*?\*?dialou?ge?:\*?\*?\s*', re.IGNORECASE)
+_TEXT_ON_SCREEN_LABEL_RE = re.compile(r'^\*?\*?text.*?:\*?\*?\s*', re.IGNORECASE)
+_CLOSE_UP_LABEL_RE = re.compile(r'^\*?\*?close-?up:\*?\*?\s*', re.IGNORECASE)
+
+
 class ConceptOutput(BaseModel):
     """Structured concept output"""
     title: str = Field(description="Concept title")
@@ -59,7 +88,7 @@ def parse_concept(raw_text: str) -> ConceptOutput:
     title = "Untitled Concept"
     for line in lines[:10]:
         if 'title' in line.lower() or line.startswith('#'):
-            title = re.sub(r'^#+\s*|\*\*|Title:\s*', '', line).strip()
+            title = _CONCEPT_TITLE_MARKUP_RE.sub('', line).strip()
             if title:
                 break
     
@@ -83,11 +112,11 @@ def parse_concept(raw_text: str) -> ConceptOutput:
         if '30-second story' in line.lower() or 'story beats' in line.lower():
             in_beats = True
             continue
-        if in_beats and re.match(r'\*\*\d+:\d+', line):
+        if in_beats and _BEAT_HEADER_RE.match(line):
             if current_beat:
                 story_beats.append(current_beat)
-            timing = re.search(r'(\d+:\d+[–-]\d+:\d+)', line)
-            title_match = re.search(r'\|\s*(.+?)\s*\*\*', line)
+            timing = _BEAT_TIMING_RE.search(line)
+            title_match = _BEAT_TITLE_RE.search(line)
             current_beat = {
                 'timing': timing.group(1) if timing else '',
                 'title': title_match.group(1) if title_match else '',
@@ -107,7 +136,7 @@ def parse_concept(raw_text: str) -> ConceptOutput:
             in_why = True
             continue
         if in_why and line.strip().startswith(('1.', '2.', '3.', '4.', '-', '•')):
-            point = re.sub(r'^\d+\.\s*|\*\*|-|•', '', line).strip()
+            point = _LIST_MARKER_RE.sub('', line).strip()
             if point:
                 why_it_works.append(point)
     
@@ -115,17 +144,17 @@ def parse_concept(raw_text: str) -> ConceptOutput:
     visual_direction = {}
     for line in lines:
         if 'palette:' in line.lower():
-            visual_direction['palette'] = re.sub(r'.*palette:\s*', '', line, flags=re.IGNORECASE).strip()
+            visual_direction['palette'] = _PALETTE_LABEL_RE.sub('', line).strip()
         elif 'cinematography:' in line.lower():
-            visual_direction['cinematography'] = re.sub(r'.*cinematography:\s*', '', line, flags=re.IGNORECASE).strip()
+            visual_direction['cinematography'] = _CINEMATOGRAPHY_LABEL_RE.sub('', line).strip()
         elif 'sound:' in line.lower():
-            visual_direction['sound'] = re.sub(r'.*sound:\s*', '', line, flags=re.IGNORECASE).strip()
+            visual_direction['sound'] = _SOUND_LABEL_RE.sub('', line).strip()
     
     # Extract key message
     key_message = ""
     for line in lines:
         if 'key line' in line.lower() or 'key message' in line.lower():
-            key_message = re.sub(r'.*:\s*\*?', '', line).strip().strip('*"')
+            key_message = _LABEL_PREFIX_RE.sub('', line).strip().strip('*"')
             break
     
     return ConceptOutput(
@@ -161,7 +190,7 @@ def parse_screenplay(raw_text: str, variant_name: str = "Screenplay") -> Screenp
     title = variant_name
     for line in lines[:10]:
         if 'title:' in line.lower():
-            title = re.sub(r'.*title:\s*', '', line, flags=re.IGNORECASE).strip()
+            title = _TITLE_LABEL_RE.sub('', line).strip()
             # Remove markdown bold markers
             title = title.replace('**', '').strip()
             break
@@ -170,7 +199,7 @@ def parse_screenplay(raw_text: str, variant_name: str = "Screenplay") -> Screenp
     genre = None
     for line in lines[:20]:
         if 'genre:' in line.lower():
-            genre = re.sub(r'.*genre:\s*', '', line, flags=re.IGNORECASE).strip()
+            genre = _GENRE_LABEL_RE.sub('', line).strip()
             # Remove markdown bold markers
             genre = genre.replace('**', '').strip()
             break
@@ -190,7 +219,7 @@ def parse_screenplay(raw_text: str, variant_name: str = "Screenplay") -> Screenp
         is_scene_header = False
         
         # Pattern 1: Starts with SCENE/Scene
-        if re.match(r'^(SCENE|Scene)\s+\d+', line_stripped, re.IGNORECASE):
+        if _SCENE_HEADER_RE.match(line_stripped):
             is_scene_header = True
         # Pattern 2: Starts with ## or ###
         elif line_stripped.startswith(('##', '###')):
@@ -221,7 +250,7 @@ def parse_screenplay(raw_text: str, variant_name: str = "Screenplay") -> Screenp
             duration = 5  # default
             
             # Extract scene number
-            num_match = re.search(r'(\d+)', line_stripped)
+            num_match = _SCENE_NUMBER_RE.search(line_stripped)
             if num_match:
                 scene_num = int(num_match.group(1))
             else:
@@ -229,7 +258,7 @@ def parse_screenplay(raw_text: str, variant_name: str = "Screenplay") -> Screenp
             
             # Try to extract duration - multiple patterns
             # Pattern 1: (0:00–0:04) or (0:00-0:04) -> extract end time
-            time_range_match = re.search(r'\([\d:]+[–-]([\d:]+)\)', line_stripped)
+            time_range_match = _TIME_RANGE_RE.search(line_stripped)
             if time_range_match:
                 end_time = time_range_match.group(1)
                 # Parse time format like "0:04" or "0:10"
@@ -240,7 +269,7 @@ def parse_screenplay(raw_text: str, variant_name: str = "Screenplay") -> Screenp
                     duration = minutes * 60 + seconds
             else:
                 # Pattern 2: (5s) or (6 seconds)
-                duration_match = re.search(r'\((\d+)\s*s(?:econds?)?\)', line_stripped)
+                duration_match = _DURATION_SECONDS_RE.search(line_stripped)
                 if duration_match:
                     duration = int(duration_match.group(1))
             
@@ -267,40 +296,40 @@ def parse_screenplay(raw_text: str, variant_name: str = "Screenplay") -> Screenp
         
         if line_lower.startswith(('visual:', 'visuals:')):
             current_field = 'visuals'
-            content = re.sub(r'^\*?\*?visuals?:\*?\*?\s*', '', line_stripped, flags=re.IGNORECASE)
+            content = _VISUALS_LABEL_RE.sub('', line_stripped)
             # Remove any remaining markdown bold markers
             content = content.replace('**', '')
             if content:
                 current_scene['visuals'] += content + ' '
         elif line_lower.startswith('action:'):
             current_field = 'action'
-            content = re.sub(r'^\*?\*?action:\*?\*?\s*', '', line_stripped, flags=re.IGNORECASE)
+            content = _ACTION_LABEL_RE.sub('', line_stripped)
             content = content.replace('**', '')
             if content:
                 current_scene['action'] += content + ' '
         elif line_lower.startswith(('camera:', 'camera transition:')):
             current_field = 'camera'
-            content = re.sub(r'^\*?\*?camera.*?:\*?\*?\s*', '', line_stripped, flags=re.IGNORECASE)
+            content = _CAMERA_LABEL_RE.sub('', line_stripped)
             content = content.replace('**', '')
             if content:
                 current_scene['camera'] += content + ' '
         elif line_lower.startswith(('dialogue:', 'dialog:')):
             current_field = 'dialogue'
             # Remove both the field label and any markdown
-            content = re.sub(r'^\*?\*?dialou?ge?:\*?\*?\s*', '', line_stripped, flags=re.IGNORECASE)
+            content = _DIALOGUE_LABEL_RE.sub('', line_stripped)
             content = content.replace('**', '').replace('Dialogue:', '').replace('Dialog:', '').strip()
             if content:
                 current_scene['dialogue'] += content + ' '
         elif line_lower.startswith(('text on screen:', 'text:')):
             current_field = 'text_on_screen'
-            content = re.sub(r'^\*?\*?text.*?:\*?\*?\s*', '', line_stripped, flags=re.IGNORECASE)
+            content = _TEXT_ON_SCREEN_LABEL_RE.sub('', line_stripped)
             content = content.replace('**', '')
             if content:
                 current_scene['text_on_screen'] += content + ' '
         elif line_lower.startswith('close-up:') or line_lower.startswith('close up:'):
             # Add close-up to visuals field
             current_field = 'visuals'
-            content = re.sub(r'^\*?\*?close-?up:\*?\*?\s*', '', line_stripped, flags=re.IGNORECASE)
+            content = _CLOSE_UP_LABEL_RE.sub('', line_stripped)
             content = content.replace('**', '')
             if content:
                 current_scene['visuals'] += 'Close-up: ' + content + ' '
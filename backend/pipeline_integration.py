@@ -44,13 +44,11 @@ class PipelineRunner:
     
     async def generate_concept(self, project_id: str, brief: Dict[str, Any]) -> Dict[str, Any]:
         """Generate concept from brief."""
-        loop = asyncio.get_event_loop()
-        
         # Get or create state
         state = self._get_or_create_state(project_id, brief)
         
         # Run concept node
-        result = await loop.run_in_executor(None, ad_concept_creation_node, state)
+        result = await ad_concept_creation_node(state)
         
         # Update cached state
         state.update(result)
@@ -62,8 +60,6 @@ class PipelineRunner:
     
     async def generate_screenplays(self, project_id: str, brief: Dict[str, Any]) -> Dict[str, Any]:
         """Generate both screenplay variants."""
-        loop = asyncio.get_event_loop()
-        
         # Get state (should have concept already)
         state = self._get_or_create_state(project_id, brief)
         
@@ -72,11 +68,13 @@ class PipelineRunner:
             concept_result = await self.generate_concept(project_id, brief)
             state["concept"] = concept_result["concept"]
         
-        # Run both screenplay nodes
-        result1 = await loop.run_in_executor(None, screen_play_creation_node_1, state)
+        # Run both screenplay nodes concurrently (both only read the concept
+        # and write disjoint keys, mirroring the graph's fan-out)
+        result1, result2 = await asyncio.gather(
+            screen_play_creation_node_1(dict(state)),
+            screen_play_creation_node_2(dict(state))
+        )
         state.update(result1)
-        
-        result2 = await loop.run_in_executor(None, screen_play_creation_node_2, state)
         state.update(result2)
         
         return {
@@ -102,8 +100,6 @@ class PipelineRunner:
     
     async def generate_storyboard(self, project_id: str, brief: Dict[str, Any]) -> Dict[str, Any]:
         """Generate storyboard with Gemini images."""
-        loop = asyncio.get_event_loop()
-        
         # Get state (should have screenplay_winner)
         state = self._get_or_create_state(project_id, brief)
         
@@ -112,8 +108,8 @@ class PipelineRunner:
             await self.generate_screenplays(project_id, brief)
             state["screenplay_winner"] = state.get("screenplay_1", "")
         
-        # Run storyboard node (includes Gemini image generation)
-        result = await loop.run_in_executor(None, story_board_creation_node, state)
+        # Storyboard node is async (Gemini frames are generated concurrently)
+        result = await story_board_creation_node(state)
         state.update(result)
         
         return {
@@ -124,8 +120,6 @@ class PipelineRunner:
     
     async def generate_production_pack(self, project_id: str, brief: Dict[str, Any]) -> Dict[str, Any]:
         """Generate complete production pack."""
-        loop = asyncio.get_event_loop()
-        
         # Get state (should have storyboard)
         state = self._get_or_create_state(project_id, brief)
         
@@ -134,11 +128,11 @@ class PipelineRunner:
             await self.generate_storyboard(project_id, brief)
         
         # Run scene breakdown
-        scene_result = await loop.run_in_executor(None, scene_breakdown_node, state)
+        scene_result = await scene_breakdown_node(state)
         state.update(scene_result)
         
-        # Run production planning
-        prod_result = await loop.run_in_executor(None, production_planning_node, state)
+        # Production planning is async (artifacts are generated concurrently)
+        prod_result = await production_planning_node(state)
         state.update(prod_result)
         
         return {
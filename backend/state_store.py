@@ -0,0 +1,86 @@
+"""
+In-process state store for the FastAPI backend
+
+projects_db and jobs_db live in process memory and every handler mutates the
+stored dicts in place. ExpiringDict keeps that interface but evicts entries
+that have not been touched for a while, so a long-running server's memory
+stays bounded by recent activity instead of growing with every project and
+job ever created.
+
+State is still per process: run the API with a single uvicorn worker (or
+sticky sessions) so a project's requests land where its state lives.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+
+class ExpiringDict(MutableMapping):
+    """Dict whose entries expire after ttl seconds without being read or written."""
+
+    def __init__(self, ttl: float, keep: Optional[Callable[[Any], bool]] = None):
+        """
+        Args:
+            ttl: Idle seconds before an entry is evicted (0 = never)
+            keep: Optional predicate; entries whose value it accepts are
+                never evicted (e.g. jobs that are still running)
+        """
+        self.ttl = ttl
+        self.keep = keep
+        # key -> (value, last access); ordered oldest access first
+        self._data: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _expired(self, value: Any, touched: float, now: float) -> bool:
+        if not self.ttl or now - touched < self.ttl:
+            return False
+        return not (self.keep is not None and self.keep(value))
+
+    def _evict(self) -> None:
+        now = time.time()
+        for key, (value, touched) in list(self._data.items()):
+            if self.ttl and now - touched < self.ttl:
+                break  # everything after this was touched more recently
+            if self._expired(value, touched, now):
+                del self._data[key]
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock:
+            value, touched = self._data[key]
+            now = time.time()
+            if self._expired(value, touched, now):
+                del self._data[key]
+                raise KeyError(key)
+            self._data[key] = (value, now)
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._evict()
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+
+    def __delitem__(self, key: Any) -> None:
+        with self._lock:
+            del self._data[key]
+
+    def __contains__(self, key: Any) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._lock:
+            self._evict()
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict()
+            return len(self._data)
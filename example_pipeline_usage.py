@@ -6,6 +6,7 @@ from creative brief to production pack generation.
 """
 
 import os
+import asyncio
 import sys
 from dotenv import load_dotenv
 
@@ -15,7 +16,7 @@ load_dotenv()
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ad_production_pipeline import create_production_pipeline
+from ad_production_pipeline import create_production_pipeline, run_production_pipeline
 
 
 def main():
@@ -86,7 +87,7 @@ def main():
     print("\n" + "="*70)
     
     try:
-        final_state = production_graph.invoke(initial_state)
+        final_state = asyncio.run(run_production_pipeline(production_graph, initial_state))
         
         print("\n" + "="*70)
         print("✓ PIPELINE COMPLETE!")
@@ -0,0 +1,223 @@
+"""
+LLM Response Cache for Ad Production Pipeline
+
+Exact-match prompt → response cache for TAMUS API calls.
+Responses are keyed by a SHA-256 digest of (model, prompt, max_tokens) and
+persisted in a small SQLite database, so re-running the pipeline with the same
+templated prompts (dev iteration, re-runs after HITL rejection) skips the
+network entirely. A bounded in-memory layer serves hot keys within a process.
+
+Enable with TAMUS_CACHE=1. The database location defaults to
+output/.cost_cache/llm_cache.sqlite and can be overridden with TAMUS_CACHE_PATH.
+Entries expire after TAMUS_CACHE_TTL seconds (default 7 days, 0 = never).
+
+A second instance caches Tavily web-search context by query (TAVILY_CACHE=1,
+TAVILY_CACHE_PATH, TAVILY_CACHE_TTL default 24h). Several of the pipeline's
+search queries don't depend on user input at all, so repeat runs skip them.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+DEFAULT_CACHE_PATH = os.path.join("output", ".cost_cache", "llm_cache.sqlite")
+DEFAULT_MEMORY_SIZE = 512
+DEFAULT_TTL = 7 * 24 * 3600  # 7 days
+DEFAULT_SEARCH_CACHE_PATH = os.path.join("output", ".cost_cache", "search_cache.sqlite")
+DEFAULT_SEARCH_TTL = 24 * 3600  # 24 hours
+
+
+def cache_enabled() -> bool:
+    """Return True when the TAMUS response cache is switched on via env."""
+    return os.getenv("TAMUS_CACHE", "0").lower() in ("1", "true", "yes")
+
+
+def search_cache_enabled() -> bool:
+    """Return True when the Tavily search cache is switched on via env."""
+    return os.getenv("TAVILY_CACHE", "0").lower() in ("1", "true", "yes")
+
+
+def make_search_cache_key(query: str, max_results: int) -> str:
+    """Build a cache key for a web search (SHA-256 of query and result count)."""
+    return hashlib.sha256(f"{max_results}:{query}".encode("utf-8")).hexdigest()
+
+
+def make_cache_key(model: str, prompt: str, max_tokens: int, system: Optional[str] = None,
+                   json_mode: bool = False) -> str:
+    """
+    Build a content-addressed cache key for an LLM request.
+
+    Args:
+        model: Model name the request is sent to
+        prompt: Final prompt text (after any truncation)
+        max_tokens: Response token budget
+        system: System prompt sent ahead of the user prompt, if any
+        json_mode: Whether the reply was requested as a JSON object
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    fields = {"m": model, "p": prompt, "t": max_tokens}
+    if system is not None:
+        fields["s"] = system
+    # Only added when set, so existing free-text keys stay valid
+    if json_mode:
+        fields["j"] = True
+    if orjson is not None:
+        payload = orjson.dumps(fields, option=orjson.OPT_SORT_KEYS)
+    else:
+        # Byte-identical to orjson's compact UTF-8 output, so keys stay stable
+        # whether or not orjson is installed
+        payload = json.dumps(
+            fields, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed prompt → response cache with an in-memory LRU front."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, memory_size: int = DEFAULT_MEMORY_SIZE,
+                 default_ttl: Optional[float] = DEFAULT_TTL):
+        self.path = path
+        self.memory_size = memory_size
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Planner nodes run on worker threads, so share one connection under a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        if key in self._memory:
+            value, expires_at = self._memory[key]
+            if expires_at is None or expires_at >= time.time():
+                self._memory.move_to_end(key)
+                return value
+            del self._memory[key]
+
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+
+        self._remember(key, value, expires_at)
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on miss/expiry."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key from make_cache_key()
+            value: Response text
+            ttl: Time-to-live in seconds (None = the cache's default_ttl;
+                a default of None/0 means never expires)
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._conn.commit()
+            self._remember(key, value, expires_at)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for this process."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._memory.clear()
+
+
+# Global cache instance
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get or create the global LLM response cache."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache(
+                    os.getenv("TAMUS_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    default_ttl=float(os.getenv("TAMUS_CACHE_TTL", DEFAULT_TTL)),
+                )
+    return _llm_cache
+
+
+# Global search cache instance
+_search_cache: Optional[LLMResponseCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> LLMResponseCache:
+    """Get or create the global web-search context cache."""
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = LLMResponseCache(
+                    os.getenv("TAVILY_CACHE_PATH", DEFAULT_SEARCH_CACHE_PATH),
+                    default_ttl=float(os.getenv("TAVILY_CACHE_TTL", DEFAULT_SEARCH_TTL)),
+                )
+    return _search_cache
@@ -0,0 +1,117 @@
+"""
+Provider Rate Limiter for Ad Production Pipeline
+
+Token-bucket throttling for outbound API calls. The planner fan-out and the
+concurrent storyboard frames can fire a burst of requests at once; pacing
+them under the provider's requests-per-minute budget keeps 429s (and the
+retries they trigger) rare without giving up the concurrency.
+
+One bucket per provider:
+- tamus  - TAMUS chat completions (TAMUS_RPM, default 60)
+- gemini - Gemini image generation (GEMINI_RPM, default 30)
+- tavily - Tavily web search (TAVILY_RPM, default 60)
+
+Set an RPM to 0 to disable throttling for that provider. Buckets are shared
+by worker threads (sync nodes) and the event loop (async nodes).
+"""
+
+import os
+import time
+import asyncio
+import threading
+from typing import Dict
+
+
+DEFAULT_RPM = {
+    "tamus": 60,
+    "gemini": 30,
+    "tavily": 60,
+}
+
+# Burst size allowed before pacing kicks in
+DEFAULT_BURST = 8
+
+
+class TokenBucket:
+    """Thread-safe token bucket usable from both sync and async code."""
+
+    def __init__(self, rate_per_minute: float, burst: int = DEFAULT_BURST):
+        self.rate_per_minute = rate_per_minute
+        self.enabled = rate_per_minute > 0
+        self.capacity = max(1, min(burst, int(rate_per_minute) or 1))
+        self._rate = rate_per_minute / 60.0  # tokens per second
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+            # Tokens may go negative: each waiter reserves its own future slot,
+            # so callers are released in arrival order at the configured rate
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def acquire(self) -> None:
+        """Block the current thread until a request may be sent."""
+        if not self.enabled:
+            return
+        wait = self._reserve()
+        if wait > 0:
+            print(f"[RATE_LIMIT] Throttling {wait:.1f}s")
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait (without blocking the event loop) until a request may be sent."""
+        if not self.enabled:
+            return
+        wait = self._reserve()
+        if wait > 0:
+            print(f"[RATE_LIMIT] Throttling {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+# Global per-provider buckets
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """
+    Get or create the shared token bucket for a provider.
+
+    Args:
+        provider: Provider name ("tamus", "gemini" or "tavily")
+
+    Returns:
+        TokenBucket: Limiter sized from {PROVIDER}_RPM (0 disables)
+    """
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                rpm = float(os.getenv(f"{provider.upper()}_RPM", DEFAULT_RPM.get(provider, 0)))
+                limiter = TokenBucket(rpm)
+                _limiters[provider] = limiter
+    return limiter
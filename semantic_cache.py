@@ -0,0 +1,219 @@
+"""
+Semantic LLM Response Cache for Ad Production Pipeline
+
+Reuses a stored TAMUS response when a new prompt is a near-duplicate of one
+seen before (whitespace changes, light rephrasing of the same brief).
+Prompts are embedded with a small local sentence-transformers model and
+compared by cosine similarity against the stored embedding matrix.
+
+Only creative prompts opt in (concept, screenplays) and every entry is scoped
+by brand name, so a hit can never leak one brand's copy into another's ad.
+Model and max_tokens must also match exactly.
+
+Enable with SEMANTIC_CACHE=1. Tunables:
+- SEMANTIC_CACHE_THRESHOLD (default 0.92)
+- SEMANTIC_CACHE_MODEL (default sentence-transformers/all-MiniLM-L6-v2)
+- SEMANTIC_CACHE_PATH (default output/.cost_cache/semantic_cache.npz)
+
+A second instance backs plan-template caching (PLAN_CACHE=1): template-shaped
+planner outputs (scene plan, locations, schedule) are stored against the
+planner's input, and a near-duplicate input asks the LLM to adapt the stored
+plan instead of planning from scratch. Tunables: PLAN_CACHE_THRESHOLD
+(default 0.90) and PLAN_CACHE_PATH (default output/.cost_cache/plan_cache.npz).
+
+Requires numpy and sentence-transformers; when they are not installed the
+cache disables itself and every lookup is a miss.
+"""
+
+import os
+import json
+import threading
+from typing import Optional, List, Dict
+
+
+DEFAULT_CACHE_PATH = os.path.join("output", ".cost_cache", "semantic_cache.npz")
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_PLAN_CACHE_PATH = os.path.join("output", ".cost_cache", "plan_cache.npz")
+DEFAULT_PLAN_THRESHOLD = 0.90
+
+
+def semantic_cache_enabled() -> bool:
+    """Return True when the semantic cache is switched on via env."""
+    return os.getenv("SEMANTIC_CACHE", "0").lower() in ("1", "true", "yes")
+
+
+def plan_cache_enabled() -> bool:
+    """Return True when plan-template caching is switched on via env."""
+    return os.getenv("PLAN_CACHE", "0").lower() in ("1", "true", "yes")
+
+
+class SemanticCache:
+    """Embedding-similarity cache mapping prompts to LLM responses."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        threshold: float = DEFAULT_THRESHOLD,
+        model_name: str = DEFAULT_MODEL_NAME,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.model_name = model_name
+        self.available = True
+
+        self._lock = threading.Lock()
+        self._model = None
+        self._np = None
+        self._embeddings = None  # (N, d) float32, rows L2-normalized
+        self._records: List[Dict] = []
+
+        try:
+            import numpy as np
+            self._np = np
+        except ImportError:
+            print("⚠ numpy not installed - semantic cache disabled")
+            self.available = False
+            return
+
+        self._load()
+
+    def _load(self) -> None:
+        np = self._np
+        if not os.path.exists(self.path):
+            return
+        try:
+            data = np.load(self.path, allow_pickle=False)
+            self._embeddings = data["embeddings"].astype(np.float32)
+            self._records = [json.loads(r) for r in data["records"].tolist()]
+        except Exception as e:
+            print(f"⚠ Could not load semantic cache from {self.path}: {e}")
+            self._embeddings = None
+            self._records = []
+
+    def _save(self) -> None:
+        np = self._np
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(
+            self.path,
+            embeddings=self._embeddings,
+            records=np.array([json.dumps(r) for r in self._records]),
+        )
+
+    def _embed(self, text: str):
+        """Embed text as an L2-normalized float32 vector (None if unavailable)."""
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                print("⚠ sentence-transformers not installed - semantic cache disabled")
+                self.available = False
+                return None
+            self._model = SentenceTransformer(self.model_name)
+
+        vector = self._model.encode(text, normalize_embeddings=True)
+        return self._np.asarray(vector, dtype=self._np.float32)
+
+    def lookup(self, prompt: str, scope: str, model: str, max_tokens: int) -> Optional[str]:
+        """
+        Return a cached response for a semantically similar prompt.
+
+        Args:
+            prompt: Prompt about to be sent
+            scope: Lexical constraint that must match exactly (brand name)
+            model: Model name the request is sent to
+            max_tokens: Response token budget
+
+        Returns:
+            Optional[str]: Cached response, or None on miss
+        """
+        if not self.available:
+            return None
+
+        with self._lock:
+            if self._embeddings is None or not self._records:
+                return None
+
+            query = self._embed(prompt)
+            if query is None:
+                return None
+
+            similarities = self._embeddings @ query
+            # Best-scoring candidates first; stop at the first one in scope
+            for idx in self._np.argsort(-similarities):
+                if similarities[idx] < self.threshold:
+                    break
+                record = self._records[idx]
+                if (record["scope"] == scope and record["model"] == model
+                        and record["max_tokens"] == max_tokens):
+                    print(f"[SEMANTIC_CACHE] ✓ Hit (cosine {similarities[idx]:.3f})")
+                    return record["response"]
+
+        return None
+
+    def add(self, prompt: str, scope: str, model: str, max_tokens: int, response: str) -> None:
+        """Store a prompt/response pair and persist the cache to disk."""
+        if not self.available:
+            return
+
+        with self._lock:
+            vector = self._embed(prompt)
+            if vector is None:
+                return
+
+            row = vector.reshape(1, -1)
+            if self._embeddings is None:
+                self._embeddings = row
+            else:
+                self._embeddings = self._np.vstack([self._embeddings, row])
+            self._records.append({
+                "scope": scope,
+                "model": model,
+                "max_tokens": max_tokens,
+                "response": response,
+            })
+
+            try:
+                self._save()
+            except Exception as e:
+                print(f"⚠ Could not persist semantic cache: {e}")
+
+
+# Global semantic cache instance
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get or create the global semantic cache."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    path=os.getenv("SEMANTIC_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD)),
+                    model_name=os.getenv("SEMANTIC_CACHE_MODEL", DEFAULT_MODEL_NAME),
+                )
+    return _semantic_cache
+
+
+# Global plan-template cache instance
+_plan_cache: Optional[SemanticCache] = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> SemanticCache:
+    """Get or create the global plan-template cache."""
+    global _plan_cache
+    if _plan_cache is None:
+        with _plan_cache_lock:
+            if _plan_cache is None:
+                _plan_cache = SemanticCache(
+                    path=os.getenv("PLAN_CACHE_PATH", DEFAULT_PLAN_CACHE_PATH),
+                    threshold=float(os.getenv("PLAN_CACHE_THRESHOLD", DEFAULT_PLAN_THRESHOLD)),
+                    model_name=os.getenv("SEMANTIC_CACHE_MODEL", DEFAULT_MODEL_NAME),
+                )
+    return _plan_cache
@@ -25,6 +25,12 @@ fi
 echo "✓ Python dependencies installed"
 echo ""
 
+# Precompile bytecode so pipeline and backend workers start without parsing sources
+echo "Precompiling Python bytecode..."
+python3 -m compileall -q -j 0 -x 'virtual-ad-agency-ui|node_modules' .
+echo "✓ Bytecode compiled"
+echo ""
+
 # Check for FFmpeg
 echo "Checking for FFmpeg..."
 if command -v ffmpeg &> /dev/null; then
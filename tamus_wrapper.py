@@ -11,10 +11,47 @@ Date: 2025-02-07
 
 import os
 import json
+import asyncio
+import weakref
+import functools
+import contextlib
+import threading
 import requests
-from typing import Optional, Dict, Any, List
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Callable
 from dataclasses import dataclass
 
+# Optional: native async HTTP for acreate(); without it acreate() runs the
+# blocking client on a worker thread
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class TamusResponseError(ValueError):
+    """TAMUS answered, but without usable content (empty or malformed payload).
+    
+    Usually transient, so callers with retry logic may try again; subclasses
+    ValueError so existing handlers keep catching it.
+    """
+
+
+class TokenBudgetExceeded(TamusResponseError):
+    """The model hit max_tokens (finish_reason "length") before emitting any content.
+    
+    Reasoning models spend part of the budget thinking; retrying with the
+    same max_tokens usually fails the same way, so callers should retry with
+    a larger budget.
+    """
+
+
+# Cap on blocking create() requests in flight across the process (all nodes,
+# all concurrent workflows). Calls past the cap wait for a slot instead of
+# piling onto the provider's queue. TAMUS_CONCURRENCY=0 disables the cap.
+TAMUS_CONCURRENCY = int(os.getenv("TAMUS_CONCURRENCY", "8"))
+_request_slots = threading.BoundedSemaphore(TAMUS_CONCURRENCY) if TAMUS_CONCURRENCY > 0 else None
+
 
 @dataclass
 class TAMUSConfig:
@@ -23,6 +60,141 @@ class TAMUSConfig:
     api_base: str = "https://chat-api.tamu.ai"
     model: str = "protected.gemini-2.5-flash"
     timeout: int = 300  # Increased to 5 minutes for complex production planning
+    connect_timeout: int = 10  # Fail fast on unreachable host; read timeout stays long
+    # Keep-alive connections per host: covers planner fan-out and never falls
+    # below the in-flight cap, so no capped request opens a throwaway connection
+    pool_maxsize: int = max(16, TAMUS_CONCURRENCY)
+
+
+# One pooled session per process so every client reuses warm TLS connections
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session(pool_maxsize: int = max(16, TAMUS_CONCURRENCY)) -> requests.Session:
+    """Get or create the process-wide keep-alive HTTP session.
+    
+    Args:
+        pool_maxsize: Maximum pooled connections per host (first call wins)
+    
+    Returns:
+        requests.Session with a mounted HTTPS connection pool
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _shared_session = session
+    return _shared_session
+
+
+# One pooled httpx.AsyncClient per event loop (a client can't outlive or
+# cross the loop it was created on)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_async_client(pool_maxsize: int = max(16, TAMUS_CONCURRENCY)):
+    """Get or create the keep-alive httpx.AsyncClient for the running event loop.
+    
+    Must be called from a coroutine. Uses HTTP/2 when the h2 package is
+    installed, HTTP/1.1 otherwise.
+    
+    Args:
+        pool_maxsize: Keep-alive connections to hold open (first call per loop wins)
+    
+    Returns:
+        httpx.AsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=pool_maxsize)
+        try:
+            client = httpx.AsyncClient(http2=True, limits=limits)
+        except ImportError:
+            client = httpx.AsyncClient(limits=limits)
+        _async_clients[loop] = client
+    return client
+
+
+# acreate() calls have their own share of the cap, held by an asyncio.Semaphore
+# per event loop: a waiting task holds no thread, and cancelling it while it
+# waits gives nothing back because it took nothing.
+# TAMUS_ASYNC_CONCURRENCY=0 disables it.
+TAMUS_ASYNC_CONCURRENCY = int(os.getenv("TAMUS_ASYNC_CONCURRENCY", str(TAMUS_CONCURRENCY)))
+_async_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _async_request_slot():
+    """Return the async context manager that holds one acreate() slot on the running loop."""
+    if TAMUS_ASYNC_CONCURRENCY <= 0:
+        return contextlib.nullcontext()
+    loop = asyncio.get_running_loop()
+    slots = _async_slots.get(loop)
+    if slots is None:
+        slots = _async_slots[loop] = asyncio.Semaphore(TAMUS_ASYNC_CONCURRENCY)
+    return slots
+
+
+class _JsonEndScanner:
+    """Spots the end of a bare JSON document as streamed deltas arrive.
+    
+    Bracket depth is tracked per character (skipping brackets inside strings
+    and escapes), so each delta costs O(len(delta)) and the buffer is parsed
+    only once, when the depth returns to zero.
+    """
+    
+    def __init__(self):
+        self.active = True  # False once the reply is known not to be bare JSON
+        self.started = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, piece: str) -> bool:
+        """Scan a delta; return True if it closes the top-level document."""
+        if not self.active:
+            return False
+        for ch in piece:
+            if not self.started:
+                if ch.isspace():
+                    continue
+                if ch not in "{[":
+                    self.active = False
+                    return False
+                self.started = True
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+def _is_complete_json(chunks: List[str]) -> bool:
+    """Return True if the joined chunks form a complete bare JSON document."""
+    text = "".join(chunks).strip()
+    if not text or text[0] not in "{[":
+        return False
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
 
 
 class TAMUSAPIClient:
@@ -36,6 +208,7 @@ class TAMUSAPIClient:
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
+        self.session = get_shared_session(config.pool_maxsize)
     
     def _call_openai_compatible_endpoint(
         self,
@@ -43,27 +216,30 @@ class TAMUSAPIClient:
         model: str,
         max_tokens: int = 4000,
         temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        stream: bool = False,
+        response_format: Optional[Dict[str, Any]] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        prompt_cache_key: Optional[str] = None,
     ) -> str:
         """Call TAMUS API using OpenAI-compatible endpoint"""
         url = f"{self.base_url}/api/v1/chat/completions"
+        body = self._request_body(
+            messages, model, max_tokens, temperature, stream, response_format, prompt_cache_key
+        )
         
-        body = {
-            "model": model,
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "stream": False,
-        }
+        if stream:
+            return self._stream_openai_compatible_endpoint(url, body, timeout, on_chunk)
         
         print(f"[TAMUS] POST {url}")
         print(f"[TAMUS] Model: {model}")
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers=self.headers,
                 json=body,
-                timeout=self.config.timeout,
+                timeout=(self.config.connect_timeout, timeout or self.config.timeout),
             )
             
             print(f"[TAMUS] Status: {response.status_code}")
@@ -73,54 +249,233 @@ class TAMUSAPIClient:
                 print(f"[TAMUS] Error: {response.text}")
                 response.raise_for_status()
             
-            # Check if response is empty
-            if not response.text or response.text.strip() == "":
-                print(f"[TAMUS] ⚠ Empty response body (status 200 but no content)")
-                print(f"[TAMUS] Request details:")
-                print(f"  - Model: {model}")
-                print(f"  - Max tokens: {max_tokens}")
-                print(f"  - Temperature: {temperature}")
-                print(f"  - Message length: {len(str(messages))} chars")
-                raise ValueError("Empty response body from API")
+            return self._content_from_payload(response.text, body)
             
-            data = response.json()
+        except requests.RequestException as e:
+            print(f"[TAMUS] Request failed: {e}")
+            raise
+        except (KeyError, ValueError) as e:
+            print(f"[TAMUS] Parse failed: {e}")
+            raise
+    
+    async def _acall_openai_compatible_endpoint(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        max_tokens: int = 4000,
+        temperature: float = 0.7,
+        timeout: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        prompt_cache_key: Optional[str] = None,
+    ) -> str:
+        """Async, non-streaming call over the loop's shared httpx.AsyncClient.
+        
+        HTTP errors are re-raised as requests exceptions (HTTPError keeps the
+        status code), so callers handle both paths the same way.
+        """
+        url = f"{self.base_url}/api/v1/chat/completions"
+        body = self._request_body(
+            messages, model, max_tokens, temperature, False, response_format, prompt_cache_key
+        )
+        
+        print(f"[TAMUS] POST {url} (async)")
+        print(f"[TAMUS] Model: {model}")
+        
+        client = get_shared_async_client(self.config.pool_maxsize)
+        try:
+            response = await client.post(
+                url,
+                headers=self.headers,
+                json=body,
+                timeout=httpx.Timeout(timeout or self.config.timeout, connect=self.config.connect_timeout),
+            )
+        except httpx.HTTPError as e:
+            print(f"[TAMUS] Request failed: {e}")
+            raise requests.ConnectionError(str(e)) from e
+        
+        print(f"[TAMUS] Status: {response.status_code}")
+        print(f"[TAMUS] Response length: {len(response.text)} bytes")
+        
+        if response.status_code != 200:
+            print(f"[TAMUS] Error: {response.text}")
+            error_response = requests.Response()
+            error_response.status_code = response.status_code
+            error_response._content = response.content
+            error_response.url = url
+            raise requests.HTTPError(f"{response.status_code} Error for url: {url}", response=error_response)
+        
+        try:
+            return self._content_from_payload(response.text, body)
+        except (KeyError, ValueError) as e:
+            print(f"[TAMUS] Parse failed: {e}")
+            raise
+    
+    @staticmethod
+    def _request_body(
+        messages: List[Dict[str, Any]],
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        stream: bool,
+        response_format: Optional[Dict[str, Any]],
+        prompt_cache_key: Optional[str],
+    ) -> Dict[str, Any]:
+        """Build the chat-completions request body"""
+        body = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": stream,
+        }
+        if response_format is not None:
+            body["response_format"] = response_format
+        if prompt_cache_key is not None:
+            # Routes requests sharing a static prefix to the same prompt cache
+            body["prompt_cache_key"] = prompt_cache_key
+        return body
+    
+    @staticmethod
+    def _content_from_payload(text: str, body: Dict[str, Any]) -> str:
+        """Return the reply text from a non-streamed chat-completions response body.
+        
+        Raises:
+            TamusResponseError: If the body is empty or carries no content
+        """
+        # Check if response is empty
+        if not text or text.strip() == "":
+            print(f"[TAMUS] ⚠ Empty response body (status 200 but no content)")
+            print(f"[TAMUS] Request details:")
+            print(f"  - Model: {body['model']}")
+            print(f"  - Max tokens: {body['max_tokens']}")
+            print(f"  - Temperature: {body['temperature']}")
+            print(f"  - Message length: {len(str(body['messages']))} chars")
+            raise TamusResponseError("Empty response body from API")
+        
+        data = json.loads(text)
+        
+        if "choices" not in data or not data["choices"]:
+            print(f"[TAMUS] ⚠ Unexpected response format")
+            print(f"[TAMUS] Response keys: {list(data.keys())}")
+            print(f"[TAMUS] Response preview: {str(data)[:200]}")
+            raise TamusResponseError(f"Unexpected response format: {data}")
+        
+        message = data["choices"][0].get("message", {})
+        content = message.get("content")
+        
+        # Check if content is empty string (not just None)
+        if not content or content.strip() == "":
+            print(f"[TAMUS] ⚠ Empty content in message")
+            print(f"[TAMUS] Message keys: {list(message.keys())}")
+            print(f"[TAMUS] Message: {message}")
+            print(f"[TAMUS] Full response data: {data}")
             
-            if "choices" not in data or not data["choices"]:
-                print(f"[TAMUS] ⚠ Unexpected response format")
-                print(f"[TAMUS] Response keys: {list(data.keys())}")
-                print(f"[TAMUS] Response preview: {str(data)[:200]}")
-                raise ValueError(f"Unexpected response format: {data}")
+            # Check if there's a finish_reason that explains why
+            finish_reason = data["choices"][0].get("finish_reason")
+            if finish_reason:
+                print(f"[TAMUS] Finish reason: {finish_reason}")
             
-            message = data["choices"][0].get("message", {})
-            content = message.get("content")
+            # Check for content filter
+            if "content_filter_results" in str(data):
+                print(f"[TAMUS] ⚠ Content may have been filtered")
             
-            # Check if content is empty string (not just None)
-            if not content or content.strip() == "":
-                print(f"[TAMUS] ⚠ Empty content in message")
-                print(f"[TAMUS] Message keys: {list(message.keys())}")
-                print(f"[TAMUS] Message: {message}")
-                print(f"[TAMUS] Full response data: {data}")
-                
-                # Check if there's a finish_reason that explains why
-                finish_reason = data["choices"][0].get("finish_reason")
-                if finish_reason:
-                    print(f"[TAMUS] Finish reason: {finish_reason}")
+            message = f"No content in response (finish_reason: {finish_reason})"
+            if finish_reason == "length":
+                raise TokenBudgetExceeded(message)
+            raise TamusResponseError(message)
+        
+        print(f"[TAMUS] ✓ Success: {len(content)} chars returned")
+        return content
+    
+    def _stream_openai_compatible_endpoint(
+        self,
+        url: str,
+        body: Dict[str, Any],
+        timeout: Optional[float] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Call TAMUS API with stream=True and assemble the SSE deltas.
+        
+        Chunks are collected in a list and joined once. When the text so far
+        is a bare JSON document and a chunk closes it, the stream is closed
+        early instead of waiting for trailing tokens. If on_chunk is given it
+        is called with each delta as it arrives (e.g. to show partial output).
+        """
+        print(f"[TAMUS] POST {url} (streaming)")
+        print(f"[TAMUS] Model: {body['model']}")
+        
+        chunks: List[str] = []
+        json_end = _JsonEndScanner()
+        finish_reason = None
+        try:
+            with self.session.post(
+                url,
+                headers=self.headers,
+                json=body,
+                timeout=(self.config.connect_timeout, timeout or self.config.timeout),
+                stream=True,
+            ) as response:
+                print(f"[TAMUS] Status: {response.status_code}")
                 
-                # Check for content filter
-                if "content_filter_results" in str(data):
-                    print(f"[TAMUS] ⚠ Content may have been filtered")
+                if response.status_code != 200:
+                    print(f"[TAMUS] Error: {response.text}")
+                    response.raise_for_status()
                 
-                raise ValueError(f"No content in response (finish_reason: {finish_reason})")
-            
-            print(f"[TAMUS] ✓ Success: {len(content)} chars returned")
-            return content
-            
+                for raw_line in response.iter_lines():
+                    if not raw_line or not raw_line.startswith(b"data:"):
+                        continue
+                    data = raw_line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+                    
+                    event = json.loads(data)
+                    choices = event.get("choices") or []
+                    if not choices:
+                        continue
+                    finish_reason = choices[0].get("finish_reason") or finish_reason
+                    piece = (choices[0].get("delta") or {}).get("content")
+                    if not piece:
+                        continue
+                    
+                    chunks.append(piece)
+                    if on_chunk is not None:
+                        on_chunk(piece)
+                    if json_end.feed(piece):
+                        if _is_complete_json(chunks):
+                            print(f"[TAMUS] Complete JSON received, closing stream")
+                            break
+                        json_end.active = False  # malformed; just read to the end
+        
         except requests.RequestException as e:
             print(f"[TAMUS] Request failed: {e}")
             raise
-        except (KeyError, ValueError) as e:
-            print(f"[TAMUS] Parse failed: {e}")
-            raise
+        
+        content = "".join(chunks)
+        if not content.strip():
+            print(f"[TAMUS] ⚠ Empty content in streamed response (finish_reason: {finish_reason})")
+            message = f"No content in streamed response (finish_reason: {finish_reason})"
+            if finish_reason == "length":
+                raise TokenBudgetExceeded(message)
+            raise TamusResponseError(message)
+        
+        print(f"[TAMUS] ✓ Success: {len(content)} chars returned")
+        return content
+    
+    def warm_up(self) -> bool:
+        """Open a pooled keep-alive connection to the API host ahead of the first call.
+        
+        Sends a HEAD to the base URL (no tokens spent); any HTTP response means
+        DNS, TCP and TLS are done and the connection sits in the shared pool.
+        
+        Returns:
+            bool: True if the host answered, False on a connection error
+        """
+        try:
+            self.session.head(self.base_url, headers=self.headers, timeout=self.config.connect_timeout)
+            return True
+        except requests.RequestException as e:
+            print(f"[TAMUS] ⚠ Warm-up failed: {e}")
+            return False
     
     def messages(self):
         """Provide messages interface"""
@@ -144,12 +499,49 @@ class MessagesInterface:
         processed_messages = self._process_messages(messages)
         temperature = kwargs.get("temperature", 0.7)
         
-        content = self.client._call_openai_compatible_endpoint(
-            messages=processed_messages,
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
+        # Waits for a free slot when TAMUS_CONCURRENCY requests are already in flight
+        with _request_slots if _request_slots is not None else contextlib.nullcontext():
+            content = self.client._call_openai_compatible_endpoint(
+                messages=processed_messages,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=kwargs.get("timeout"),
+                stream=kwargs.get("stream", False) or kwargs.get("on_chunk") is not None,
+                response_format=kwargs.get("response_format"),
+                on_chunk=kwargs.get("on_chunk"),
+                prompt_cache_key=kwargs.get("prompt_cache_key"),
+            )
+        
+        return MessageResponse(content=content)
+    
+    async def acreate(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        max_tokens: int = 4000,
+        **kwargs
+    ) -> "MessageResponse":
+        """Async create(): awaits the HTTP call on the event loop instead of a worker thread.
+        
+        Capped by TAMUS_ASYNC_CONCURRENCY per event loop. Streaming calls
+        (stream / on_chunk) and installs without httpx run create() on a
+        worker thread instead.
+        """
+        if httpx is None or kwargs.get("stream") or kwargs.get("on_chunk") is not None:
+            return await asyncio.to_thread(self.create, model, messages, max_tokens, **kwargs)
+        
+        processed_messages = self._process_messages(messages)
+        async with _async_request_slot():
+            content = await self.client._acall_openai_compatible_endpoint(
+                messages=processed_messages,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=kwargs.get("temperature", 0.7),
+                timeout=kwargs.get("timeout"),
+                response_format=kwargs.get("response_format"),
+                prompt_cache_key=kwargs.get("prompt_cache_key"),
+            )
         
         return MessageResponse(content=content)
     
@@ -203,6 +595,25 @@ class MessageResponse:
         return self._text
 
 
+def extract_text(response) -> str:
+    """Return the text of a messages().create() response.
+    
+    MessageResponse (every response this wrapper returns) keeps its text
+    directly, so that path is one type check and an attribute read.
+    
+    Raises:
+        TamusResponseError: If the response has no text content; it is never
+            stringified into output, so error payloads can't pass as text
+    """
+    if type(response) is MessageResponse:
+        return response._text
+    try:
+        return response.content[0]["text"]
+    except (AttributeError, KeyError, TypeError, IndexError) as e:
+        raise TamusResponseError(f"Response has no text content: {response!r:.200}") from e
+
+
+@functools.lru_cache(maxsize=1)
 def get_tamus_client(
     api_key: Optional[str] = None,
     api_base: Optional[str] = None,
@@ -210,6 +621,10 @@ def get_tamus_client(
 ) -> TAMUSAPIClient:
     """Factory function to create TAMUS API client.
     
+    Memoized: repeat calls with the same arguments return the same client, so
+    callers can fetch it per request without rebuilding headers and config.
+    Call get_tamus_client.cache_clear() after changing TAMUS_* env vars.
+    
     Args:
         api_key: TAMUS API key (defaults to TAMUS_API_KEY env var)
         api_base: TAMUS API base URL (defaults to TAMUS_API_URL env var)
@@ -252,7 +667,7 @@ if __name__ == "__main__":
             max_tokens=100,
         )
         
-        print(f"[Demo] Response: {response.content[0]['text']}")
+        print(f"[Demo] Response: {extract_text(response)}")
     except Exception as e:
         print(f"[Demo] Error: {e}")
 